@@ -0,0 +1,58 @@
+from typing import Callable, Dict, Optional, Union
+from base_search import GraphSearch
+from bfs_search import BFSSearch
+from dfs_search import DFSSearch, IterativeDeepeningDFSSearch
+from ucs_search import UCSSearch
+from astar_search import AStarSearch
+from bidirectional_search import BidirectionalBFSSearch, BidirectionalUCSSearch
+from heuristics import GreatCircleHeuristic
+from vectorized_search import NUMPY_AVAILABLE, VectorizedBFSSearch
+from graph import Graph, CSRGraph
+
+def _create_astar_search(graph: Optional[Union[Graph, CSRGraph]]) -> AStarSearch:
+    """
+    Creates an A* search with the great-circle heuristic when the graph has node coordinates.
+    
+    Compact graphs, including binary graphs, use the coordinates stored with them; without any, the
+    heuristic estimates 0 and A* behaves like UCS.
+    """
+    search = AStarSearch(graph)
+    if search.csr is None:
+        search.heuristic = GreatCircleHeuristic.from_graph(search.graph)
+    else:
+        search.heuristic = GreatCircleHeuristic.from_compact_graph(search.csr)
+    return search
+
+# Creates a search over a graph (None for the built-in graph), by algorithm name
+ALGORITHMS: Dict[str, Callable[[Optional[Union[Graph, CSRGraph]]], GraphSearch]] = {
+    'bfs': BFSSearch,
+    'dfs': DFSSearch,
+    'iddfs': IterativeDeepeningDFSSearch,
+    'ucs': UCSSearch,
+    'astar': _create_astar_search,
+    'bidirectional_bfs': BidirectionalBFSSearch,
+    'bidirectional_ucs': BidirectionalUCSSearch,
+}
+
+# The vectorized search needs NumPy, which is optional
+if NUMPY_AVAILABLE:
+    ALGORITHMS['vectorized_bfs'] = VectorizedBFSSearch
+
+def create_search(algorithm: str, graph: Optional[Union[Graph, CSRGraph]] = None) -> GraphSearch:
+    """
+    Creates a search by algorithm name.
+    
+    Args:
+        algorithm (str): One of the names in ALGORITHMS.
+        graph (Optional[Union[Graph, CSRGraph]]): The graph to search, or None for the built-in ten-city graph.
+    
+    Returns:
+        GraphSearch: The search.
+    
+    Raises:
+        ValueError: If the algorithm is unknown.
+    """
+    factory = ALGORITHMS.get(algorithm)
+    if factory is None:
+        raise ValueError(f"Unknown algorithm {algorithm!r}, expected one of {', '.join(ALGORITHMS)}")
+    return factory(graph)
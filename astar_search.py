@@ -0,0 +1,133 @@
+import math
+import time
+from typing import Callable, Dict, List, Tuple, Optional, Union
+from ucs_search import UCSSearch
+from graph import Graph, CSRGraph
+from heuristics import Heuristic, GreatCircleHeuristic, zero_heuristic
+from priority_queues import PriorityQueue, LazyHeapQueue
+
+class AStarSearch(UCSSearch):
+    """
+    A* Search implementation.
+    
+    Orders the frontier by cost so far plus a heuristic estimate of the remaining cost. With a consistent
+    heuristic (one that never overestimates, edge by edge) the path found is the shortest one. It records the
+    same exploration_path and unique_cities as UCS, so node expansions can be compared directly; with the
+    zero heuristic it behaves exactly like UCS.
+    
+    Attributes:
+        heuristic (Heuristic): Estimates the remaining cost, called as heuristic(node, goal).
+    
+    Methods:
+        search(self, start: str, goal: str) -> Tuple[Optional[List[str]], int, int, float]:
+            Concrete implementation of the search() method for A*.
+    """
+    name: str = "A* Search"
+
+    def __init__(self, graph: Optional[Union[Graph, CSRGraph]] = None, compact: bool = False,
+                 heuristic: Optional[Heuristic] = None, queue_factory: Callable[[], PriorityQueue] = LazyHeapQueue):
+        """
+        Initializes the A* search.
+        
+        Args:
+            graph (Optional[Union[Graph, CSRGraph]]): A loaded graph to search instead of the built-in ten-city graph.
+            compact (bool): If True, neighbors are iterated from a CSRGraph instead of the per-node edge dictionaries.
+            heuristic (Optional[Heuristic]): The heuristic, e.g. a GreatCircleHeuristic or LandmarkHeuristic. Defaults to the zero heuristic.
+            queue_factory (Callable[[], PriorityQueue]): Creates the priority queue of each search.
+        """
+        super().__init__(graph, compact, queue_factory)
+        self.heuristic: Heuristic = heuristic if heuristic is not None else zero_heuristic
+
+    def search(self, start: str, goal: str) -> Tuple[Optional[List[str]], int, int, float]:
+        """
+        Concrete implementation of the search() method for A*.
+        
+        Args:
+            start (str): The start city.
+            goal (str): The goal city.
+            
+        Returns:
+            Tuple[Optional[List[str]], int, int, float]: The path, number of cities visited, total distance, and time taken.
+            
+            Returns None if no path is found, along with the number of cities visited, 0 for the total distance, and time taken.
+            The counters of the search are kept in search_stats.
+        """
+        # Start the counters and timing of the search
+        stats = self._begin_search()
+        start_time = time.perf_counter_ns()
+        
+        # Initialize the priority queue with the start node and its estimated total cost
+        priority_queue = self.queue_factory()
+        priority_queue.push(self.heuristic(start, goal), start)
+        self.queue_stats = priority_queue.stats
+        
+        # Bind the neighbor lookup and queue operations, timed when profiling, and the hooks
+        get_neighbors = self._timed_lookup(stats, self.get_neighbors)
+        push, pop = self._timed_queue(stats, priority_queue.push, priority_queue.pop)
+        on_expand, on_relax, on_goal = self.on_expand, self.on_relax, self.on_goal
+        out_of_budget = self._budget(stats, start_time)
+        
+        # Initialize the best known cost and the predecessor of every reached node
+        best_costs: Dict[str, int] = {start: 0}
+        parents: Dict[str, Optional[str]] = {start: None}
+        
+        # Initialize the unique cities and exploration path
+        self.unique_cities = set()
+        self.exploration_path = []
+        
+        # Initialize the total number of explorations
+        total_explorations = 0
+        
+        # Process the priority queue until it's empty or the budget runs out
+        while priority_queue:
+            if out_of_budget is not None and out_of_budget(total_explorations):
+                break
+            
+            # Pop the node with the lowest estimated total cost from the priority queue
+            (_, node) = pop()
+            cost = best_costs[node]
+            
+            # Add the node to the exploration path and the unique cities
+            self.exploration_path.append(node)
+            self.unique_cities.add(node)
+            
+            # Increment the total number of explorations
+            total_explorations += 1
+            if on_expand is not None:
+                on_expand(node, cost)
+            
+            # If the node is the goal, rebuild the path and return it with the number of cities visited, total distance, and time taken
+            if node == goal:
+                path = self.reconstruct_path(parents, goal)
+                if on_goal is not None:
+                    on_goal(path, cost)
+                self._end_search(stats, start_time, total_explorations)
+                return path, total_explorations, cost, stats.elapsed
+            
+            # Get the current node's neighbors
+            neighbors = get_neighbors(node)
+            
+            # If the current node is not found, continue to the next iteration
+            if neighbors is None:
+                continue
+            
+            # Push every neighbor whose best known cost improves, with its estimated total cost
+            for neighbor, edge_cost in neighbors:
+                new_cost = cost + edge_cost
+                stats.edges_relaxed += 1
+                if on_relax is not None:
+                    on_relax(node, neighbor, new_cost)
+                if neighbor not in self.unique_cities and new_cost < best_costs.get(neighbor, math.inf):
+                    best_costs[neighbor] = new_cost
+                    parents[neighbor] = node
+                    push(new_cost + self.heuristic(neighbor, goal), neighbor)
+        
+        # If no path is found within the budget, record the end time and return None,
+        # total explorations, 0 for the total distance, and time taken
+        self._end_search(stats, start_time, total_explorations)
+        return None, total_explorations, 0, stats.elapsed
+
+if __name__ == "__main__":
+    astar_search = AStarSearch()
+    astar_search.heuristic = GreatCircleHeuristic.from_graph(astar_search.graph)
+    astar_search.run_search()
@@ -1,7 +1,38 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+import math
 import time
-from typing import List, Tuple, Optional, Any
-from graph import GraphPath, Graph
+from typing import Callable, List, Tuple, Optional, Any, Iterable, Dict, Union
+from graph import GraphPath, Graph, CSRGraph, GraphChange
+
+@dataclass
+class SearchStats:
+    """
+    The counters and timers of one search, timed with time.perf_counter_ns.
+    
+    Attributes:
+        nodes_expanded (int): The number of nodes taken from the frontier and expanded.
+        edges_relaxed (int): The number of edges examined from expanded nodes.
+        frontier_peak (int): The largest number of entries in the frontier, summed over both sides of bidirectional searches.
+        lookup_ns (int): The time spent looking up neighbors, only measured when the search is profiled.
+        queue_ns (int): The time spent pushing to and popping from the frontier, only measured when the search is profiled.
+        elapsed_ns (int): The total time of the search.
+        budget_exceeded (bool): True if the search stopped because it ran out of its expansion or time budget.
+    """
+    nodes_expanded: int = 0
+    edges_relaxed: int = 0
+    frontier_peak: int = 0
+    lookup_ns: int = 0
+    queue_ns: int = 0
+    elapsed_ns: int = 0
+    budget_exceeded: bool = False
+
+    @property
+    def elapsed(self) -> float:
+        """
+        The total time of the search, in seconds.
+        """
+        return self.elapsed_ns / 1e9
 
 class GraphSearch(ABC):
     """
@@ -9,6 +40,10 @@ class GraphSearch(ABC):
     
     Implements various helper methods to be used by all search algorithms:
         - find_node_by_name: Finds a node by its name.
+        - has_city: Checks whether a city is a node of the graph.
+        - get_neighbors: Returns the (neighbor, cost) pairs of a node from the active graph storage.
+        - get_reverse_neighbors: Returns the (predecessor, cost) pairs of the edges that lead into a node.
+        - reconstruct_path: Rebuilds a path from a predecessor map.
         - select_city: Prompts the user to select a city from a list of cities.
         - run_search: Runs the search algorithm with user input for start and goal cities.
     
@@ -19,35 +54,99 @@ class GraphSearch(ABC):
         graph_path (GraphPath): A graph path object.
         graph (Graph): A graph object.
         cities (List[str]): A list of the cities in the graph.
+        csr (Optional[CSRGraph]): A compact copy of the graph, used for neighbor iteration when enabled.
+        search_stats (SearchStats): The counters and timers of the last search.
+        profile (bool): If True, searches also time neighbor lookups and frontier operations, which slows every call down.
+        on_expand (Optional[Callable[[str, float], None]]): Called as on_expand(node, cost) for every expanded node.
+        on_relax (Optional[Callable[[str, str, float], None]]): Called as on_relax(node, neighbor, cost) for every examined edge,
+            with the cost of reaching the neighbor through it.
+        on_goal (Optional[Callable[[List[str], float], None]]): Called as on_goal(path, distance) when a path is found.
+        max_expansions (Optional[int]): The most nodes a search may expand, or None for no limit.
+        time_budget (Optional[float]): The most time a search may take, in seconds, or None for no limit.
+    
+    The hooks are None by default, and the searches skip them with a single check per call site.
+    
+    A search that runs out of its budget stops and returns no path, as if the goal were unreachable, with
+    search_stats.budget_exceeded set so the two cases can be told apart.
     
     Methods:
         create_graph_path: Creates a graph path object.
         find_node_by_name: Finds a node by its name.
+        has_city: Checks whether a city is a node of the graph.
+        get_neighbors: Returns the (neighbor, cost) pairs of a node from the active graph storage.
+        get_reverse_neighbors: Returns the (predecessor, cost) pairs of the edges that lead into a node.
+        reconstruct_path: Rebuilds a path from a predecessor map.
         select_city: Prompts the user to select a city from a list of cities.
         run_search: Runs the search algorithm with user input for start and goal cities.
         search: The main search method that must be implemented by the subclass.
     """
-    def __init__(self):
-        self.graph_path: GraphPath = self.create_graph_path()
-        self.graph: Graph = self.graph_path.get_graph()
+    def __init__(self, graph: Optional[Union[Graph, CSRGraph, GraphPath]] = None, compact: bool = False):
+        """
+        Initializes the graph used by the search.
+        
+        Args:
+            graph (Optional[Union[Graph, CSRGraph, GraphPath]]): A loaded graph to search instead of the built-in ten-city graph.
+                A CSRGraph, such as a memory-mapped binary graph, is always searched in compact form. The GraphPath
+                of another search shares that search's graph storage instead of wrapping the graph again.
+            compact (bool): If True, searches iterate neighbors from a CSRGraph built from the graph
+                instead of the per-node edge dictionaries.
+        """
+        self.graph_path: GraphPath = self.create_graph_path(graph)
         self.cities: List[str] = self.graph_path.get_cities_list()
+        compact = compact or isinstance(graph, CSRGraph) or self.graph_path.graph is None
+        self.csr: Optional[CSRGraph] = self.graph_path.get_compact_graph() if compact else None
+        # The reversed graph, built on first use by searches that expand backward from the goal
+        self._reverse: Optional[Union[Graph, CSRGraph]] = None
+        # Follow updates made to the graph in place, compact graphs are immutable
+        if self.graph_path.graph is not None:
+            self.graph_path.graph.subscribe(self._on_graph_change)
+        self.search_stats = SearchStats()
+        self.profile = False
+        self.on_expand: Optional[Callable[[str, float], None]] = None
+        self.on_relax: Optional[Callable[[str, str, float], None]] = None
+        self.on_goal: Optional[Callable[[List[str], float], None]] = None
+        self.max_expansions: Optional[int] = None
+        self.time_budget: Optional[float] = None
+
+    @property
+    def graph(self) -> Graph:
+        """
+        The searched graph, converted from its compact form on first use if only a CSRGraph was given.
+
+        A converted graph is followed like a graph given directly, so updating it drops the compact copy
+        and changes graph_version.
+        """
+        if self.graph_path.graph is None:
+            self.graph_path.get_graph().subscribe(self._on_graph_change)
+        return self.graph_path.graph
+
+    @property
+    def graph_version(self) -> int:
+        """
+        The version of the searched graph, which changes whenever the graph does. Compact graphs are immutable and stay at 0.
+        """
+        graph = self.graph_path.graph
+        return graph.version if graph is not None else 0
 
     @staticmethod
-    def create_graph_path() -> GraphPath:
+    def create_graph_path(graph: Optional[Union[Graph, CSRGraph, GraphPath]] = None) -> GraphPath:
         """
         Creates a graph path object.
         
         Args:
-            None
+            graph (Optional[Union[Graph, CSRGraph, GraphPath]]): A loaded graph to wrap, None for the built-in ten-city
+                graph, or a GraphPath to share as it is.
         
         Returns:
             GraphPath: A graph path object.
         """
-        return GraphPath()
+        if isinstance(graph, GraphPath):
+            return graph
+        return GraphPath(graph)
 
     def find_node_by_name(self, node_name: str) -> Optional[Any]:
         """
-        Finds a node by its name.
+        Finds a node by its name in O(1) through the graph's name index.
         
         Args:
             node_name (str): The name of the node to find.
@@ -55,10 +154,184 @@ class GraphSearch(ABC):
         Returns:
             Optional[Any]: The node if found, otherwise None.
         """
-        for node in self.graph.nodes:
-            if node.name == node_name:
-                return node
-        return None
+        return self.graph.get_node(node_name)
+
+    def has_city(self, node_name: str) -> bool:
+        """
+        Checks whether a city is a node of the graph, without converting a compact graph.
+        
+        Args:
+            node_name (str): The name of the city.
+        
+        Returns:
+            bool: True if the graph has a node with this name.
+        """
+        if self.graph_path.graph is not None:
+            return self.graph_path.graph.get_node(node_name) is not None
+        return self.graph_path.csr.node_id(node_name) is not None
+
+    def get_neighbors(self, node_name: str) -> Optional[Iterable[Tuple[str, int]]]:
+        """
+        Returns the (neighbor, cost) pairs of a node from the active graph storage.
+        
+        Args:
+            node_name (str): The name of the node to expand.
+        
+        Returns:
+            Optional[Iterable[Tuple[str, int]]]: The neighbor names and edge costs if the node is found, otherwise None.
+        """
+        if self.csr is not None:
+            return self.csr.neighbors_by_name(node_name)
+        node = self.find_node_by_name(node_name)
+        if node is None:
+            return None
+        return node.edges.items()
+
+    def get_reverse_neighbors(self, node_name: str) -> Optional[Iterable[Tuple[str, int]]]:
+        """
+        Returns the (predecessor, cost) pairs of the edges that lead into a node.
+        
+        The reversed graph is built from the active graph storage on first use.
+        
+        Args:
+            node_name (str): The name of the node to expand backward.
+        
+        Returns:
+            Optional[Iterable[Tuple[str, int]]]: The predecessor names and edge costs if the node is found, otherwise None.
+        """
+        if self._reverse is None:
+            self._reverse = self.csr.reversed() if self.csr is not None else self.graph.reversed()
+        if isinstance(self._reverse, CSRGraph):
+            return self._reverse.neighbors_by_name(node_name)
+        node = self._reverse.get_node(node_name)
+        if node is None:
+            return None
+        return node.edges.items()
+
+    def _on_graph_change(self, changes: List[GraphChange]) -> None:
+        """
+        Keeps the search's derived graph structures in sync with updates made to the graph.
+        
+        The compact copy of a graph is a snapshot, so a compact search falls back to the graph's live edge
+        dictionaries after an update. A reversed Graph is updated edge by edge instead of being rebuilt.
+        The city list is refreshed when nodes are added or removed.
+        
+        Args:
+            changes (List[GraphChange]): The changes made to the graph.
+        """
+        if any(change.kind in ('add_node', 'remove_node') for change in changes):
+            self.cities = self.graph_path.cities = [node.name for node in self.graph_path.graph.nodes]
+        if self.csr is not None:
+            self.csr = None
+            self.graph_path.csr = None
+        if isinstance(self._reverse, CSRGraph):
+            self._reverse = None
+        if self._reverse is None:
+            return
+        with self._reverse.batch():
+            for change in changes:
+                if change.kind == 'set_edge':
+                    self._reverse.set_edge(change.target, change.source, change.new_cost)
+                elif change.kind == 'remove_edge':
+                    self._reverse.remove_edge(change.target, change.source)
+
+    def _begin_search(self) -> SearchStats:
+        """
+        Starts the counters of a new search, kept as search_stats.
+        
+        Returns:
+            SearchStats: The counters to update.
+        """
+        self.search_stats = SearchStats()
+        return self.search_stats
+
+    def _budget(self, stats: SearchStats, start_time: int) -> Optional[Callable[[int], bool]]:
+        """
+        Returns the budget check of a search, called with the number of nodes expanded so far before each expansion.
+        
+        The check returns True, and marks the stats, once the search has used its expansions or its time.
+        Without a budget it is None, so unbounded searches skip it with a single check.
+        
+        Args:
+            stats (SearchStats): The counters of the search.
+            start_time (int): The perf_counter_ns() value when the search started.
+        
+        Returns:
+            Optional[Callable[[int], bool]]: The check, or None if the search has no budget.
+        """
+        if self.max_expansions is None and self.time_budget is None:
+            return None
+        max_expansions = self.max_expansions if self.max_expansions is not None else math.inf
+        deadline = start_time + self.time_budget * 1e9 if self.time_budget is not None else math.inf
+
+        def out_of_budget(expansions: int) -> bool:
+            if expansions >= max_expansions or time.perf_counter_ns() >= deadline:
+                stats.budget_exceeded = True
+                return True
+            return False
+        return out_of_budget
+
+    def _timed_lookup(self, stats: SearchStats, lookup: Callable) -> Callable:
+        """
+        Returns a neighbor lookup of a search, timed into the lookup_ns of the stats when profiling.
+        
+        When the search is not profiled, the lookup is returned unchanged and costs nothing extra.
+        
+        Args:
+            stats (SearchStats): The counters of the search.
+            lookup (Callable): The neighbor lookup.
+        
+        Returns:
+            Callable: The lookup to call.
+        """
+        return self._timed(stats, 'lookup_ns', lookup) if self.profile else lookup
+
+    def _timed_queue(self, stats: SearchStats, *operations: Callable) -> Tuple[Callable, ...]:
+        """
+        Returns the push and pop operations of a search's frontier, timed into the queue_ns of the stats when profiling.
+        
+        When the search is not profiled, the operations are returned unchanged and cost nothing extra.
+        
+        Args:
+            stats (SearchStats): The counters of the search.
+            operations (Callable): The frontier operations.
+        
+        Returns:
+            Tuple[Callable, ...]: The operations to call, in the order given.
+        """
+        return tuple(self._timed(stats, 'queue_ns', operation) for operation in operations) if self.profile else operations
+
+    @staticmethod
+    def _timed(stats: SearchStats, counter: str, operation: Callable) -> Callable:
+        """
+        Wraps an operation to add the time of every call to a counter of the stats.
+        """
+        def timed_operation(*args):
+            operation_start = time.perf_counter_ns()
+            result = operation(*args)
+            setattr(stats, counter, getattr(stats, counter) + time.perf_counter_ns() - operation_start)
+            return result
+        return timed_operation
+
+    @staticmethod
+    def reconstruct_path(parents: Dict[str, Optional[str]], goal: str) -> List[str]:
+        """
+        Rebuilds a path from a predecessor map.
+        
+        Args:
+            parents (Dict[str, Optional[str]]): Maps each reached node to the node it was reached from, and the start node to None.
+            goal (str): The last node of the path.
+        
+        Returns:
+            List[str]: The path from the start node to the goal.
+        """
+        path = [goal]
+        parent = parents[goal]
+        while parent is not None:
+            path.append(parent)
+            parent = parents[parent]
+        path.reverse()
+        return path
 
     def select_city(self, prompt: str) -> str:
         """
@@ -99,6 +372,7 @@ class GraphSearch(ABC):
         
         Returns:
             Tuple[Optional[List[str]], int, int, float]: The path, number of cities visited, total distance, and time taken.
+            The counters of the search are kept in search_stats.
             
         Raises:
             NotImplementedError: If the subclass does not implement the search method.
@@ -121,6 +395,10 @@ class GraphSearch(ABC):
             print(f"2) Number of cities visited: {cities_visited}")
             print(f"3) Time taken by the algorithm: {time_taken:.8f} seconds")
             print(f"4) Total distance: {total_distance} miles")
+        elif self.search_stats.budget_exceeded:
+            print(f"The search between {start_city} and {goal_city} ran out of its budget "
+                  f"after expanding {self.search_stats.nodes_expanded} cities.")
+            print(f"Time taken by the algorithm: {time_taken:.8f} seconds")
         else:
             print(f"No path found between {start_city} and {goal_city}.")
             print(f"Time taken by the algorithm: {time_taken:.8f} seconds")
\ No newline at end of file
@@ -0,0 +1,62 @@
+import random
+import time
+from typing import List, Optional
+from graph import Graph, Node
+from bfs_search import BFSSearch
+from graph_generators import ring_graph
+
+def linear_find_node_by_name(graph: Graph, node_name: str) -> Optional[Node]:
+    """
+    The original linear scan over graph.nodes, kept as the 'before' baseline.
+    """
+    for node in graph.nodes:
+        if node.name == node_name:
+            return node
+    return None
+
+def expansion_rate(find, graph: Graph, order: List[str]) -> float:
+    """
+    Measures how many node expansions (lookup + neighbor iteration) run per second.
+    
+    Args:
+        find: The lookup function, called as find(graph, name).
+        graph (Graph): The graph to expand.
+        order (List[str]): The node names to expand, in order.
+    
+    Returns:
+        float: The number of expansions per second.
+    """
+    start_time = time.perf_counter()
+    for name in order:
+        node = find(graph, name)
+        for _neighbor, _cost in node.edges.items():
+            pass
+    return len(order) / (time.perf_counter() - start_time)
+
+def run_benchmark(num_nodes: int = 100_000, linear_samples: int = 200):
+    """
+    Compares the expansion rate of the linear scan and the name index on a synthetic graph,
+    then times a full BFS traversal using the index.
+    
+    Args:
+        num_nodes (int): The number of nodes in the synthetic graph.
+        linear_samples (int): The number of expansions timed for the linear scan, which is too slow to run on every node.
+    """
+    graph = ring_graph(num_nodes)
+    rng = random.Random(1)
+    order = [f"N{rng.randrange(num_nodes)}" for _ in range(num_nodes)]
+
+    before = expansion_rate(linear_find_node_by_name, graph, order[:linear_samples])
+    after = expansion_rate(Graph.get_node, graph, order)
+    print(f"Synthetic graph: {num_nodes} nodes")
+    print(f"Before (linear scan): {before:,.0f} expansions/second")
+    print(f"After (name index):   {after:,.0f} expansions/second")
+    print(f"Speedup: {after / before:,.0f}x")
+
+    # Full BFS with an unreachable goal expands every node of the graph
+    bfs_search = BFSSearch(graph)
+    _, _, _, time_taken = bfs_search.search("N0", "unreachable")
+    print(f"Full BFS traversal: {num_nodes / time_taken:,.0f} expansions/second")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,375 @@
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+from algorithms import ALGORITHMS, create_search
+from bfs_search import BFSSearch
+from graph import Graph, CSRGraph
+from graph_generators import GENERATORS, generate_graph
+
+# Bumped when the layout of the JSON report changes
+REPORT_VERSION: int = 1
+
+# The metrics compared between runs, and whether a larger value is better
+COMPARED_METRICS: Dict[str, bool] = {
+    'p50_ms': False,
+    'p95_ms': False,
+    'p99_ms': False,
+    'expansions_per_second': True,
+    'peak_memory_bytes': False,
+}
+
+@dataclass
+class BenchmarkResult:
+    """
+    The measurements of one algorithm over the query set of one graph.
+
+    Attributes:
+        graph (str): The graph kind and size, e.g. 'grid-10000'.
+        algorithm (str): The algorithm name, as in ALGORITHMS.
+        num_nodes (int): The number of nodes in the graph.
+        num_edges (int): The number of (directed) edges in the graph.
+        queries (int): The number of queries run.
+        found (int): The number of queries for which a path was found.
+        timeouts (int): The number of queries stopped at the time limit, counted at the limit in the latencies.
+        p50_ms (float): The median query latency, in milliseconds.
+        p95_ms (float): The 95th percentile query latency, in milliseconds.
+        p99_ms (float): The 99th percentile query latency, in milliseconds.
+        expansions_per_second (float): The nodes expanded by the completed queries divided by their total time.
+        peak_memory_bytes (int): The largest amount of memory allocated during one query, or 0 if not measured.
+    """
+    graph: str
+    algorithm: str
+    num_nodes: int
+    num_edges: int
+    queries: int
+    found: int
+    timeouts: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    expansions_per_second: float
+    peak_memory_bytes: int = 0
+
+@dataclass
+class Regression:
+    """
+    A metric that got worse than the baseline by more than the threshold.
+
+    Attributes:
+        graph (str): The graph of the result.
+        algorithm (str): The algorithm of the result.
+        metric (str): The metric name, one of COMPARED_METRICS.
+        baseline (float): The value in the baseline report.
+        current (float): The value in the current report.
+    """
+    graph: str
+    algorithm: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        """
+        The relative change from the baseline, e.g. 0.25 for 25% more.
+        """
+        return self.current / self.baseline - 1 if self.baseline else float('inf')
+
+    def __str__(self) -> str:
+        return (f"{self.graph} {self.algorithm} {self.metric}: {self.baseline:,.2f} -> {self.current:,.2f} "
+                f"({self.change:+.1%})")
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """
+    Returns a percentile of sorted values by the nearest-rank method.
+
+    Args:
+        sorted_values (Sequence[float]): The values, in increasing order.
+        fraction (float): The percentile as a fraction, e.g. 0.95.
+
+    Returns:
+        float: The percentile, or 0 if there are no values.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(len(sorted_values) * fraction))
+    return sorted_values[rank - 1]
+
+def largest_component(graph: Union[Graph, CSRGraph]) -> Set[str]:
+    """
+    Returns the nodes of the largest connected component, following edges in both directions.
+
+    Args:
+        graph (Union[Graph, CSRGraph]): The graph.
+
+    Returns:
+        Set[str]: The node names of the largest component.
+    """
+    search = BFSSearch(graph)
+    largest: Set[str] = set()
+    seen: Set[str] = set()
+    for name in search.cities:
+        if name in seen:
+            continue
+        component = {name}
+        frontier = [name]
+        while frontier:
+            node = frontier.pop()
+            for neighbors in (search.get_neighbors(node), search.get_reverse_neighbors(node)):
+                for neighbor, _ in neighbors or ():
+                    if neighbor not in component:
+                        component.add(neighbor)
+                        frontier.append(neighbor)
+        seen |= component
+        if len(component) > len(largest):
+            largest = component
+    return largest
+
+def make_queries(graph: Union[Graph, CSRGraph], num_queries: int, seed: int = 0) -> List[Tuple[str, str]]:
+    """
+    Draws a fixed set of (start, goal) queries between random distinct nodes of the largest component.
+
+    Goals are kept reachable, so the latencies compare searches that succeed rather than full explorations.
+
+    Args:
+        graph (Union[Graph, CSRGraph]): The graph to query; its edges are treated as undirected.
+        num_queries (int): The number of queries.
+        seed (int): The seed of the random number generator, so every run uses the same queries.
+
+    Returns:
+        List[Tuple[str, str]]: The queries.
+    """
+    names = sorted(largest_component(graph), key=str)
+    rng = random.Random(seed)
+    return [tuple(rng.sample(names, 2)) for _ in range(num_queries)]
+
+def benchmark_algorithm(algorithm: str, graph: Union[Graph, CSRGraph], queries: Sequence[Tuple[str, str]],
+                        graph_label: str, measure_memory: bool = True,
+                        query_timeout: Optional[float] = 1.0) -> BenchmarkResult:
+    """
+    Runs one algorithm over a query set and summarizes latency, throughput and memory.
+
+    Latencies are timed with perf_counter_ns around each search() call. Memory is measured in a second
+    pass with tracemalloc, which slows Python down and would distort the latencies. DFS tries every simple
+    path, which can take exponential time, so each search gets a time budget of query_timeout seconds.
+
+    Args:
+        algorithm (str): One of the names in ALGORITHMS.
+        graph (Union[Graph, CSRGraph]): The graph to search.
+        queries (Sequence[Tuple[str, str]]): The (start, goal) queries.
+        graph_label (str): The name of the graph in the result.
+        measure_memory (bool): If False, skip the memory pass and report 0.
+        query_timeout (Optional[float]): The time limit of each query in seconds, or None for no limit.
+
+    Returns:
+        BenchmarkResult: The measurements.
+    """
+    search = create_search(algorithm, graph)
+    search.time_budget = query_timeout
+    latencies: List[int] = []
+    # The nodes expanded and time taken by the queries that completed within the time limit
+    expansions = completed_ns = 0
+    found = 0
+    # Queries that timed out are skipped in the memory pass
+    completed: List[Tuple[str, str]] = []
+    for start, goal in queries:
+        start_time = time.perf_counter_ns()
+        path, _, _, _ = search.search(start, goal)
+        latencies.append(time.perf_counter_ns() - start_time)
+        if search.search_stats.budget_exceeded:
+            continue
+        expansions += search.search_stats.nodes_expanded
+        completed_ns += latencies[-1]
+        completed.append((start, goal))
+        found += path is not None
+
+    peak_memory = 0
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            for start, goal in completed:
+                tracemalloc.reset_peak()
+                baseline, _ = tracemalloc.get_traced_memory()
+                search.search(start, goal)
+                _, peak = tracemalloc.get_traced_memory()
+                peak_memory = max(peak_memory, peak - baseline)
+        finally:
+            tracemalloc.stop()
+
+    latencies.sort()
+    completed_seconds = completed_ns / 1e9
+    num_edges = graph.num_edges if isinstance(graph, CSRGraph) else sum(len(node.edges) for node in graph.nodes)
+    num_nodes = graph.num_nodes if isinstance(graph, CSRGraph) else len(graph.nodes)
+    return BenchmarkResult(
+        graph=graph_label,
+        algorithm=algorithm,
+        num_nodes=num_nodes,
+        num_edges=num_edges,
+        queries=len(queries),
+        found=found,
+        timeouts=len(queries) - len(completed),
+        p50_ms=percentile(latencies, 0.50) / 1e6,
+        p95_ms=percentile(latencies, 0.95) / 1e6,
+        p99_ms=percentile(latencies, 0.99) / 1e6,
+        expansions_per_second=expansions / completed_seconds if completed_seconds else 0.0,
+        peak_memory_bytes=peak_memory,
+    )
+
+def run_suite(kinds: Sequence[str] = tuple(GENERATORS), sizes: Sequence[int] = (1_000, 10_000),
+              algorithms: Sequence[str] = ('bfs', 'dfs', 'ucs'), num_queries: int = 100, seed: int = 0,
+              compact: bool = False, measure_memory: bool = True,
+              query_timeout: Optional[float] = 1.0) -> Dict[str, Any]:
+    """
+    Runs every algorithm over a seeded query set on every generated graph.
+
+    Args:
+        kinds (Sequence[str]): The graph kinds, from GENERATORS.
+        sizes (Sequence[int]): The graph sizes, in edges.
+        algorithms (Sequence[str]): The algorithms, from ALGORITHMS.
+        num_queries (int): The number of queries per graph.
+        seed (int): The seed of the graphs and queries.
+        compact (bool): If True, search a CSRGraph copy of each graph instead of the per-node dictionaries.
+        measure_memory (bool): If False, skip the memory pass.
+        query_timeout (Optional[float]): The time limit of each query in seconds, or None for no limit.
+
+    Returns:
+        Dict[str, Any]: The report, with the run settings, the environment, and one entry per result.
+
+    Raises:
+        ValueError: If a graph kind or algorithm is unknown.
+    """
+    for algorithm in algorithms:
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm {algorithm!r}, expected one of {', '.join(ALGORITHMS)}")
+    results: List[BenchmarkResult] = []
+    for kind in kinds:
+        for size in sizes:
+            graph: Union[Graph, CSRGraph] = generate_graph(kind, size, seed)
+            if compact:
+                graph = CSRGraph.from_graph(graph)
+            queries = make_queries(graph, num_queries, seed)
+            for algorithm in algorithms:
+                results.append(benchmark_algorithm(algorithm, graph, queries, f"{kind}-{size}",
+                                                   measure_memory, query_timeout))
+    return {
+        'version': REPORT_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {'seed': seed, 'queries': num_queries, 'compact': compact, 'query_timeout': query_timeout},
+        'results': [asdict(result) for result in results],
+    }
+
+def save_report(report: Dict[str, Any], path: str) -> None:
+    """
+    Saves a report to a JSON file.
+
+    Args:
+        report (Dict[str, Any]): The report returned by run_suite().
+        path (str): The path of the file to write.
+    """
+    with open(path, 'w') as file:
+        json.dump(report, file, indent=2)
+
+def load_report(path: str) -> Dict[str, Any]:
+    """
+    Loads a report saved with save_report().
+
+    Args:
+        path (str): The path of the file to read.
+
+    Returns:
+        Dict[str, Any]: The report.
+
+    Raises:
+        ValueError: If the report was written by an incompatible version.
+    """
+    with open(path) as file:
+        report = json.load(file)
+    if report.get('version') != REPORT_VERSION:
+        raise ValueError(f"{path} has report version {report.get('version')}, expected {REPORT_VERSION}")
+    return report
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.10) -> List[Regression]:
+    """
+    Compares two reports and returns the metrics that got worse by more than the threshold.
+
+    Only results present in both reports are compared. Reports from different machines or settings
+    are not comparable, so compare runs of the same command on the same machine.
+
+    Args:
+        baseline (Dict[str, Any]): The earlier report.
+        current (Dict[str, Any]): The new report.
+        threshold (float): The relative change tolerated, e.g. 0.10 for 10%.
+
+    Returns:
+        List[Regression]: The regressions, empty if there are none.
+    """
+    baseline_results = {(result['graph'], result['algorithm']): result for result in baseline['results']}
+    regressions: List[Regression] = []
+    for result in current['results']:
+        previous = baseline_results.get((result['graph'], result['algorithm']))
+        if previous is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            before, after = previous[metric], result[metric]
+            # A metric that was not measured in either run is not compared
+            if not before or not after:
+                continue
+            if (after < before * (1 - threshold)) if higher_is_better else (after > before * (1 + threshold)):
+                regressions.append(Regression(result['graph'], result['algorithm'], metric, before, after))
+    return regressions
+
+def print_report(report: Dict[str, Any]) -> None:
+    """
+    Prints the results of a report as a table.
+
+    Args:
+        report (Dict[str, Any]): The report returned by run_suite().
+    """
+    print(f"{'graph':<20} {'algorithm':<18} {'nodes':>9} {'edges':>10} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'expansions/s':>13} {'peak KiB':>9} {'timeouts':>8}")
+    for result in report['results']:
+        print(f"{result['graph']:<20} {result['algorithm']:<18} {result['num_nodes']:>9,} {result['num_edges']:>10,} "
+              f"{result['p50_ms']:>9.3f} {result['p95_ms']:>9.3f} {result['p99_ms']:>9.3f} "
+              f"{result['expansions_per_second']:>13,.0f} {result['peak_memory_bytes'] / 1024:>9,.0f} "
+              f"{result['timeouts']:>8}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the searches on synthetic graphs.")
+    parser.add_argument('--kinds', nargs='+', default=list(GENERATORS), choices=list(GENERATORS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1_000, 10_000], help="graph sizes, in edges")
+    parser.add_argument('--algorithms', nargs='+', default=['bfs', 'dfs', 'ucs'], choices=list(ALGORITHMS))
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--compact', action='store_true', help="search CSR copies of the graphs")
+    parser.add_argument('--timeout', type=float, default=1.0, help="time limit of each query in seconds, 0 for none")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--output', help="write the JSON report to this file")
+    parser.add_argument('--baseline', help="compare against this JSON report, exiting with 1 on regressions")
+    parser.add_argument('--threshold', type=float, default=0.10, help="relative change tolerated (default 0.10)")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.kinds, args.sizes, args.algorithms, args.queries, args.seed,
+                       args.compact, not args.no_memory, args.timeout or None)
+    print_report(report)
+    if args.output:
+        save_report(report, args.output)
+    if args.baseline:
+        regressions = compare_reports(load_report(args.baseline), report, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print("No regressions.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,6 @@
 from collections import deque
 import time
-from typing import List, Tuple, Optional, Deque, Set
+from typing import Iterator, List, Tuple, Optional, Deque, Dict, Set
 from base_search import GraphSearch
 
 class BFSSearch(GraphSearch):
@@ -9,6 +9,7 @@ class BFSSearch(GraphSearch):
     
     Methods:
         search: Concrete implementation of the abstract search() method for BFS.
+        iter_levels: Yields the cities reached from a start city, one level of equal edge count at a time.
     """
     def search(self, start: str, goal: str) -> Tuple[Optional[List[str]], int, int, float]:
         """
@@ -21,44 +22,94 @@ class BFSSearch(GraphSearch):
         Returns:
             Tuple[Optional[List[str]], int, int, float]: The path, number of cities visited, total distance, and time taken.
             Returns None if no path is found, along with 0 for the number of cities visited, 0 for the total distance, and time taken.
+            The counters of the search are kept in search_stats.
         """
-        # Initialize the queue with the start node, its path, and distance
-        queue: Deque[Tuple[str, List[str], int]] = deque([(start, [start], 0)])
-        # Initialize the visited set with the start node
-        visited: Set[str] = set([start])
+        # Start the counters and timing of the search
+        stats = self._begin_search()
+        start_time = time.perf_counter_ns()
 
-        # Start timing the search
-        start_time = time.time()
+        # Initialize the queue with the start node and its distance
+        queue: Deque[Tuple[str, int]] = deque([(start, 0)])
+        # Initialize the predecessor map with the start node, it doubles as the visited set
+        parents: Dict[str, Optional[str]] = {start: None}
+        
+        # Bind the neighbor lookup and queue operations, timed when profiling, and the hooks
+        get_neighbors = self._timed_lookup(stats, self.get_neighbors)
+        push, pop = self._timed_queue(stats, queue.append, queue.popleft)
+        on_expand, on_relax, on_goal = self.on_expand, self.on_relax, self.on_goal
+        out_of_budget = self._budget(stats, start_time)
 
-        # Process the queue until it's empty
+        # Process the queue until it's empty or the budget runs out
         while queue:
+            if out_of_budget is not None and out_of_budget(stats.nodes_expanded):
+                break
+            
             # Pop the leftmost element from the queue
-            (node, path, distance) = queue.popleft()
+            (node, distance) = pop()
+            stats.nodes_expanded += 1
+            if on_expand is not None:
+                on_expand(node, distance)
             
-            # If the current node is the goal, return the path, number of cities visited, total distance, and time taken
+            # If the current node is the goal, rebuild the path and return it with the number of cities visited, total distance, and time taken
             if node == goal:
-                end_time = time.time()
-                return path, len(path) - 1, distance, end_time - start_time
+                path = self.reconstruct_path(parents, goal)
+                if on_goal is not None:
+                    on_goal(path, distance)
+                stats.elapsed_ns = time.perf_counter_ns() - start_time
+                return path, len(path) - 1, distance, stats.elapsed
             
-            # Find the current node in the graph
-            current_node = self.find_node_by_name(node)
+            # Find the current node's neighbors in the graph
+            neighbors = get_neighbors(node)
             
             # If the current node is not found, continue to the next iteration
-            if current_node is None:
+            if neighbors is None:
                 continue
 
             # Iterate through the current node's neighbors
-            for neighbor, cost in current_node.edges.items():
-                # If the neighbor has not been visited, add it to the visited set and append to the queue the neighbor with the updated path and distance
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    new_path = path + [neighbor]
-                    new_distance = distance + cost
-                    queue.append((neighbor, new_path, new_distance))
+            for neighbor, cost in neighbors:
+                stats.edges_relaxed += 1
+                if on_relax is not None:
+                    on_relax(node, neighbor, distance + cost)
+                # If the neighbor has not been visited, record its predecessor and append it to the queue with the updated distance
+                if neighbor not in parents:
+                    parents[neighbor] = node
+                    push((neighbor, distance + cost))
+            
+            # Track the largest queue
+            if len(queue) > stats.frontier_peak:
+                stats.frontier_peak = len(queue)
 
-        # If no path is found, return None, 0, 0, and the time taken
-        end_time = time.time()
-        return None, 0, 0, end_time - start_time
+        # If no path is found within the budget, return None, 0, 0, and the time taken
+        stats.elapsed_ns = time.perf_counter_ns() - start_time
+        return None, 0, 0, stats.elapsed
+
+    def iter_levels(self, start: str) -> Iterator[List[str]]:
+        """
+        Yields the cities reachable from the start, grouped by the number of edges on their shortest unweighted path.
+        
+        Each level is only computed when it is asked for, so a caller that stops early, e.g. once a target
+        appears or after a number of hops, does not explore the rest of the graph.
+        
+        Args:
+            start (str): The start city.
+        
+        Returns:
+            Iterator[List[str]]: The levels, starting with [start]; the cities of a level are in the order BFS reaches them.
+        """
+        visited: Set[str] = {start}
+        level = [start]
+        while level:
+            yield level
+            next_level: List[str] = []
+            for node in level:
+                neighbors = self.get_neighbors(node)
+                if neighbors is None:
+                    continue
+                for neighbor, _ in neighbors:
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        next_level.append(neighbor)
+            level = next_level
 
 if __name__ == "__main__":
     bfs_search = BFSSearch()
@@ -0,0 +1,264 @@
+import math
+import time
+from typing import Callable, Dict, Iterable, List, Tuple, Optional, Set
+from base_search import GraphSearch, SearchStats
+from ucs_search import UCSSearch
+
+class BidirectionalBFSSearch(GraphSearch):
+    """
+    Bidirectional Breadth-First Search implementation.
+    
+    Runs one BFS forward from the start and one backward from the goal, always expanding a full level of
+    the smaller frontier, and stops at the level where the two searches meet.
+    
+    Methods:
+        search: Concrete implementation of the abstract search() method for bidirectional BFS.
+    """
+    def search(self, start: str, goal: str) -> Tuple[Optional[List[str]], int, int, float]:
+        """
+        Concrete implementation of the search() method for bidirectional BFS.
+        
+        Args:
+            start (str): The start city.
+            goal (str): The goal city.
+        
+        Returns:
+            Tuple[Optional[List[str]], int, int, float]: The path with the fewest edges, number of cities visited, total distance, and time taken.
+            Returns None if no path is found, along with 0 for the number of cities visited, 0 for the total distance, and time taken.
+            The counters of the search are kept in search_stats.
+        """
+        # Start the counters and timing of the search
+        stats = self._begin_search()
+        start_time = time.perf_counter_ns()
+        
+        # If the start is the goal, there is nothing to explore
+        if start == goal:
+            if self.on_goal is not None:
+                self.on_goal([start], 0)
+            stats.elapsed_ns = time.perf_counter_ns() - start_time
+            return [start], 0, 0, stats.elapsed
+        
+        # Predecessor, depth, and distance of every node reached by each side; the backward predecessor points towards the goal
+        forward_parents: Dict[str, Optional[str]] = {start: None}
+        backward_parents: Dict[str, Optional[str]] = {goal: None}
+        forward_depths: Dict[str, int] = {start: 0}
+        backward_depths: Dict[str, int] = {goal: 0}
+        forward_distances: Dict[str, int] = {start: 0}
+        backward_distances: Dict[str, int] = {goal: 0}
+        forward_frontier: List[str] = [start]
+        backward_frontier: List[str] = [goal]
+        
+        # Bind the neighbor lookups of both directions, timed when profiling
+        get_neighbors = self._timed_lookup(stats, self.get_neighbors)
+        get_reverse_neighbors = self._timed_lookup(stats, self.get_reverse_neighbors)
+        out_of_budget = self._budget(stats, start_time)
+        
+        meeting_node: Optional[str] = None
+        
+        # Expand one level at a time until a side runs out of nodes, the searches meet, or the budget runs out
+        while forward_frontier and backward_frontier and meeting_node is None and not stats.budget_exceeded:
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_frontier, meeting_node = self._expand_level(
+                    stats, out_of_budget, forward_frontier, get_neighbors,
+                    forward_parents, forward_depths, forward_distances, backward_depths)
+            else:
+                backward_frontier, meeting_node = self._expand_level(
+                    stats, out_of_budget, backward_frontier, get_reverse_neighbors,
+                    backward_parents, backward_depths, backward_distances, forward_depths)
+            stats.frontier_peak = max(stats.frontier_peak, len(forward_frontier) + len(backward_frontier))
+        
+        # If no path is found within the budget, return None, 0, 0, and the time taken
+        if meeting_node is None:
+            stats.elapsed_ns = time.perf_counter_ns() - start_time
+            return None, 0, 0, stats.elapsed
+        
+        # Join the forward path to the meeting node with the backward path from it to the goal
+        path = self.reconstruct_path(forward_parents, meeting_node)
+        path += self.reconstruct_path(backward_parents, meeting_node)[-2::-1]
+        distance = forward_distances[meeting_node] + backward_distances[meeting_node]
+        if self.on_goal is not None:
+            self.on_goal(path, distance)
+        stats.elapsed_ns = time.perf_counter_ns() - start_time
+        return path, len(path) - 1, distance, stats.elapsed
+
+    def _expand_level(self, stats: SearchStats, out_of_budget: Optional[Callable[[int], bool]], frontier: List[str],
+                      get_neighbors: Callable[[str], Optional[Iterable[Tuple[str, int]]]], parents: Dict[str, Optional[str]],
+                      depths: Dict[str, int], distances: Dict[str, int], other_depths: Dict[str, int]) -> Tuple[List[str], Optional[str]]:
+        """
+        Expands every node of one side's frontier and checks for nodes already reached by the other side.
+        
+        The whole level is expanded even after a meeting node is found, so the returned meeting node
+        is the one with the fewest total edges. A level cut short by the budget returns no next level and no meeting node.
+        
+        Args:
+            stats (SearchStats): The counters of the search.
+            out_of_budget (Optional[Callable[[int], bool]]): The budget check of the search, or None if it has no budget.
+            frontier (List[str]): The nodes of the current level.
+            get_neighbors (Callable): Returns the neighbors to expand for this side's direction.
+            parents (Dict[str, Optional[str]]): This side's predecessor map.
+            depths (Dict[str, int]): This side's number of edges to every reached node.
+            distances (Dict[str, int]): This side's distance to every reached node.
+            other_depths (Dict[str, int]): The other side's number of edges to every reached node.
+        
+        Returns:
+            Tuple[List[str], Optional[str]]: The next level, and the best meeting node if the sides met.
+        """
+        on_expand, on_relax = self.on_expand, self.on_relax
+        next_frontier: List[str] = []
+        meeting_node: Optional[str] = None
+        best_depth = math.inf
+        for node in frontier:
+            if out_of_budget is not None and out_of_budget(stats.nodes_expanded):
+                return [], None
+            stats.nodes_expanded += 1
+            if on_expand is not None:
+                on_expand(node, distances[node])
+            neighbors = get_neighbors(node)
+            if neighbors is None:
+                continue
+            for neighbor, cost in neighbors:
+                stats.edges_relaxed += 1
+                if on_relax is not None:
+                    on_relax(node, neighbor, distances[node] + cost)
+                if neighbor in parents:
+                    continue
+                parents[neighbor] = node
+                depths[neighbor] = depths[node] + 1
+                distances[neighbor] = distances[node] + cost
+                next_frontier.append(neighbor)
+                if neighbor in other_depths and depths[neighbor] + other_depths[neighbor] < best_depth:
+                    best_depth = depths[neighbor] + other_depths[neighbor]
+                    meeting_node = neighbor
+        return next_frontier, meeting_node
+
+class BidirectionalUCSSearch(UCSSearch):
+    """
+    Bidirectional Uniform Cost Search (bidirectional Dijkstra) implementation.
+    
+    Runs one UCS forward from the start and one backward from the goal, always advancing the side whose
+    next node is closer. Every relaxed edge that reaches a node already reached by the other side is a
+    candidate path; the search stops once the two smallest frontier costs add up to at least the best
+    candidate, since no path through an unsettled node can be shorter.
+    
+    Attributes:
+        queue_stats (QueueStats): The queue counters of the last search, summed over both sides.
+        exploration_path (List[str]): A list of the cities explored, by either side.
+        unique_cities (Set[str]): A set of the cities settled, by either side.
+    
+    Methods:
+        search(self, start: str, goal: str) -> Tuple[Optional[List[str]], int, int, float]:
+            Concrete implementation of the search() method for bidirectional UCS.
+    """
+    name: str = "Bidirectional Uniform Cost Search"
+
+    def search(self, start: str, goal: str) -> Tuple[Optional[List[str]], int, int, float]:
+        """
+        Concrete implementation of the search() method for bidirectional UCS.
+        
+        Args:
+            start (str): The start city.
+            goal (str): The goal city.
+            
+        Returns:
+            Tuple[Optional[List[str]], int, int, float]: The path, number of cities visited, total distance, and time taken.
+            
+            Returns None if no path is found, along with the number of cities visited, 0 for the total distance, and time taken.
+            The counters of the search are kept in search_stats.
+        """
+        # Start the counters and timing of the search
+        stats = self._begin_search()
+        start_time = time.perf_counter_ns()
+        on_expand, on_relax, on_goal = self.on_expand, self.on_relax, self.on_goal
+        
+        # Best known distance and predecessor of every node reached by each side; the backward predecessor points towards the goal
+        forward_distances: Dict[str, int] = {start: 0}
+        backward_distances: Dict[str, int] = {goal: 0}
+        forward_parents: Dict[str, Optional[str]] = {start: None}
+        backward_parents: Dict[str, Optional[str]] = {goal: None}
+        forward_queue = self.queue_factory()
+        backward_queue = self.queue_factory()
+        forward_queue.push(0, start)
+        backward_queue.push(0, goal)
+        forward_settled: Set[str] = set()
+        backward_settled: Set[str] = set()
+        
+        # Bind the neighbor lookups and queue operations of both sides, timed when profiling
+        forward_neighbors = self._timed_lookup(stats, self.get_neighbors)
+        backward_neighbors = self._timed_lookup(stats, self.get_reverse_neighbors)
+        forward_push, forward_pop, backward_push, backward_pop = self._timed_queue(
+            stats, forward_queue.push, forward_queue.pop, backward_queue.push, backward_queue.pop)
+        out_of_budget = self._budget(stats, start_time)
+        
+        # Initialize the unique cities and exploration path
+        self.unique_cities = set()
+        self.exploration_path = []
+        total_explorations = 0
+        
+        # Length of the shortest path found so far and the node where its two halves meet
+        best_distance = 0 if start == goal else math.inf
+        meeting_node: Optional[str] = start if start == goal else None
+        
+        while forward_queue and backward_queue:
+            # Stopping rule: no path through an unsettled node can beat the best one found
+            forward_cost, backward_cost = forward_queue.peek()[0], backward_queue.peek()[0]
+            if forward_cost + backward_cost >= best_distance:
+                break
+            # A path found before the budget runs out is not known to be the shortest, so it is dropped
+            if out_of_budget is not None and out_of_budget(total_explorations):
+                meeting_node = None
+                break
+            
+            # Advance the side whose next node is closer
+            if forward_cost <= backward_cost:
+                push, pop, distances, parents, settled = forward_push, forward_pop, forward_distances, forward_parents, forward_settled
+                other_distances, get_neighbors = backward_distances, forward_neighbors
+            else:
+                push, pop, distances, parents, settled = backward_push, backward_pop, backward_distances, backward_parents, backward_settled
+                other_distances, get_neighbors = forward_distances, backward_neighbors
+            
+            # Outdated entries are skipped by the queue
+            (cost, node) = pop()
+            self.exploration_path.append(node)
+            total_explorations += 1
+            settled.add(node)
+            self.unique_cities.add(node)
+            if on_expand is not None:
+                on_expand(node, cost)
+            
+            neighbors = get_neighbors(node)
+            if neighbors is None:
+                continue
+            
+            for neighbor, edge_cost in neighbors:
+                new_cost = cost + edge_cost
+                stats.edges_relaxed += 1
+                if on_relax is not None:
+                    on_relax(node, neighbor, new_cost)
+                if neighbor not in settled and new_cost < distances.get(neighbor, math.inf):
+                    distances[neighbor] = new_cost
+                    parents[neighbor] = node
+                    push(new_cost, neighbor)
+                # Check whether the edge closes a shorter path through the other side
+                if neighbor in other_distances and distances[neighbor] + other_distances[neighbor] < best_distance:
+                    best_distance = distances[neighbor] + other_distances[neighbor]
+                    meeting_node = neighbor
+        
+        self.queue_stats = forward_queue.stats + backward_queue.stats
+        
+        # If no path is found within the budget, record the end time and return None,
+        # total explorations, 0 for the total distance, and time taken
+        if meeting_node is None:
+            self._end_search(stats, start_time, total_explorations)
+            return None, total_explorations, 0, stats.elapsed
+        
+        # Join the forward path to the meeting node with the backward path from it to the goal
+        path = self.reconstruct_path(forward_parents, meeting_node)
+        path += self.reconstruct_path(backward_parents, meeting_node)[-2::-1]
+        if on_goal is not None:
+            on_goal(path, best_distance)
+        self._end_search(stats, start_time, total_explorations)
+        return path, total_explorations, best_distance, stats.elapsed
+
+if __name__ == "__main__":
+    bidirectional_ucs_search = BidirectionalUCSSearch()
+    bidirectional_ucs_search.run_search()
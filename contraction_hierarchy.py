@@ -0,0 +1,350 @@
+import heapq
+import json
+import math
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+from graph import Graph, CSRGraph, GraphChange
+from priority_queues import PriorityQueue, LazyHeapQueue
+from ucs_search import UCSSearch
+
+class ContractionHierarchy:
+    """
+    A contraction hierarchy: a node order plus shortcut edges that let point-to-point queries only search upward.
+    
+    Nodes are contracted one by one, least important first. Contracting a node removes it from the remaining
+    graph and adds a shortcut u -> w for every pair of remaining neighbors u -> node -> w whose shortest path
+    needs the node (no witness path avoids it). A query then runs a forward search from the start and a backward
+    search from the goal that both only move to higher-ranked nodes, and shortcuts are unpacked back into the
+    original cities.
+    
+    Attributes:
+        ranks (Dict[str, int]): The contraction rank of every node; higher means contracted later.
+        upward_edges (Dict[str, Dict[str, int]]): Edges u -> w with rank[w] > rank[u], used by the forward search.
+        downward_edges (Dict[str, Dict[str, int]]): For every node w, the edges u -> w with rank[u] > rank[w], used backward.
+        middles (Dict[Tuple[str, str], str]): The node a shortcut u -> w was created for, used to unpack it.
+    
+    Methods:
+        build(cls, graph, witness_settle_limit) -> ContractionHierarchy: Contracts a graph.
+        unpack_path(self, path: List[str]) -> List[str]: Expands the shortcuts of a path into original edges.
+        save(self, path: str) -> None: Saves the hierarchy to a JSON file.
+        load(cls, path: str) -> ContractionHierarchy: Loads a hierarchy saved with save().
+    """
+    def __init__(self, ranks: Dict[str, int], upward_edges: Dict[str, Dict[str, int]],
+                 downward_edges: Dict[str, Dict[str, int]], middles: Dict[Tuple[str, str], str]):
+        self.ranks = ranks
+        self.upward_edges = upward_edges
+        self.downward_edges = downward_edges
+        self.middles = middles
+
+    @property
+    def num_shortcuts(self) -> int:
+        """
+        Returns the number of shortcut edges in the hierarchy.
+        """
+        return len(self.middles)
+
+    @classmethod
+    def build(cls, graph: Union[Graph, CSRGraph], witness_settle_limit: int = 64) -> 'ContractionHierarchy':
+        """
+        Contracts a graph.
+        
+        Nodes are ordered by edge difference (shortcuts added minus edges removed) plus the number of already
+        contracted neighbors, with lazy updates: a node's priority is recomputed when it reaches the front of the
+        queue, and it is contracted only if it is still the least important.
+        
+        Args:
+            graph (Union[Graph, CSRGraph]): The graph to contract.
+            witness_settle_limit (int): The most nodes a witness search settles before giving up and adding the shortcut.
+        
+        Returns:
+            ContractionHierarchy: The hierarchy.
+        """
+        graph = graph.to_graph() if isinstance(graph, CSRGraph) else graph
+        # The remaining graph, as outgoing and incoming edges, shortcuts included
+        out_edges: Dict[str, Dict[str, int]] = {}
+        in_edges: Dict[str, Dict[str, int]] = {}
+        for node in graph.nodes:
+            out_edges.setdefault(node.name, {})
+            in_edges.setdefault(node.name, {})
+            for neighbor, cost in node.edges.items():
+                out_edges.setdefault(neighbor, {})
+                in_edges.setdefault(neighbor, {})
+                if neighbor != node.name and cost < out_edges[node.name].get(neighbor, math.inf):
+                    out_edges[node.name][neighbor] = cost
+                    in_edges[neighbor][node.name] = cost
+
+        hierarchy = cls({}, {}, {}, {})
+        contracted_neighbors: Dict[str, int] = {name: 0 for name in out_edges}
+
+        def priority(node: str) -> Tuple[int, List[Tuple[str, str, int]]]:
+            shortcuts = hierarchy._find_shortcuts(node, out_edges, in_edges, witness_settle_limit)
+            return len(shortcuts) - len(out_edges[node]) - len(in_edges[node]) + contracted_neighbors[node], shortcuts
+
+        queue = [(priority(name)[0], name) for name in out_edges]
+        heapq.heapify(queue)
+        while queue:
+            _, node = heapq.heappop(queue)
+            # Lazy update: contract the node only if it is still the least important
+            current, shortcuts = priority(node)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, node))
+                continue
+
+            hierarchy.ranks[node] = len(hierarchy.ranks)
+            for source, target, cost in shortcuts:
+                if cost < out_edges[source].get(target, math.inf):
+                    out_edges[source][target] = cost
+                    in_edges[target][source] = cost
+                    hierarchy.middles[(source, target)] = node
+
+            # Every remaining neighbor is ranked higher, so the node's remaining edges are its upward and downward edges
+            hierarchy.upward_edges[node] = out_edges.pop(node)
+            hierarchy.downward_edges[node] = in_edges.pop(node)
+            for neighbor in hierarchy.upward_edges[node]:
+                del in_edges[neighbor][node]
+                contracted_neighbors[neighbor] += 1
+            for neighbor in hierarchy.downward_edges[node]:
+                del out_edges[neighbor][node]
+                contracted_neighbors[neighbor] += 1
+        return hierarchy
+
+    @staticmethod
+    def _find_shortcuts(node: str, out_edges: Dict[str, Dict[str, int]], in_edges: Dict[str, Dict[str, int]],
+                        settle_limit: int) -> List[Tuple[str, str, int]]:
+        """
+        Returns the shortcuts contracting a node would need: u -> w for every pair of neighbors u -> node -> w
+        that has no witness path of at most the same cost avoiding the node.
+        """
+        shortcuts: List[Tuple[str, str, int]] = []
+        outgoing = out_edges[node]
+        for source, in_cost in in_edges[node].items():
+            targets = {target: in_cost + out_cost for target, out_cost in outgoing.items() if target != source}
+            if not targets:
+                continue
+            # Witness search: a local UCS from the source that skips the node being contracted
+            max_cost = max(targets.values())
+            distances: Dict[str, int] = {}
+            queue: List[Tuple[int, str]] = [(0, source)]
+            while queue and len(distances) < settle_limit:
+                cost, current = heapq.heappop(queue)
+                if current in distances:
+                    continue
+                distances[current] = cost
+                if cost > max_cost:
+                    break
+                for neighbor, edge_cost in out_edges[current].items():
+                    if neighbor != node and neighbor not in distances:
+                        heapq.heappush(queue, (cost + edge_cost, neighbor))
+            for target, shortcut_cost in targets.items():
+                if distances.get(target, math.inf) > shortcut_cost:
+                    shortcuts.append((source, target, shortcut_cost))
+        return shortcuts
+
+    def unpack_path(self, path: List[str]) -> List[str]:
+        """
+        Expands the shortcuts of a path into the original edges.
+        
+        Args:
+            path (List[str]): A path that may use shortcut edges.
+        
+        Returns:
+            List[str]: The same path over original edges only.
+        """
+        if not path:
+            return path
+        unpacked = [path[0]]
+        for source, target in zip(path, path[1:]):
+            # Depth-first expansion of the edge, kept as a stack of edges still to emit
+            stack = [(source, target)]
+            while stack:
+                edge_source, edge_target = stack.pop()
+                middle = self.middles.get((edge_source, edge_target))
+                if middle is None:
+                    unpacked.append(edge_target)
+                else:
+                    stack.append((middle, edge_target))
+                    stack.append((edge_source, middle))
+        return unpacked
+
+    def save(self, path: str) -> None:
+        """
+        Saves the hierarchy to a JSON file.
+        
+        Args:
+            path (str): The path of the file to write.
+        """
+        with open(path, 'w') as file:
+            json.dump({
+                'ranks': self.ranks,
+                'upward_edges': self.upward_edges,
+                'downward_edges': self.downward_edges,
+                'middles': [[source, target, middle] for (source, target), middle in self.middles.items()],
+            }, file)
+
+    @classmethod
+    def load(cls, path: str) -> 'ContractionHierarchy':
+        """
+        Loads a hierarchy saved with save().
+        
+        Args:
+            path (str): The path of the file to read.
+        
+        Returns:
+            ContractionHierarchy: The hierarchy.
+        """
+        with open(path) as file:
+            data = json.load(file)
+        middles = {(source, target): middle for source, target, middle in data['middles']}
+        return cls(data['ranks'], data['upward_edges'], data['downward_edges'], middles)
+
+class CHSearch(UCSSearch):
+    """
+    Contraction Hierarchy Search implementation.
+    
+    Answers point-to-point queries with a bidirectional UCS over a ContractionHierarchy in which both sides only
+    move to higher-ranked nodes, then unpacks the shortcuts of the path found. It returns the same tuple as
+    UCSSearch, and records the cities settled by either side in exploration_path and unique_cities.
+    
+    Shortcuts cannot be repaired edge by edge, so after the graph is updated the hierarchy is rebuilt before the next query.
+    
+    Attributes:
+        hierarchy (ContractionHierarchy): The preprocessed hierarchy of the graph.
+    
+    Methods:
+        search(self, start: str, goal: str) -> Tuple[Optional[List[str]], int, int, float]:
+            Concrete implementation of the search() method for contraction hierarchies.
+    """
+    name: str = "Contraction Hierarchy Search"
+
+    def __init__(self, graph: Optional[Union[Graph, CSRGraph]] = None, compact: bool = False,
+                 hierarchy: Optional[ContractionHierarchy] = None,
+                 queue_factory: Callable[[], PriorityQueue] = LazyHeapQueue):
+        """
+        Initializes the search, contracting the graph unless a hierarchy is given.
+        
+        Args:
+            graph (Optional[Union[Graph, CSRGraph]]): A loaded graph to search instead of the built-in ten-city graph.
+            compact (bool): If True, the graph is also kept in compact form for the other search helpers.
+            hierarchy (Optional[ContractionHierarchy]): A hierarchy of the graph, e.g. loaded with ContractionHierarchy.load.
+            queue_factory (Callable[[], PriorityQueue]): Creates the priority queues of each search.
+        """
+        super().__init__(graph, compact, queue_factory)
+        self.hierarchy = hierarchy if hierarchy is not None else ContractionHierarchy.build(self.graph)
+        self._hierarchy_stale = False
+
+    def _on_graph_change(self, changes: List[GraphChange]) -> None:
+        super()._on_graph_change(changes)
+        self._hierarchy_stale = True
+
+    def search(self, start: str, goal: str) -> Tuple[Optional[List[str]], int, int, float]:
+        """
+        Concrete implementation of the search() method for contraction hierarchies.
+        
+        Args:
+            start (str): The start city.
+            goal (str): The goal city.
+            
+        Returns:
+            Tuple[Optional[List[str]], int, int, float]: The path, number of cities visited, total distance, and time taken.
+            
+            Returns None if no path is found, along with the number of cities visited, 0 for the total distance, and time taken.
+            The counters of the search are kept in search_stats.
+        """
+        # Rebuild the hierarchy if the graph changed since it was built
+        if self._hierarchy_stale:
+            self.hierarchy = ContractionHierarchy.build(self.graph)
+            self._hierarchy_stale = False
+        
+        # Start the counters and timing of the search
+        stats = self._begin_search()
+        start_time = time.perf_counter_ns()
+        on_expand, on_relax, on_goal = self.on_expand, self.on_relax, self.on_goal
+        
+        # Best known distance and predecessor of every node reached by each side; the backward predecessor points towards the goal
+        forward_distances: Dict[str, int] = {start: 0}
+        backward_distances: Dict[str, int] = {goal: 0}
+        forward_parents: Dict[str, Optional[str]] = {start: None}
+        backward_parents: Dict[str, Optional[str]] = {goal: None}
+        forward_queue = self.queue_factory()
+        backward_queue = self.queue_factory()
+        forward_queue.push(0, start)
+        backward_queue.push(0, goal)
+        forward_settled: Set[str] = set()
+        backward_settled: Set[str] = set()
+        
+        # Bind the edge lookups and queue operations of both sides, timed when profiling
+        upward_edges = self._timed_lookup(stats, self.hierarchy.upward_edges.get)
+        downward_edges = self._timed_lookup(stats, self.hierarchy.downward_edges.get)
+        forward_push, forward_pop, backward_push, backward_pop = self._timed_queue(
+            stats, forward_queue.push, forward_queue.pop, backward_queue.push, backward_queue.pop)
+        out_of_budget = self._budget(stats, start_time)
+        
+        # Initialize the unique cities and exploration path
+        self.unique_cities = set()
+        self.exploration_path = []
+        total_explorations = 0
+        
+        best_distance = math.inf
+        meeting_node: Optional[str] = None
+        
+        # Both sides only go upward, so each one runs until its next node is no closer than the best path found
+        while True:
+            forward_cost = forward_queue.peek()[0] if forward_queue else math.inf
+            backward_cost = backward_queue.peek()[0] if backward_queue else math.inf
+            if min(forward_cost, backward_cost) >= best_distance:
+                break
+            # A path found before the budget runs out is not known to be the shortest, so it is dropped
+            if out_of_budget is not None and out_of_budget(total_explorations):
+                meeting_node = None
+                break
+            
+            if forward_cost <= backward_cost:
+                push, pop, distances, parents, settled = forward_push, forward_pop, forward_distances, forward_parents, forward_settled
+                other_distances, get_edges = backward_distances, upward_edges
+            else:
+                push, pop, distances, parents, settled = backward_push, backward_pop, backward_distances, backward_parents, backward_settled
+                other_distances, get_edges = forward_distances, downward_edges
+            
+            (cost, node) = pop()
+            self.exploration_path.append(node)
+            self.unique_cities.add(node)
+            total_explorations += 1
+            settled.add(node)
+            if on_expand is not None:
+                on_expand(node, cost)
+            
+            # Check whether the two sides meet at this node
+            if node in other_distances and cost + other_distances[node] < best_distance:
+                best_distance = cost + other_distances[node]
+                meeting_node = node
+            
+            for neighbor, edge_cost in get_edges(node, {}).items():
+                new_cost = cost + edge_cost
+                stats.edges_relaxed += 1
+                if on_relax is not None:
+                    on_relax(node, neighbor, new_cost)
+                if neighbor not in settled and new_cost < distances.get(neighbor, math.inf):
+                    distances[neighbor] = new_cost
+                    parents[neighbor] = node
+                    push(new_cost, neighbor)
+        
+        self.queue_stats = forward_queue.stats + backward_queue.stats
+        
+        # If no path is found within the budget, record the end time and return None,
+        # total explorations, 0 for the total distance, and time taken
+        if meeting_node is None:
+            self._end_search(stats, start_time, total_explorations)
+            return None, total_explorations, 0, stats.elapsed
+        
+        # Join both halves at the meeting node and unpack the shortcuts
+        path = self.reconstruct_path(forward_parents, meeting_node)
+        path += self.reconstruct_path(backward_parents, meeting_node)[-2::-1]
+        path = self.hierarchy.unpack_path(path)
+        if on_goal is not None:
+            on_goal(path, best_distance)
+        self._end_search(stats, start_time, total_explorations)
+        return path, total_explorations, best_distance, stats.elapsed
+
+if __name__ == "__main__":
+    ch_search = CHSearch()
+    ch_search.run_search()
@@ -1,14 +1,40 @@
 import time
-from typing import List, Tuple, Optional, Set
-from base_search import GraphSearch
+from typing import Callable, Iterable, Iterator, List, Tuple, Optional, Set, Union
+from base_search import GraphSearch, SearchStats
+from graph import Graph, CSRGraph
 
 class DFSSearch(GraphSearch):
     """
     Depth-First Search implementation.
     
+    Explores simple paths with a single shared stack and on-path set, backtracking when a node has no unexplored neighbors left.
+    The path is read off the stack, so the memory used grows with the depth of the search, not with the size of the graph.
+    
+    Attributes:
+        max_depth (Optional[int]): The most edges on an explored path, or None for no limit. Nodes at this depth are
+            checked against the goal but not expanded.
+    
     Methods:
         search: Concrete implementation of the abstract search() method for DFS.
+        iter_paths: Yields the simple paths from the start to the goal as they are found.
     """
+    def __init__(self, graph: Optional[Union[Graph, CSRGraph]] = None, compact: bool = False, max_depth: Optional[int] = None):
+        """
+        Initializes the DFS search.
+        
+        Args:
+            graph (Optional[Union[Graph, CSRGraph]]): A loaded graph to search instead of the built-in ten-city graph.
+            compact (bool): If True, neighbors are iterated from a CSRGraph instead of the per-node edge dictionaries.
+            max_depth (Optional[int]): The most edges on an explored path, or None for no limit.
+        
+        Raises:
+            ValueError: If max_depth is negative.
+        """
+        if max_depth is not None and max_depth < 0:
+            raise ValueError("max_depth must not be negative.")
+        super().__init__(graph, compact)
+        self.max_depth = max_depth
+
     def search(self, start: str, goal: str) -> Tuple[Optional[List[str]], int, int, float]:
         """
         Concrete implementation of the search() method for DFS.
@@ -19,44 +45,189 @@ class DFSSearch(GraphSearch):
         
         Returns:
             Tuple[Optional[List[str]], int, int, float]: The path, number of cities visited, total distance, and time taken.
-            Returns None if no path is found, along with 0 for the number of cities visited, 0 for the total distance, and time taken.
+            Returns None if no path is found within max_depth, along with 0 for the number of cities visited, 0 for the total distance, and time taken.
+            The counters of the search are kept in search_stats.
+        """
+        # Start the counters and timing of the search
+        stats = self._begin_search()
+        start_time = time.perf_counter_ns()
+        path, distance, _ = next(self._simple_paths(stats, start, goal, self.max_depth, self._budget(stats, start_time)))
+        return self._end_search(stats, start_time, path, distance)
+
+    def iter_paths(self, start: str, goal: str) -> Iterator[Tuple[List[str], int]]:
+        """
+        Yields the simple paths from the start to the goal, up to max_depth edges long, as DFS finds them.
+        
+        Paths are produced one at a time, so a caller can stop after the first few, e.g. with itertools.islice.
+        The paths are not ordered by distance, and a graph can have exponentially many of them.
+        
+        Args:
+            start (str): The start city.
+            goal (str): The goal city.
+        
+        Returns:
+            Iterator[Tuple[List[str], int]]: Every path with its total distance.
+        """
+        for path, distance, _ in self._simple_paths(SearchStats(), start, goal, self.max_depth, None):
+            if path is None:
+                return
+            yield path, distance
+
+    def _end_search(self, stats: SearchStats, start_time: int, path: Optional[List[str]],
+                    distance: int) -> Tuple[Optional[List[str]], int, int, float]:
+        """
+        Completes the counters of a search and returns its result.
+        """
+        if path is not None and self.on_goal is not None:
+            self.on_goal(path, distance)
+        stats.elapsed_ns = time.perf_counter_ns() - start_time
+        if path is None:
+            return None, 0, 0, stats.elapsed
+        return path, len(path) - 1, distance, stats.elapsed
+
+    def _simple_paths(self, stats: SearchStats, start: str, goal: str, max_depth: Optional[int],
+                      out_of_budget: Optional[Callable[[int], bool]]) -> Iterator[Tuple[Optional[List[str]], int, bool]]:
+        """
+        Explores the simple paths from the start, up to max_depth edges long, yielding every one that reaches the goal.
+        
+        After the last path, or once the budget runs out, a final (None, 0, cut_off) is yielded, so the first
+        item is either the first path found or the end of the search.
+        
+        Args:
+            stats (SearchStats): The counters of the search, added to.
+            start (str): The start city.
+            goal (str): The goal city.
+            max_depth (Optional[int]): The most edges on an explored path, or None for no limit.
+            out_of_budget (Optional[Callable[[int], bool]]): The budget check of the search, or None if it has no budget.
+        
+        Returns:
+            Iterator[Tuple[Optional[List[str]], int, bool]]: Every path found with its distance, then None; the
+                final item tells whether any path was cut off at max_depth, i.e. whether a deeper search could reach more nodes.
         """
-        # Start timing the search
-        start_time = time.time()
+        # If the start is the goal, there is nothing to explore
+        if start == goal:
+            yield [start], 0, False
+            yield None, 0, False
+            return
         
-        # Initialize the stack with the start node, its path, distance, and visited set
-        stack: List[Tuple[str, List[str], int, Set[str]]] = [(start, [start], 0, set([start]))]
+        # Initialize the set of nodes on the current path, shared by the whole search
+        on_path: Set[str] = {start}
+        cut_off = False
         
-        # Process the stack until it's empty
+        # Initialize the stack, which holds every node on the current path with its distance and unexplored neighbors
+        stack: List[Tuple[str, int, Iterator[Tuple[str, int]]]] = []
+        
+        # Bind the neighbor lookup and stack operations, timed when profiling, and the hooks
+        get_neighbors = self._timed_lookup(stats, self.get_neighbors)
+        push, pop = self._timed_queue(stats, stack.append, stack.pop)
+        on_expand, on_relax = self.on_expand, self.on_relax
+        
+        # Expand the start node, unless the depth limit leaves no edge to follow
+        if max_depth == 0:
+            yield None, 0, True
+            return
+        if out_of_budget is not None and out_of_budget(stats.nodes_expanded):
+            yield None, 0, False
+            return
+        stats.nodes_expanded += 1
+        if on_expand is not None:
+            on_expand(start, 0)
+        push((start, 0, self._unexplored_neighbors(get_neighbors(start))))
+        stats.frontier_peak = max(stats.frontier_peak, 1)
+        
+        # Process the stack until it's empty or the budget runs out
         while stack:
-            # Pop the last element from the stack
-            current, path, distance, visited = stack.pop()
-            
-            # If the current node is the goal, return the path, number of cities visited, total distance, and time taken
-            if current == goal:
-                end_time = time.time()
-                return path, len(path) - 1, distance, end_time - start_time
+            # Peek at the deepest node on the current path
+            current, distance, neighbors = stack[-1]
             
-            # Find the current node in the graph
-            current_node = self.find_node_by_name(current)
-            
-            # If the current node is not found, continue to the next iteration
-            if current_node is None:
-                continue
-
-            # Iterate through the current node's neighbors
-            for neighbor, cost in current_node.edges.items():
-                # If the neighbor has not been visited, add it to the visited set and append to the stack the neighbor with the updated path and distance
-                if neighbor not in visited:
-                    new_path = path + [neighbor]
-                    new_distance = distance + cost
-                    new_visited = visited.copy()
-                    new_visited.add(neighbor)
-                    stack.append((neighbor, new_path, new_distance, new_visited))
-        
-        # If no path is found, return None, 0, 0, and the time taken
-        end_time = time.time()
-        return None, 0, 0, end_time - start_time
+            # Advance to the next neighbor that is not already on the current path
+            for neighbor, cost in neighbors:
+                stats.edges_relaxed += 1
+                if on_relax is not None:
+                    on_relax(current, neighbor, distance + cost)
+                if neighbor not in on_path:
+                    # If the neighbor is the goal, the current path leads to it; paths through the goal are not simple
+                    if neighbor == goal:
+                        yield [node for node, _, _ in stack] + [goal], distance + cost, cut_off
+                        continue
+                    
+                    # Nodes at the depth limit are not expanded
+                    if max_depth is not None and len(stack) >= max_depth:
+                        cut_off = True
+                        continue
+                    
+                    # Expand the neighbor, going one level deeper
+                    if out_of_budget is not None and out_of_budget(stats.nodes_expanded):
+                        yield None, 0, cut_off
+                        return
+                    on_path.add(neighbor)
+                    stats.nodes_expanded += 1
+                    if on_expand is not None:
+                        on_expand(neighbor, distance + cost)
+                    push((neighbor, distance + cost, self._unexplored_neighbors(get_neighbors(neighbor))))
+                    if len(stack) > stats.frontier_peak:
+                        stats.frontier_peak = len(stack)
+                    break
+            else:
+                # Every neighbor has been explored, backtrack
+                pop()
+                on_path.discard(current)
+        
+        yield None, 0, cut_off
+
+    @staticmethod
+    def _unexplored_neighbors(neighbors: Optional[Iterable[Tuple[str, int]]]) -> Iterator[Tuple[str, int]]:
+        """
+        Returns an iterator over a node's neighbors in the order DFS explores them.
+        
+        Neighbors are explored last to first, the order in which a stack of all neighbors would be popped.
+        
+        Args:
+            neighbors (Optional[Iterable[Tuple[str, int]]]): The node's neighbors, or None if the node is not found.
+        
+        Returns:
+            Iterator[Tuple[str, int]]: The neighbor names and edge costs, empty if the node is not found.
+        """
+        if neighbors is None:
+            return iter(())
+        return reversed(list(neighbors))
+
+class IterativeDeepeningDFSSearch(DFSSearch):
+    """
+    Iterative-deepening Depth-First Search implementation.
+    
+    Runs depth-limited DFS with a limit of 1, 2, 3, ... edges until the goal is found, the graph is exhausted, or
+    max_depth is reached. It finds the path with the fewest edges, like BFS, while using memory that grows only with
+    the depth of the path. Shallow levels are explored again by every iteration; search_stats add up all of them.
+    
+    Methods:
+        search: Concrete implementation of the abstract search() method for iterative-deepening DFS.
+    """
+    def search(self, start: str, goal: str) -> Tuple[Optional[List[str]], int, int, float]:
+        """
+        Concrete implementation of the search() method for iterative-deepening DFS.
+        
+        Args:
+            start (str): The start city.
+            goal (str): The goal city.
+        
+        Returns:
+            Tuple[Optional[List[str]], int, int, float]: The path with the fewest edges, number of cities visited, total distance, and time taken.
+            Returns None if no path is found within max_depth, along with 0 for the number of cities visited, 0 for the total distance, and time taken.
+            The counters of the search are kept in search_stats.
+        """
+        # Start the counters and timing of the search, shared by all iterations
+        stats = self._begin_search()
+        start_time = time.perf_counter_ns()
+        out_of_budget = self._budget(stats, start_time)
+        
+        # Deepen until a path is found, no path was cut off by the limit, the limit reaches max_depth, or the budget runs out
+        depth_limit = 0
+        while True:
+            path, distance, cut_off = next(self._simple_paths(stats, start, goal, depth_limit, out_of_budget))
+            if path is not None or not cut_off or depth_limit == self.max_depth or stats.budget_exceeded:
+                return self._end_search(stats, start_time, path, distance)
+            depth_limit += 1
 
 if __name__ == "__main__":
     dfs_search = DFSSearch()
@@ -0,0 +1,127 @@
+import math
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+from ucs_search import UCSSearch
+
+class DistanceMatrix:
+    """
+    A matrix of shortest distances between source and target cities, with math.inf where a target is unreachable.
+    
+    The distances are stored row-major in a flat array of doubles, so the matrix converts to a NumPy array
+    without copying: numpy.asarray(matrix) or numpy.asarray(matrix.as_memoryview()).
+    
+    Attributes:
+        sources (List[str]): The source cities, one per row.
+        targets (List[str]): The target cities, one per column.
+        values (array): The distances, row-major.
+        paths (Optional[List[List[Optional[List[str]]]]]): The shortest path for every source and target, if requested.
+    
+    Methods:
+        distance(self, source: str, target: str) -> float: Returns the distance between two cities of the matrix.
+        as_memoryview(self) -> memoryview: Returns a 2D view of the distances.
+        tolist(self) -> List[List[float]]: Returns the distances as nested lists.
+    """
+    def __init__(self, sources: List[str], targets: List[str], values: array,
+                 paths: Optional[List[List[Optional[List[str]]]]] = None):
+        self.sources = sources
+        self.targets = targets
+        self.values = values
+        self.paths = paths
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """
+        Returns the number of rows and columns.
+        """
+        return len(self.sources), len(self.targets)
+
+    def __getitem__(self, index: Tuple[int, int]) -> float:
+        row, column = index
+        return self.values[row * len(self.targets) + column]
+
+    def distance(self, source: str, target: str) -> float:
+        """
+        Returns the distance between two cities of the matrix.
+        
+        Args:
+            source (str): A source city.
+            target (str): A target city.
+        
+        Returns:
+            float: The shortest distance, or math.inf if the target is unreachable.
+        
+        Raises:
+            ValueError: If the source or the target is not in the matrix.
+        """
+        return self[self.sources.index(source), self.targets.index(target)]
+
+    def as_memoryview(self) -> memoryview:
+        """
+        Returns a 2D view of the distances, usable by anything that supports the buffer protocol, such as NumPy.
+        """
+        return memoryview(self.values).cast('B').cast('d', self.shape)
+
+    def tolist(self) -> List[List[float]]:
+        """
+        Returns the distances as nested lists, one per source.
+        """
+        columns = len(self.targets)
+        return [list(self.values[row * columns:(row + 1) * columns]) for row in range(len(self.sources))]
+
+    def __array__(self, dtype=None, copy=None):
+        # NumPy's copy semantics: True always copies, False never copies, None copies only for a dtype conversion
+        import numpy
+        matrix = numpy.frombuffer(self.values, dtype=numpy.float64).reshape(self.shape)
+        converts = dtype is not None and numpy.dtype(dtype) != matrix.dtype
+        if copy is False and converts:
+            raise ValueError(f"Converting the distance matrix to {numpy.dtype(dtype)} needs a copy.")
+        if converts:
+            return matrix.astype(dtype)
+        return matrix.copy() if copy else matrix
+
+def compute_distance_matrix(sources: Sequence[str], targets: Sequence[str], search: Optional[UCSSearch] = None,
+                            with_paths: bool = False) -> DistanceMatrix:
+    """
+    Computes the shortest distances from every source to every target.
+    
+    Instead of one search per pair, it runs one single-source expansion per distinct source, which stops as soon as
+    every target is settled. When there are fewer distinct targets than sources, it expands backward from each
+    target instead, so the number of expansions is the smaller of the two.
+    
+    Args:
+        sources (Sequence[str]): The source cities.
+        targets (Sequence[str]): The target cities.
+        search (Optional[UCSSearch]): The search whose graph and queue are used; defaults to a UCSSearch over the built-in graph.
+        with_paths (bool): If True, the shortest paths are returned in the matrix as well.
+    
+    Returns:
+        DistanceMatrix: The distances, and the paths if requested.
+    """
+    search = search if search is not None else UCSSearch()
+    sources, targets = list(sources), list(targets)
+    distinct_sources, distinct_targets = list(dict.fromkeys(sources)), list(dict.fromkeys(targets))
+    reverse = len(distinct_targets) < len(distinct_sources)
+
+    # One expansion per distinct origin: the sources, or the targets when expanding backward
+    trees: Dict[str, Tuple[Dict[str, int], Dict[str, Optional[str]]]] = {}
+    for origin in (distinct_targets if reverse else distinct_sources):
+        trees[origin] = search.shortest_path_tree(origin, distinct_sources if reverse else distinct_targets, reverse)
+
+    values = array('d')
+    paths: Optional[List[List[Optional[List[str]]]]] = [] if with_paths else None
+    for source in sources:
+        row_paths: List[Optional[List[str]]] = []
+        for target in targets:
+            origin, destination = (target, source) if reverse else (source, target)
+            distances, parents = trees[origin]
+            distance = distances.get(destination)
+            values.append(math.inf if distance is None else distance)
+            if with_paths:
+                path = search.reconstruct_path(parents, destination) if distance is not None else None
+                # A backward tree leads from the target to the source
+                if path is not None and reverse:
+                    path.reverse()
+                row_paths.append(path)
+        if paths is not None:
+            paths.append(row_paths)
+    return DistanceMatrix(sources, targets, values, paths)
@@ -1,5 +1,10 @@
+import math
+import types
+import weakref
+from array import array
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Dict, List
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
 
 @dataclass
 class Node:
@@ -9,43 +14,325 @@ class Node:
     Attributes:
         name (str): The name of the city.
         edges (Dict[str, int]): A dictionary of the cities that can be reached from the current city and the cost to get to that city.
+        coordinates (Optional[Tuple[float, float]]): The (latitude, longitude) of the city, if known.
     """
     name: str = field(default_factory=str)
     
     # String is the city, int is the cost to get to that city from the current city
     edges: Dict[str, int] = field(default_factory=dict)
+    
+    coordinates: Optional[Tuple[float, float]] = None
+
+@dataclass
+class GraphChange:
+    """
+    One change made to a graph, as passed to the graph's listeners.
+    
+    Replacing or removing a node is also reported edge by edge, so listeners that track edges only need to handle
+    'set_edge' and 'remove_edge'.
+    
+    Attributes:
+        kind (str): One of 'add_node', 'remove_node', 'set_edge' or 'remove_edge'.
+        source (str): The node added or removed, or the node the edge leaves from.
+        target (Optional[str]): The node the edge leads to, for edge changes.
+        old_cost (Optional[int]): The cost of the edge before the change, or None if it did not exist.
+        new_cost (Optional[int]): The cost of the edge after the change, or None if it was removed.
+    """
+    kind: str
+    source: str
+    target: Optional[str] = None
+    old_cost: Optional[int] = None
+    new_cost: Optional[int] = None
 
 @dataclass
 class Graph:
     """
     A graph of cities and their connections.
     
+    Nodes are also indexed by name so that lookups are O(1). Use add_node and remove_node
+    to keep the index consistent; the index is rebuilt if the node list is changed directly.
+    
+    The graph can be updated in place with add_node, remove_node, set_edge and remove_edge. Every update
+    increments the version and is reported to the subscribed listeners as a list of GraphChange; updates made
+    inside a batch() block are reported together, with a single version increment, when the block ends.
+    
     Attributes:
         nodes (List[Node]): A list of nodes in the graph.
+        version (int): Incremented by every change made through the graph's methods, so caches can tell when they are stale.
+    
+    Methods:
+        add_node(self, node: Node) -> None: Adds a node to the graph.
+        remove_node(self, name: str) -> Optional[Node]: Removes a node from the graph.
+        set_edge(self, source: str, target: str, cost: int) -> None: Adds an edge or changes its cost.
+        remove_edge(self, source: str, target: str) -> Optional[int]: Removes an edge.
+        batch(self): Groups the updates made inside a with block into one change.
+        subscribe(self, listener) -> None: Calls a listener with the changes made to the graph.
+        unsubscribe(self, listener) -> None: Stops calling a listener.
+        get_node(self, name: str) -> Optional[Node]: Finds a node by its name.
+        reversed(self) -> Graph: Returns a copy of the graph with every edge reversed.
     """
     nodes: List[Node] = field(default_factory=list)
     
+    version: int = field(default=0, init=False, repr=False, compare=False)
+    
+    # Maps a node name to its node, kept in sync with nodes
+    _index: Dict[str, Node] = field(default_factory=dict, init=False, repr=False, compare=False)
+    
+    # Listeners, held through weak references for bound methods, and the state of the current batch
+    _listeners: List[Callable[[], Optional[Callable[[List[GraphChange]], None]]]] = field(
+        default_factory=list, init=False, repr=False, compare=False)
+    _batch_depth: int = field(default=0, init=False, repr=False, compare=False)
+    _batch_changed: bool = field(default=False, init=False, repr=False, compare=False)
+    _pending_changes: List[GraphChange] = field(default_factory=list, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._rebuild_index()
+
+    def __getstate__(self):
+        # Listeners are tied to this process's objects, copies and pickles start without any
+        state = self.__dict__.copy()
+        state['_listeners'] = []
+        return state
+
+    def _rebuild_index(self) -> None:
+        """
+        Rebuilds the name index from the node list.
+        """
+        self._index = {node.name: node for node in self.nodes}
+
+    def add_node(self, node: Node) -> None:
+        """
+        Adds a node to the graph, replacing any node with the same name.
+        
+        Args:
+            node (Node): The node to add.
+        """
+        existing = self.get_node(node.name)
+        if existing is not None:
+            self.nodes[self.nodes.index(existing)] = node
+        else:
+            self.nodes.append(node)
+        self._index[node.name] = node
+        if self._listeners:
+            old_edges = existing.edges if existing is not None else {}
+            changes = [GraphChange('add_node', node.name)]
+            changes += [GraphChange('remove_edge', node.name, target, cost, None)
+                        for target, cost in old_edges.items() if target not in node.edges]
+            changes += [GraphChange('set_edge', node.name, target, old_edges.get(target), cost)
+                        for target, cost in node.edges.items() if old_edges.get(target) != cost]
+            self._record(changes)
+        else:
+            self._record([])
+
+    def remove_node(self, name: str) -> Optional[Node]:
+        """
+        Removes a node from the graph, with its outgoing edges and the edges of other nodes that lead to it.
+        
+        Finding the edges that lead to the node scans every node, as the graph keeps no reverse index.
+        
+        Args:
+            name (str): The name of the node to remove.
+        
+        Returns:
+            Optional[Node]: The removed node if found, otherwise None.
+        """
+        node = self.get_node(name)
+        if node is None:
+            return None
+        self.nodes.remove(node)
+        del self._index[name]
+        # Drop the edges into the node, so it can no longer be reached
+        incoming = [(other.name, other.edges.pop(name)) for other in self.nodes if name in other.edges]
+        if self._listeners:
+            changes = [GraphChange('remove_edge', source, name, cost, None) for source, cost in incoming]
+            changes += [GraphChange('remove_edge', name, target, cost, None) for target, cost in node.edges.items()]
+            self._record(changes + [GraphChange('remove_node', name)])
+        else:
+            self._record([])
+        return node
+
+    def set_edge(self, source: str, target: str, cost: int) -> None:
+        """
+        Adds an edge or changes its cost in place. Missing nodes are added.
+        
+        Args:
+            source (str): The node the edge leaves from.
+            target (str): The node the edge leads to.
+            cost (int): The new cost of the edge.
+        """
+        with self.batch():
+            if self.get_node(target) is None:
+                self.add_node(Node(target))
+            node = self.get_node(source)
+            if node is None:
+                self.add_node(Node(source, {target: cost}))
+                return
+            old_cost = node.edges.get(target)
+            if old_cost == cost:
+                return
+            node.edges[target] = cost
+            self._record([GraphChange('set_edge', source, target, old_cost, cost)] if self._listeners else [])
+
+    def remove_edge(self, source: str, target: str) -> Optional[int]:
+        """
+        Removes an edge.
+        
+        Args:
+            source (str): The node the edge leaves from.
+            target (str): The node the edge leads to.
+        
+        Returns:
+            Optional[int]: The cost of the removed edge, or None if there was no such edge.
+        """
+        node = self.get_node(source)
+        if node is None or target not in node.edges:
+            return None
+        cost = node.edges.pop(target)
+        self._record([GraphChange('remove_edge', source, target, cost, None)] if self._listeners else [])
+        return cost
+
+    @contextmanager
+    def batch(self):
+        """
+        Groups the updates made inside a with block: the version is incremented once, and listeners are called once
+        with all the changes, when the outermost block ends.
+        
+        Example:
+            with graph.batch():
+                graph.set_edge('Baltimore', 'Washington DC', 60)
+                graph.remove_edge('Richmond', 'Norfolk')
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._batch_changed:
+                changes, self._pending_changes, self._batch_changed = self._pending_changes, [], False
+                self.version += 1
+                self._notify(changes)
+
+    def subscribe(self, listener: Callable[[List[GraphChange]], None]) -> None:
+        """
+        Calls a listener with the list of changes after every update or batch of updates.
+        
+        Bound methods are held through weak references, so subscribing does not keep their object alive.
+        
+        Args:
+            listener (Callable[[List[GraphChange]], None]): The listener.
+        """
+        if isinstance(listener, types.MethodType):
+            self._listeners.append(weakref.WeakMethod(listener))
+        else:
+            self._listeners.append(lambda: listener)
+
+    def unsubscribe(self, listener: Callable[[List[GraphChange]], None]) -> None:
+        """
+        Stops calling a listener.
+        
+        Args:
+            listener (Callable[[List[GraphChange]], None]): A listener passed to subscribe.
+        """
+        self._listeners = [reference for reference in self._listeners if reference() != listener]
+
+    def _record(self, changes: List[GraphChange]) -> None:
+        """
+        Records an update: bumps the version and notifies listeners now, or when the current batch ends.
+        """
+        if self._batch_depth:
+            self._batch_changed = True
+            self._pending_changes.extend(changes)
+            return
+        self.version += 1
+        self._notify(changes)
+
+    def _notify(self, changes: List[GraphChange]) -> None:
+        """
+        Calls every live listener with the changes, dropping listeners whose object no longer exists.
+        """
+        if not changes:
+            return
+        live = []
+        for reference in self._listeners:
+            listener = reference()
+            if listener is not None:
+                live.append(reference)
+                listener(changes)
+        self._listeners = live
+
+    def get_node(self, name: str) -> Optional[Node]:
+        """
+        Finds a node by its name.
+        
+        Args:
+            name (str): The name of the node to find.
+        
+        Returns:
+            Optional[Node]: The node if found, otherwise None.
+        """
+        # Catch nodes appended to or removed from the list without going through the index
+        if len(self._index) != len(self.nodes):
+            self._rebuild_index()
+        return self._index.get(name)
+
+    def reversed(self) -> 'Graph':
+        """
+        Returns a copy of the graph with every edge reversed, used to search towards a node instead of away from it.
+        
+        Args:
+            None
+        
+        Returns:
+            Graph: The reversed graph, with the same nodes in the same order.
+        """
+        reversed_edges: Dict[str, Dict[str, int]] = {node.name: {} for node in self.nodes}
+        for node in self.nodes:
+            for neighbor, cost in node.edges.items():
+                reversed_edges.setdefault(neighbor, {})[node.name] = cost
+        graph = Graph()
+        coordinates = {node.name: node.coordinates for node in self.nodes}
+        for name, edges in reversed_edges.items():
+            graph.add_node(Node(name, edges, coordinates.get(name)))
+        return graph
+    
 class GraphPath:
     """
     A graph of cities and their connections.
     
+    By default this is the built-in graph of ten East Coast cities. A graph loaded from a file
+    (see graph_loader.load_graph) can be given instead, either as a Graph or as a CSRGraph
+    (see graph_binary.open_binary_graph). Each form is converted into the other only when asked for.
+    
     Attributes:
         cities (List[str]): A list of cities in the graph.
-        graph (Graph): A graph of cities and their connections.
+        graph (Optional[Graph]): A graph of cities and their connections.
+        csr (Optional[CSRGraph]): The compact form of the graph.
         
     methods:
         _initialize_graph(self, graph: Graph) -> None: Initializes the graph with the cities and their connections.
         get_graph(self) -> Graph: Returns the graph.
+        get_compact_graph(self) -> CSRGraph: Returns the compact form of the graph.
         get_costs_dict_for_city(self, city: str) -> Dict[str, int]: Returns a dictionary of the cities that can be reached from the current city and the cost to get to that city.
+        get_coordinates_for_city(self, city: str) -> Optional[Tuple[float, float]]: Returns the (latitude, longitude) of a city.
         get_cities_list(self) -> List[str]: Returns a list of the cities in the graph.
     """
-    def __init__(self):
+    def __init__(self, graph: Optional[Union[Graph, 'CSRGraph']] = None):
         """
         Initializes the graph with the cities and their connections.
         
         Args:
-            None
+            graph (Optional[Union[Graph, CSRGraph]]): A loaded graph to use instead of the built-in ten-city graph.
         """
+        self.csr: Optional[CSRGraph] = None
+        if isinstance(graph, CSRGraph):
+            self.graph = None
+            self.csr = graph
+            self.cities = graph.names
+            return
+        if graph is not None:
+            self.graph = graph
+            self.cities = [node.name for node in graph.nodes]
+            return
         self.cities = [
             'Buffalo',
             'Boston',
@@ -69,8 +356,8 @@ class GraphPath:
             graph (Graph): A graph of cities and their connections.
         """
         for city in self.cities:
-            node = Node(city, self.get_costs_dict_for_city(city))
-            graph.nodes.append(node)
+            node = Node(city, self.get_costs_dict_for_city(city), self.get_coordinates_for_city(city))
+            graph.add_node(node)
             
     def get_graph(self) -> Graph:
         """
@@ -82,7 +369,23 @@ class GraphPath:
         Returns:
             Graph: A graph of cities and their connections.
         """
+        if self.graph is None:
+            self.graph = self.csr.to_graph()
         return self.graph
+
+    def get_compact_graph(self) -> 'CSRGraph':
+        """
+        Returns the compact form of the graph, building it on first use.
+        
+        Args:
+            None
+            
+        Returns:
+            CSRGraph: The graph in compressed sparse row form.
+        """
+        if self.csr is None:
+            self.csr = CSRGraph.from_graph(self.graph)
+        return self.csr
     
     def get_costs_dict_for_city(self, city: str) -> Dict[str, int]:
         """
@@ -155,6 +458,29 @@ class GraphPath:
                 'Salisbury': 132,
             }
             
+    def get_coordinates_for_city(self, city: str) -> Optional[Tuple[float, float]]:
+        """
+        Returns the (latitude, longitude) of a city, used by the great-circle A* heuristic.
+        
+        Args:
+            city (str): The city to get the coordinates for.
+            
+        Returns:
+            Optional[Tuple[float, float]]: The latitude and longitude of the city in degrees, or None if unknown.
+        """
+        return {
+            'Buffalo': (42.8864, -78.8784),
+            'Boston': (42.3601, -71.0589),
+            'Pittsburgh': (40.4406, -79.9959),
+            'New York': (40.7128, -74.0060),
+            'Philadelphia': (39.9526, -75.1652),
+            'Baltimore': (39.2904, -76.6122),
+            'Salisbury': (38.3607, -75.5994),
+            'Washington DC': (38.9072, -77.0369),
+            'Richmond': (37.5407, -77.4360),
+            'Norfolk': (36.8508, -76.2859),
+        }.get(city)
+
     def get_cities_list(self) -> List[str]:
         """
         Returns a list of the cities in the graph.
@@ -168,6 +494,238 @@ class GraphPath:
         return self.cities
         
 
+class CSRGraph:
+    """
+    A compact, read-only graph stored in compressed sparse row (CSR) form.
+    
+    Node names are interned to integer IDs, and the edges of every node are stored
+    contiguously in flat typed arrays instead of one dictionary per node. The edges of
+    node `i` are `targets[offsets[i]:offsets[i + 1]]` with the matching `weights`.
+    
+    Attributes:
+        names (Sequence[str]): The node names, indexed by node ID.
+        ids (Mapping[str, int]): Maps a node name to its node ID.
+        offsets (Sequence[int]): Edge offsets per node, of length num_nodes + 1.
+        targets (Sequence[int]): The target node ID of every edge.
+        weights (Sequence[int]): The cost of every edge.
+        coordinates (Optional[Sequence[float]]): The latitude and longitude of every node ID, two entries per node,
+            NaN for nodes without coordinates; None if no node has coordinates.
+    
+    Methods:
+        from_graph(cls, graph: Graph) -> CSRGraph: Builds a CSR graph from a Graph.
+        to_graph(self) -> Graph: Converts the CSR graph back into a Graph.
+        node_id(self, name: str) -> Optional[int]: Returns the ID of a node name.
+        node_name(self, node_id: int) -> str: Returns the name of a node ID.
+        node_coordinates(self, node_id: int) -> Optional[Tuple[float, float]]: Returns the (latitude, longitude) of a node ID.
+        neighbors(self, node_id: int) -> Iterator[Tuple[int, int]]: Iterates the (target ID, cost) pairs of a node.
+        neighbors_by_name(self, name: str) -> Optional[Iterator[Tuple[str, int]]]: Iterates the (target name, cost) pairs of a node.
+        reversed(self) -> CSRGraph: Returns a copy of the graph with every edge reversed.
+    """
+    def __init__(self, names: Sequence[str], offsets: Sequence[int], targets: Sequence[int], weights: Sequence[int],
+                 ids: Optional[Mapping[str, int]] = None, coordinates: Optional[Sequence[float]] = None):
+        """
+        Initializes the CSR graph from already built arrays.
+        
+        The arrays can be any sequences of numbers, such as `array` objects or memoryviews over a memory-mapped file.
+        
+        Args:
+            names (Sequence[str]): The node names, indexed by node ID.
+            offsets (Sequence[int]): Edge offsets per node, of length len(names) + 1.
+            targets (Sequence[int]): The target node ID of every edge.
+            weights (Sequence[int]): The cost of every edge.
+            ids (Optional[Mapping[str, int]]): Maps a node name to its node ID; built from names if not given.
+            coordinates (Optional[Sequence[float]]): The latitude and longitude of every node ID, NaN where unknown.
+        
+        Raises:
+            ValueError: If the array lengths are inconsistent.
+        """
+        if len(offsets) != len(names) + 1:
+            raise ValueError("offsets must have exactly one more entry than there are nodes.")
+        if len(targets) != len(weights) or offsets[-1] != len(targets):
+            raise ValueError("targets and weights must both hold offsets[-1] edges.")
+        if coordinates is not None and len(coordinates) != 2 * len(names):
+            raise ValueError("coordinates must hold a latitude and a longitude for every node.")
+        self.names = names
+        self.ids: Mapping[str, int] = ids if ids is not None else {name: node_id for node_id, name in enumerate(names)}
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.coordinates = coordinates
+
+    @classmethod
+    def from_graph(cls, graph: Graph) -> 'CSRGraph':
+        """
+        Builds a CSR graph from a Graph.
+        
+        Edge targets that are not nodes of the graph are interned as nodes without edges.
+        Weights are stored as 64-bit integers when every cost is an integer, and as doubles otherwise.
+        
+        Args:
+            graph (Graph): The graph to convert.
+        
+        Returns:
+            CSRGraph: The compact representation of the graph.
+        """
+        # Intern every node name first so node IDs follow the order of graph.nodes
+        names: List[str] = [node.name for node in graph.nodes]
+        ids: Dict[str, int] = {name: node_id for node_id, name in enumerate(names)}
+        for node in graph.nodes:
+            for neighbor in node.edges:
+                if neighbor not in ids:
+                    ids[neighbor] = len(names)
+                    names.append(neighbor)
+
+        integral = all(isinstance(cost, int) for node in graph.nodes for cost in node.edges.values())
+        offsets = array('q', [0])
+        targets = array('i')
+        weights = array('q' if integral else 'd')
+
+        # Lay the edges of every node out contiguously, nodes in ID order
+        edges_by_name = {node.name: node.edges for node in graph.nodes}
+        for name in names:
+            for neighbor, cost in edges_by_name.get(name, {}).items():
+                targets.append(ids[neighbor])
+                weights.append(cost)
+            offsets.append(len(targets))
+
+        # Keep the coordinates of the nodes that have them, if any do
+        coordinates: Optional[array] = None
+        if any(node.coordinates is not None for node in graph.nodes):
+            coordinates = array('d', [math.nan]) * (2 * len(names))
+            for node_id, node in enumerate(graph.nodes):
+                if node.coordinates is not None:
+                    coordinates[2 * node_id], coordinates[2 * node_id + 1] = node.coordinates
+
+        return cls(names, offsets, targets, weights, coordinates=coordinates)
+
+    def to_graph(self) -> Graph:
+        """
+        Converts the CSR graph back into a Graph.
+        
+        Args:
+            None
+        
+        Returns:
+            Graph: A graph with one Node per node ID.
+        """
+        graph = Graph()
+        for node_id, name in enumerate(self.names):
+            edges = {self.names[target]: cost for target, cost in self.neighbors(node_id)}
+            graph.add_node(Node(name, edges, self.node_coordinates(node_id)))
+        return graph
+
+    @property
+    def num_nodes(self) -> int:
+        """
+        Returns the number of nodes in the graph.
+        """
+        return len(self.names)
+
+    @property
+    def num_edges(self) -> int:
+        """
+        Returns the number of edges in the graph.
+        """
+        return len(self.targets)
+
+    def node_id(self, name: str) -> Optional[int]:
+        """
+        Returns the ID of a node name.
+        
+        Args:
+            name (str): The name of the node.
+        
+        Returns:
+            Optional[int]: The node ID if found, otherwise None.
+        """
+        return self.ids.get(name)
+
+    def node_name(self, node_id: int) -> str:
+        """
+        Returns the name of a node ID.
+        
+        Args:
+            node_id (int): The ID of the node.
+        
+        Returns:
+            str: The name of the node.
+        """
+        return self.names[node_id]
+
+    def node_coordinates(self, node_id: int) -> Optional[Tuple[float, float]]:
+        """
+        Returns the (latitude, longitude) of a node ID.
+        
+        Args:
+            node_id (int): The ID of the node.
+        
+        Returns:
+            Optional[Tuple[float, float]]: The coordinates of the node, or None if it has none.
+        """
+        if self.coordinates is None or math.isnan(self.coordinates[2 * node_id]):
+            return None
+        return self.coordinates[2 * node_id], self.coordinates[2 * node_id + 1]
+
+    def neighbors(self, node_id: int) -> Iterator[Tuple[int, int]]:
+        """
+        Iterates the (target ID, cost) pairs of a node.
+        
+        Args:
+            node_id (int): The ID of the node.
+        
+        Returns:
+            Iterator[Tuple[int, int]]: The target node ID and cost of every edge leaving the node.
+        """
+        begin, end = self.offsets[node_id], self.offsets[node_id + 1]
+        return zip(self.targets[begin:end], self.weights[begin:end])
+
+    def neighbors_by_name(self, name: str) -> Optional[Iterator[Tuple[str, int]]]:
+        """
+        Iterates the (target name, cost) pairs of a node.
+        
+        Args:
+            name (str): The name of the node.
+        
+        Returns:
+            Optional[Iterator[Tuple[str, int]]]: The target name and cost of every edge leaving the node, or None if the node is not found.
+        """
+        node_id = self.ids.get(name)
+        if node_id is None:
+            return None
+        names = self.names
+        return ((names[target], cost) for target, cost in self.neighbors(node_id))
+
+    def reversed(self) -> 'CSRGraph':
+        """
+        Returns a copy of the graph with every edge reversed, used to search towards a node instead of away from it.
+        
+        Args:
+            None
+        
+        Returns:
+            CSRGraph: The reversed graph, with the same node IDs and names.
+        """
+        # Count the edges entering every node, then turn the counts into offsets
+        offsets = array('q', [0] * (self.num_nodes + 1))
+        for target in self.targets:
+            offsets[target + 1] += 1
+        for node_id in range(self.num_nodes):
+            offsets[node_id + 1] += offsets[node_id]
+
+        # Place every edge at the next free slot of its target
+        weight_typecode = self.weights.typecode if isinstance(self.weights, array) else self.weights.format
+        targets = array('i', [0] * self.num_edges)
+        weights = array(weight_typecode, [0] * self.num_edges)
+        next_slot = array('q', offsets[:-1])
+        for source in range(self.num_nodes):
+            for target, cost in self.neighbors(source):
+                slot = next_slot[target]
+                targets[slot] = source
+                weights[slot] = cost
+                next_slot[target] = slot + 1
+        return CSRGraph(self.names, offsets, targets, weights, ids=self.ids, coordinates=self.coordinates)
+
+
 if __name__ == '__main__':
     graph_path = GraphPath()
     graph = graph_path.get_graph()
@@ -0,0 +1,204 @@
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Iterator, List, Mapping, Sequence, Union
+from graph import CSRGraph, Graph
+
+MAGIC = b'GSAGRAPH'
+VERSION = 2
+# Version 1 files have no flags and no coordinates section, and are still read
+SUPPORTED_VERSIONS = (1, 2)
+
+# magic, version, byte order ('l' or 'b'), weight typecode ('q' or 'd'), flags, num_nodes, num_edges, size of the name blob
+HEADER = struct.Struct('=8sIccBxQQQ')
+
+# Set in the header flags when the file ends with a coordinates section
+FLAG_COORDINATES = 1
+COORDINATE_TYPECODE = 'd'
+
+# Typecodes of the arrays stored in the file, shared with CSRGraph.from_graph
+OFFSET_TYPECODE = 'q'
+TARGET_TYPECODE = 'i'
+ORDER_TYPECODE = 'i'
+
+def _aligned(position: int, alignment: int = 8) -> int:
+    """
+    Rounds a file position up to the next multiple of the alignment.
+    """
+    return (position + alignment - 1) // alignment * alignment
+
+class MappedNames(Sequence):
+    """
+    The node-name table of a memory-mapped graph, decoded one name at a time on access.
+    
+    Attributes:
+        name_offsets (Sequence[int]): name_offsets[i]..name_offsets[i + 1] is the UTF-8 name of node i in the blob.
+        blob (memoryview): The concatenated UTF-8 names.
+    """
+    def __init__(self, name_offsets: Sequence[int], blob: memoryview):
+        self.name_offsets = name_offsets
+        self.blob = blob
+
+    def __len__(self) -> int:
+        return len(self.name_offsets) - 1
+
+    def __getitem__(self, node_id):
+        if isinstance(node_id, slice):
+            return [self[i] for i in range(*node_id.indices(len(self)))]
+        if node_id < 0:
+            node_id += len(self)
+        if not 0 <= node_id < len(self):
+            raise IndexError("node ID out of range")
+        return self.raw(node_id).decode('utf-8')
+
+    def raw(self, node_id: int) -> bytes:
+        """
+        Returns the UTF-8 encoded name of a node.
+        
+        Args:
+            node_id (int): The ID of the node.
+        
+        Returns:
+            bytes: The encoded name.
+        """
+        return bytes(self.blob[self.name_offsets[node_id]:self.name_offsets[node_id + 1]])
+
+class MappedNameIndex(Mapping):
+    """
+    Maps node names to node IDs by binary search over the name order stored in the file,
+    so opening a graph does not build a dictionary of every name.
+    
+    Attributes:
+        names (MappedNames): The node-name table.
+        order (Sequence[int]): The node IDs sorted by their UTF-8 encoded name.
+    """
+    def __init__(self, names: MappedNames, order: Sequence[int]):
+        self.names = names
+        self.order = order
+
+    def __getitem__(self, name: str) -> int:
+        key = name.encode('utf-8')
+        position = bisect_left(_SortedNameView(self.names, self.order), key)
+        if position < len(self.order) and self.names.raw(self.order[position]) == key:
+            return self.order[position]
+        raise KeyError(name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+class _SortedNameView(Sequence):
+    """
+    Presents the encoded names in sorted order for bisect.
+    """
+    def __init__(self, names: MappedNames, order: Sequence[int]):
+        self.names = names
+        self.order = order
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def __getitem__(self, position: int) -> bytes:
+        return self.names.raw(self.order[position])
+
+def write_binary_graph(graph: Union[Graph, CSRGraph], path: str) -> None:
+    """
+    Writes a graph to the binary format read by open_binary_graph.
+    
+    The file holds a header, the CSR arrays (offsets, targets, weights), the node-name offsets,
+    the node IDs sorted by name, the UTF-8 name blob and, if the graph has node coordinates, the latitude
+    and longitude of every node ID as doubles (NaN where unknown), each section aligned to 8 bytes.
+    The coordinates let A* use the great-circle heuristic on an opened binary graph.
+    
+    Args:
+        graph (Union[Graph, CSRGraph]): The graph to write; a Graph is converted to a CSRGraph first.
+        path (str): The path of the file to write.
+    """
+    csr = graph if isinstance(graph, CSRGraph) else CSRGraph.from_graph(graph)
+    encoded: List[bytes] = [name.encode('utf-8') for name in csr.names]
+    name_offsets = array(OFFSET_TYPECODE, [0])
+    for name in encoded:
+        name_offsets.append(name_offsets[-1] + len(name))
+    order = array(ORDER_TYPECODE, sorted(range(len(encoded)), key=encoded.__getitem__))
+    weight_typecode = csr.weights.typecode if isinstance(csr.weights, array) else csr.weights.format
+
+    sections = [
+        array(OFFSET_TYPECODE, csr.offsets).tobytes(),
+        array(TARGET_TYPECODE, csr.targets).tobytes(),
+        array(weight_typecode, csr.weights).tobytes(),
+        name_offsets.tobytes(),
+        order.tobytes(),
+        b''.join(encoded),
+    ]
+    flags = 0
+    if csr.coordinates is not None:
+        flags |= FLAG_COORDINATES
+        sections.append(array(COORDINATE_TYPECODE, csr.coordinates).tobytes())
+    header = HEADER.pack(MAGIC, VERSION, sys.byteorder[0].encode(), weight_typecode.encode(), flags,
+                         csr.num_nodes, csr.num_edges, name_offsets[-1])
+    with open(path, 'wb') as file:
+        file.write(header)
+        for section in sections:
+            file.write(b'\0' * (_aligned(file.tell()) - file.tell()))
+            file.write(section)
+
+def open_binary_graph(path: str) -> CSRGraph:
+    """
+    Opens a graph written by write_binary_graph by memory-mapping it, without copying or parsing the arrays.
+    
+    The returned CSRGraph reads its arrays straight from the mapping, so opening is constant time and
+    every process that opens the same file shares the same page-cache pages.
+    
+    Args:
+        path (str): The path of the binary graph file.
+    
+    Returns:
+        CSRGraph: A read-only graph backed by the memory-mapped file.
+    
+    Raises:
+        ValueError: If the file is not a binary graph of a supported version and byte order.
+    """
+    with open(path, 'rb') as file:
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapping)
+    if len(view) < HEADER.size:
+        raise ValueError(f"{path}: not a binary graph file")
+    magic, version, byteorder, weight_typecode, flags, num_nodes, num_edges, names_size = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a binary graph file")
+    if version not in SUPPORTED_VERSIONS:
+        raise ValueError(f"{path}: unsupported binary graph version {version}")
+    if byteorder != sys.byteorder[0].encode():
+        raise ValueError(f"{path}: written on a machine with a different byte order")
+
+    position = HEADER.size
+    def section(typecode: str, count: int) -> memoryview:
+        nonlocal position
+        position = _aligned(position)
+        size = count * struct.calcsize(typecode)
+        data = view[position:position + size].cast(typecode)
+        position += size
+        return data
+
+    offsets = section(OFFSET_TYPECODE, num_nodes + 1)
+    targets = section(TARGET_TYPECODE, num_edges)
+    weights = section(weight_typecode.decode(), num_edges)
+    name_offsets = section(OFFSET_TYPECODE, num_nodes + 1)
+    order = section(ORDER_TYPECODE, num_nodes)
+    blob = section('B', names_size)
+    coordinates = section(COORDINATE_TYPECODE, 2 * num_nodes) if flags & FLAG_COORDINATES else None
+
+    names = MappedNames(name_offsets, blob)
+    return CSRGraph(names, offsets, targets, weights, ids=MappedNameIndex(names, order), coordinates=coordinates)
+
+if __name__ == '__main__':
+    from graph_loader import load_graph
+
+    if len(sys.argv) != 3:
+        print("Usage: python graph_binary.py <input graph file> <output binary file>")
+        sys.exit(1)
+    write_binary_graph(load_graph(sys.argv[1]), sys.argv[2])
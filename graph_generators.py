@@ -0,0 +1,220 @@
+import math
+import random
+from typing import Callable, Dict, List, Optional, Tuple
+from graph import Graph, Node
+from graph_loader import great_circle_miles
+
+# Synthetic nodes are placed in a square of this many degrees, starting at this (latitude, longitude) corner
+AREA_DEGREES: float = 4.0
+AREA_CORNER: Tuple[float, float] = (38.0, -78.0)
+
+def _coordinates(x: float, y: float) -> Tuple[float, float]:
+    """
+    Maps a point of the unit square to a (latitude, longitude) inside the synthetic area.
+    """
+    return (AREA_CORNER[0] + y * AREA_DEGREES, AREA_CORNER[1] + x * AREA_DEGREES)
+
+def _road_cost(a: Tuple[float, float], b: Tuple[float, float], factor: float = 1.0) -> int:
+    """
+    The cost of a road between two coordinates: the great-circle miles times the factor, rounded up so
+    the great-circle heuristic never overestimates.
+    """
+    return max(1, math.ceil(factor * great_circle_miles(*a, *b)))
+
+def _build_graph(edges: List[Dict[str, int]], coordinates: Optional[List[Tuple[float, float]]] = None) -> Graph:
+    """
+    Builds a graph with nodes named 'N0' to 'N<len(edges) - 1>' from per-node edge dictionaries.
+    """
+    graph = Graph()
+    for i, node_edges in enumerate(edges):
+        graph.add_node(Node(f"N{i}", node_edges, coordinates[i] if coordinates is not None else None))
+    return graph
+
+def _connect(edges: List[Dict[str, int]], i: int, j: int, cost: int) -> None:
+    """
+    Adds an undirected edge between nodes i and j, keeping the cheaper cost if it already exists.
+    """
+    if i == j:
+        return
+    cost = min(cost, edges[i].get(f"N{j}", cost))
+    edges[i][f"N{j}"] = edges[j][f"N{i}"] = cost
+
+def grid_graph(rows: int, columns: int, seed: int = 0, max_cost: int = 100) -> Graph:
+    """
+    Builds a grid where every node is connected to its four neighbors with random costs.
+
+    Args:
+        rows (int): The number of rows.
+        columns (int): The number of columns.
+        seed (int): The seed of the random number generator.
+        max_cost (int): The largest edge cost; costs are drawn uniformly from 1 to max_cost.
+
+    Returns:
+        Graph: The grid, with node N<row * columns + column> at each position.
+    """
+    rng = random.Random(seed)
+    edges: List[Dict[str, int]] = [{} for _ in range(rows * columns)]
+    for row in range(rows):
+        for column in range(columns):
+            i = row * columns + column
+            if column + 1 < columns:
+                _connect(edges, i, i + 1, rng.randint(1, max_cost))
+            if row + 1 < rows:
+                _connect(edges, i, i + columns, rng.randint(1, max_cost))
+    return _build_graph(edges)
+
+def random_geometric_graph(num_nodes: int, average_degree: float = 6.0, seed: int = 0) -> Graph:
+    """
+    Scatters nodes uniformly over the synthetic area and connects every pair closer than a radius
+    chosen to give the average degree. Costs are road miles, so the graph has coordinates.
+
+    Args:
+        num_nodes (int): The number of nodes.
+        average_degree (float): The expected number of neighbors per node.
+        seed (int): The seed of the random number generator.
+
+    Returns:
+        Graph: The random geometric graph, which may be disconnected.
+    """
+    rng = random.Random(seed)
+    points = [(rng.random(), rng.random()) for _ in range(num_nodes)]
+    coordinates = [_coordinates(x, y) for x, y in points]
+    radius = math.sqrt(average_degree / (math.pi * max(num_nodes, 1)))
+    # Bucket the points into cells of the radius, so only neighboring cells are compared
+    cells: Dict[Tuple[int, int], List[int]] = {}
+    for i, (x, y) in enumerate(points):
+        cells.setdefault((int(x / radius), int(y / radius)), []).append(i)
+    edges: List[Dict[str, int]] = [{} for _ in range(num_nodes)]
+    for (cell_x, cell_y), members in cells.items():
+        for offset_x, offset_y in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+            others = cells.get((cell_x + offset_x, cell_y + offset_y))
+            if others is None:
+                continue
+            for i in members:
+                for j in others:
+                    # Within the same cell, compare each pair once
+                    if (offset_x, offset_y) == (0, 0) and j <= i:
+                        continue
+                    if math.dist(points[i], points[j]) <= radius:
+                        _connect(edges, i, j, _road_cost(coordinates[i], coordinates[j]))
+    return _build_graph(edges, coordinates)
+
+def scale_free_graph(num_nodes: int, edges_per_node: int = 3, seed: int = 0, max_cost: int = 100) -> Graph:
+    """
+    Builds a scale-free graph by preferential attachment (Barabási–Albert): each new node connects to
+    edges_per_node existing nodes, chosen with probability proportional to their degree.
+
+    Args:
+        num_nodes (int): The number of nodes.
+        edges_per_node (int): The number of edges added with each new node.
+        seed (int): The seed of the random number generator.
+        max_cost (int): The largest edge cost; costs are drawn uniformly from 1 to max_cost.
+
+    Returns:
+        Graph: The scale-free graph, which is connected.
+    """
+    rng = random.Random(seed)
+    edges: List[Dict[str, int]] = [{} for _ in range(num_nodes)]
+    # Every node appears once per edge end, so a uniform pick from this list is proportional to degree
+    ends: List[int] = []
+    initial = min(edges_per_node + 1, num_nodes)
+    for i in range(initial):
+        for j in range(i):
+            _connect(edges, i, j, rng.randint(1, max_cost))
+            ends += (i, j)
+    for i in range(initial, num_nodes):
+        targets = set()
+        while len(targets) < edges_per_node:
+            targets.add(rng.choice(ends))
+        for j in targets:
+            _connect(edges, i, j, rng.randint(1, max_cost))
+            ends += (i, j)
+    return _build_graph(edges)
+
+def road_like_graph(num_nodes: int, highway_spacing: int = 10, seed: int = 0) -> Graph:
+    """
+    Builds a road-like network: a jittered grid of local roads, with every highway_spacing-th row and column
+    being a highway that is cheaper to travel. Costs are road miles (local roads are slowed down by 60%),
+    so the graph has coordinates and the great-circle heuristic stays admissible.
+
+    Args:
+        num_nodes (int): The approximate number of nodes, rounded to a square grid.
+        highway_spacing (int): The number of local roads between two highways.
+        seed (int): The seed of the random number generator.
+
+    Returns:
+        Graph: The road-like graph, which is connected.
+    """
+    rng = random.Random(seed)
+    side = max(2, round(math.sqrt(num_nodes)))
+    step = 1 / side
+    coordinates = [_coordinates((column + 0.5 + rng.uniform(-0.3, 0.3)) * step,
+                                (row + 0.5 + rng.uniform(-0.3, 0.3)) * step)
+                   for row in range(side) for column in range(side)]
+    edges: List[Dict[str, int]] = [{} for _ in range(side * side)]
+    for row in range(side):
+        for column in range(side):
+            i = row * side + column
+            if column + 1 < side:
+                factor = 1.0 if row % highway_spacing == 0 else 1.6
+                _connect(edges, i, i + 1, _road_cost(coordinates[i], coordinates[i + 1], factor))
+            if row + 1 < side:
+                factor = 1.0 if column % highway_spacing == 0 else 1.6
+                _connect(edges, i, i + side, _road_cost(coordinates[i], coordinates[i + side], factor))
+    return _build_graph(edges, coordinates)
+
+def ring_graph(num_nodes: int, degree: int = 4, seed: int = 0, max_cost: int = 100) -> Graph:
+    """
+    Builds a connected graph without spatial structure: a ring with extra random edges per node.
+
+    Args:
+        num_nodes (int): The number of nodes.
+        degree (int): The number of random edges added per node, on top of the ring.
+        seed (int): The seed of the random number generator.
+        max_cost (int): The largest edge cost; costs are drawn uniformly from 1 to max_cost.
+
+    Returns:
+        Graph: The ring graph, with nodes named 'N0' to 'N<num_nodes - 1>'.
+    """
+    rng = random.Random(seed)
+    edges: List[Dict[str, int]] = [{} for _ in range(num_nodes)]
+    for i in range(num_nodes):
+        # Ring edges keep the graph connected; a later edge between the same nodes replaces the earlier one
+        j = (i + 1) % num_nodes
+        edges[i][f"N{j}"] = edges[j][f"N{i}"] = rng.randint(1, max_cost)
+        for _ in range(degree):
+            j = rng.randrange(num_nodes)
+            if j != i:
+                edges[i][f"N{j}"] = edges[j][f"N{i}"] = rng.randint(1, max_cost)
+    return _build_graph(edges)
+
+# Builds a graph of each kind with roughly the given number of (directed) edges, from a seed
+GENERATORS: Dict[str, Callable[[int, int], Graph]] = {
+    'grid': lambda num_edges, seed: grid_graph(max(2, round(math.sqrt(num_edges / 4))),
+                                               max(2, round(math.sqrt(num_edges / 4))), seed),
+    'geometric': lambda num_edges, seed: random_geometric_graph(max(2, num_edges // 6), seed=seed),
+    'scale_free': lambda num_edges, seed: scale_free_graph(max(4, num_edges // 6), seed=seed),
+    'road': lambda num_edges, seed: road_like_graph(max(4, num_edges // 4), seed=seed),
+}
+
+def generate_graph(kind: str, num_edges: int, seed: int = 0) -> Graph:
+    """
+    Generates a synthetic graph by kind, sized by its number of edges.
+
+    Undirected edges count once per direction, matching CSRGraph.num_edges.
+
+    Args:
+        kind (str): One of the names in GENERATORS.
+        num_edges (int): The approximate number of edges, from 1e3 to 1e7.
+        seed (int): The seed of the random number generator.
+
+    Returns:
+        Graph: The generated graph.
+
+    Raises:
+        ValueError: If the kind is unknown.
+    """
+    generator = GENERATORS.get(kind)
+    if generator is None:
+        raise ValueError(f"Unknown graph kind {kind!r}, expected one of {', '.join(GENERATORS)}")
+    return generator(num_edges, seed)
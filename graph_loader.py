@@ -0,0 +1,251 @@
+import csv
+import math
+import os
+import xml.etree.ElementTree as ElementTree
+from typing import Dict, Iterable, Optional, Tuple, Union
+from graph import Graph, Node
+
+# Mean radius of the earth, in miles, to match the mileage costs of the built-in graph
+EARTH_RADIUS_MILES = 3958.8
+
+Cost = Union[int, float]
+
+class GraphBuilder:
+    """
+    Accumulates edges one at a time and builds a Graph from them.
+    
+    Loaders feed edges into the builder as they stream through a file, so only the adjacency
+    itself is kept in memory, never the file contents.
+    
+    Attributes:
+        edges (Dict[str, Dict[str, Cost]]): The adjacency built so far, in order of first appearance.
+        coordinates (Dict[str, Tuple[float, float]]): The (latitude, longitude) of nodes that have one.
+    
+    Methods:
+        add_node(self, name: str) -> None: Adds a node without edges.
+        add_edge(self, source: str, target: str, cost: Cost, directed: bool = True) -> None: Adds an edge.
+        build(self) -> Graph: Builds the graph.
+    """
+    def __init__(self):
+        self.edges: Dict[str, Dict[str, Cost]] = {}
+        self.coordinates: Dict[str, Tuple[float, float]] = {}
+
+    def add_node(self, name: str) -> None:
+        """
+        Adds a node without edges, if it is not in the graph yet.
+        
+        Args:
+            name (str): The name of the node.
+        """
+        if name not in self.edges:
+            self.edges[name] = {}
+
+    def add_edge(self, source: str, target: str, cost: Cost, directed: bool = True) -> None:
+        """
+        Adds an edge, keeping the cheapest cost when the same edge appears more than once.
+        
+        Args:
+            source (str): The node the edge leaves from.
+            target (str): The node the edge leads to.
+            cost (Cost): The cost of the edge.
+            directed (bool): If False, the reverse edge is added too.
+        """
+        source_edges = self.edges.setdefault(source, {})
+        self.add_node(target)
+        if cost < source_edges.get(target, math.inf):
+            source_edges[target] = cost
+        if not directed:
+            self.add_edge(target, source, cost)
+
+    def build(self) -> Graph:
+        """
+        Builds the graph.
+        
+        Args:
+            None
+        
+        Returns:
+            Graph: A graph with one node per name seen, in order of first appearance.
+        """
+        graph = Graph()
+        for name, edges in self.edges.items():
+            graph.add_node(Node(name, edges, self.coordinates.get(name)))
+        return graph
+
+def parse_cost(text: str) -> Cost:
+    """
+    Parses an edge cost, as an int when possible so integer datasets keep integer distances.
+    
+    Args:
+        text (str): The cost as written in the file.
+    
+    Returns:
+        Cost: The parsed cost.
+    
+    Raises:
+        ValueError: If the text is not a number.
+    """
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+def great_circle_miles(latitude1: float, longitude1: float, latitude2: float, longitude2: float) -> float:
+    """
+    Returns the great-circle (haversine) distance between two points, in miles.
+    
+    Args:
+        latitude1 (float): The latitude of the first point, in degrees.
+        longitude1 (float): The longitude of the first point, in degrees.
+        latitude2 (float): The latitude of the second point, in degrees.
+        longitude2 (float): The longitude of the second point, in degrees.
+    
+    Returns:
+        float: The distance between the points, in miles.
+    """
+    phi1, phi2 = math.radians(latitude1), math.radians(latitude2)
+    delta_phi = phi2 - phi1
+    delta_lambda = math.radians(longitude2 - longitude1)
+    a = math.sin(delta_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(min(1.0, math.sqrt(a)))
+
+def load_edge_list_csv(path: str, directed: bool = False, delimiter: str = ',',
+                       source_column: str = 'source', target_column: str = 'target',
+                       cost_column: str = 'cost') -> Graph:
+    """
+    Loads a graph from an edge-list CSV file with a header row.
+    
+    The file is read row by row, so memory is bounded by the size of the graph, not of the file.
+    
+    Args:
+        path (str): The path of the CSV file.
+        directed (bool): If False, every edge is added in both directions.
+        delimiter (str): The field delimiter.
+        source_column (str): The header of the column holding the source node.
+        target_column (str): The header of the column holding the target node.
+        cost_column (str): The header of the column holding the edge cost.
+    
+    Returns:
+        Graph: The loaded graph.
+    
+    Raises:
+        ValueError: If a column is missing or a cost is not a number.
+    """
+    builder = GraphBuilder()
+    with open(path, newline='') as file:
+        reader = csv.DictReader(file, delimiter=delimiter)
+        missing = {source_column, target_column, cost_column} - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"{path}: missing columns {sorted(missing)}")
+        for row in reader:
+            builder.add_edge(row[source_column], row[target_column], parse_cost(row[cost_column]), directed)
+    return builder.build()
+
+def load_dimacs(path: str, coordinates_path: Optional[str] = None) -> Graph:
+    """
+    Loads a graph from a DIMACS shortest-path `.gr` file, and optionally its `.co` coordinates file.
+    
+    Arc lines look like `a <source> <target> <cost>`; comment (`c`) and problem (`p`) lines are skipped.
+    Node IDs are kept as their decimal strings. DIMACS `.co` coordinates are integer longitude/latitude
+    in millionths of a degree.
+    
+    Args:
+        path (str): The path of the `.gr` file.
+        coordinates_path (Optional[str]): The path of the matching `.co` file.
+    
+    Returns:
+        Graph: The loaded graph, with directed arcs.
+    
+    Raises:
+        ValueError: If an arc line is malformed.
+    """
+    builder = GraphBuilder()
+    with open(path) as file:
+        for line_number, line in enumerate(file, 1):
+            if not line.startswith('a'):
+                continue
+            fields = line.split()
+            if len(fields) != 4:
+                raise ValueError(f"{path}:{line_number}: expected 'a <source> <target> <cost>'")
+            builder.add_edge(fields[1], fields[2], parse_cost(fields[3]))
+    if coordinates_path is not None:
+        with open(coordinates_path) as file:
+            for line in file:
+                if line.startswith('v'):
+                    _, name, longitude, latitude = line.split()
+                    builder.coordinates[name] = (int(latitude) / 1e6, int(longitude) / 1e6)
+    return builder.build()
+
+def _iter_osm_elements(path: str) -> Iterable[ElementTree.Element]:
+    """
+    Iterates the top-level elements of an OSM XML file, freeing each one once it has been handled.
+    """
+    context = ElementTree.iterparse(path, events=('start', 'end'))
+    _, root = next(context)
+    for event, element in context:
+        if event == 'end' and element.tag in ('node', 'way', 'relation'):
+            yield element
+            root.clear()
+
+def load_osm(path: str, highway_only: bool = True) -> Graph:
+    """
+    Loads a road graph from an OpenStreetMap XML (`.osm`) extract.
+    
+    Every pair of consecutive nodes of a way becomes an edge weighted by its great-circle distance in miles.
+    Ways tagged `oneway=yes` (or `-1`) get edges in one direction only. The file is parsed incrementally and
+    each element is discarded once read, so only node coordinates and the adjacency are kept in memory.
+    
+    Args:
+        path (str): The path of the `.osm` file.
+        highway_only (bool): If True, only ways with a `highway` tag are loaded.
+    
+    Returns:
+        Graph: The loaded graph, named by OSM node ID, with node coordinates.
+    """
+    builder = GraphBuilder()
+    positions: Dict[str, Tuple[float, float]] = {}
+    for element in _iter_osm_elements(path):
+        if element.tag == 'node':
+            positions[element.get('id')] = (float(element.get('lat')), float(element.get('lon')))
+        elif element.tag == 'way':
+            tags = {tag.get('k'): tag.get('v') for tag in element.iter('tag')}
+            if highway_only and 'highway' not in tags:
+                continue
+            refs = [nd.get('ref') for nd in element.iter('nd') if nd.get('ref') in positions]
+            oneway = tags.get('oneway')
+            if oneway == '-1':
+                refs.reverse()
+            for source, target in zip(refs, refs[1:]):
+                cost = great_circle_miles(*positions[source], *positions[target])
+                builder.add_edge(source, target, cost, directed=oneway in ('yes', 'true', '1', '-1'))
+    for name in builder.edges:
+        builder.coordinates[name] = positions[name]
+    return builder.build()
+
+def load_graph(path: str, file_format: Optional[str] = None, **options) -> Graph:
+    """
+    Loads a graph file, picking the loader from the file extension unless a format is given.
+    
+    Args:
+        path (str): The path of the graph file.
+        file_format (Optional[str]): One of 'csv', 'tsv', 'dimacs' or 'osm'.
+        **options: Extra keyword arguments passed to the loader.
+    
+    Returns:
+        Graph: The loaded graph.
+    
+    Raises:
+        ValueError: If the format is not supported.
+    """
+    if file_format is None:
+        extension = os.path.splitext(path)[1].lower()
+        file_format = {'.csv': 'csv', '.tsv': 'tsv', '.gr': 'dimacs', '.osm': 'osm'}.get(extension)
+    if file_format == 'csv':
+        return load_edge_list_csv(path, **options)
+    if file_format == 'tsv':
+        return load_edge_list_csv(path, delimiter='\t', **options)
+    if file_format == 'dimacs':
+        return load_dimacs(path, **options)
+    if file_format == 'osm':
+        return load_osm(path, **options)
+    raise ValueError(f"Unsupported graph format for {path}: {file_format}")
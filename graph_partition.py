@@ -0,0 +1,176 @@
+import json
+import math
+import os
+import sys
+from array import array
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Deque, Dict, List, Union
+from graph import CSRGraph, Graph
+from graph_binary import write_binary_graph, TARGET_TYPECODE, OFFSET_TYPECODE
+
+# The partition index written next to the shard files
+PARTITION_FILE = 'partition.json'
+# Bumped when the layout of the partition index changes
+PARTITION_VERSION = 1
+
+@dataclass
+class ShardInfo:
+    """
+    The boundary-node table of one region of a partitioned graph, stored in the partition index.
+
+    A shard file is a binary graph holding the region's nodes with all their outgoing edges, followed by
+    ghost nodes: the targets of edges that leave the region, without edges of their own. Node IDs below
+    local_nodes are owned by the shard; ghost node ID local_nodes + i is owned by shard ghost_parts[i].
+
+    Attributes:
+        file (str): The shard's binary graph file, relative to the partition directory.
+        local_nodes (int): The number of nodes the shard owns.
+        edges (int): The number of edges in the shard, including the edges to ghost nodes.
+        ghost_parts (List[int]): The owning shard of every ghost node, in ghost node ID order.
+        boundary (List[str]): The nodes of the shard with an edge into another shard.
+    """
+    file: str
+    local_nodes: int
+    edges: int
+    ghost_parts: List[int]
+    boundary: List[str]
+
+def assign_parts(csr: CSRGraph, num_parts: int) -> array:
+    """
+    Splits the nodes of a graph into num_parts regions of nearly equal size.
+
+    Each region is grown breadth-first from a seed until it is full, and the next region is seeded from
+    the unassigned frontier of the previous one, so regions are connected where the graph allows and
+    few edges cross between them. Only the CSR arrays are read, so a memory-mapped graph is not loaded.
+
+    Args:
+        csr (CSRGraph): The graph to split.
+        num_parts (int): The number of regions.
+
+    Returns:
+        array: The region of every node ID.
+
+    Raises:
+        ValueError: If num_parts is less than 1.
+    """
+    if num_parts < 1:
+        raise ValueError("num_parts must be at least 1.")
+    offsets, targets = csr.offsets, csr.targets
+    num_nodes = csr.num_nodes
+    region_size = math.ceil(num_nodes / num_parts)
+    parts = array('i', [-1]) * num_nodes
+    frontier: Deque[int] = deque()
+    next_unassigned = 0
+    for part in range(num_parts):
+        size = 0
+        # Start next to the previous region, from the first of its frontier nodes that is still unassigned
+        while frontier and parts[frontier[0]] >= 0:
+            frontier.popleft()
+        frontier = deque([frontier[0]]) if frontier else deque()
+        while size < region_size:
+            if not frontier:
+                # The component is used up, continue from the next unassigned node
+                while next_unassigned < num_nodes and parts[next_unassigned] >= 0:
+                    next_unassigned += 1
+                if next_unassigned == num_nodes:
+                    break
+                frontier.append(next_unassigned)
+            node = frontier.popleft()
+            if parts[node] >= 0:
+                continue
+            parts[node] = part
+            size += 1
+            frontier.extend(target for target in targets[offsets[node]:offsets[node + 1]] if parts[target] < 0)
+    return parts
+
+def write_partition(graph: Union[Graph, CSRGraph], num_parts: int, directory: str) -> List[ShardInfo]:
+    """
+    Partitions a graph and writes one binary shard file per region, plus the partition index.
+
+    Shards are built one at a time, so besides the graph itself only one shard is held in memory. Opening
+    the graph with graph_binary.open_binary_graph keeps even the full graph out of memory.
+
+    Args:
+        graph (Union[Graph, CSRGraph]): The graph to partition.
+        num_parts (int): The number of regions.
+        directory (str): The directory to write to, created if needed.
+
+    Returns:
+        List[ShardInfo]: The boundary-node table of every shard.
+
+    Raises:
+        ValueError: If num_parts is less than 1.
+    """
+    csr = graph if isinstance(graph, CSRGraph) else CSRGraph.from_graph(graph)
+    parts = assign_parts(csr, num_parts)
+    weight_typecode = csr.weights.typecode if isinstance(csr.weights, array) else csr.weights.format
+    os.makedirs(directory, exist_ok=True)
+    shards: List[ShardInfo] = []
+    for part in range(num_parts):
+        members = [node for node in range(csr.num_nodes) if parts[node] == part]
+        local_ids: Dict[int, int] = {node: local_id for local_id, node in enumerate(members)}
+        ghost_ids: Dict[int, int] = {}
+        ghost_parts: List[int] = []
+        boundary: List[str] = []
+        offsets = array(OFFSET_TYPECODE, [0])
+        targets = array(TARGET_TYPECODE)
+        weights = array(weight_typecode)
+
+        # Lay out the edges of the region's nodes, giving every target outside the region a ghost ID
+        for node in members:
+            crosses = False
+            for edge in range(csr.offsets[node], csr.offsets[node + 1]):
+                target = csr.targets[edge]
+                local_id = local_ids.get(target)
+                if local_id is None:
+                    crosses = True
+                    local_id = ghost_ids.get(target)
+                    if local_id is None:
+                        local_id = ghost_ids[target] = len(members) + len(ghost_parts)
+                        ghost_parts.append(parts[target])
+                targets.append(local_id)
+                weights.append(csr.weights[edge])
+            offsets.append(len(targets))
+            if crosses:
+                boundary.append(csr.node_name(node))
+        offsets.extend([len(targets)] * len(ghost_parts))
+
+        names = [csr.node_name(node) for node in members] + [csr.node_name(node) for node in ghost_ids]
+        file = f"part-{part}.bin"
+        write_binary_graph(CSRGraph(names, offsets, targets, weights), os.path.join(directory, file))
+        shards.append(ShardInfo(file, len(members), len(targets), ghost_parts, boundary))
+
+    with open(os.path.join(directory, PARTITION_FILE), 'w') as index:
+        json.dump({'version': PARTITION_VERSION, 'shards': [asdict(shard) for shard in shards]}, index)
+    return shards
+
+def load_partition(directory: str) -> List[ShardInfo]:
+    """
+    Reads the partition index written by write_partition.
+
+    Args:
+        directory (str): The partition directory.
+
+    Returns:
+        List[ShardInfo]: The boundary-node table of every shard.
+
+    Raises:
+        ValueError: If the index has an unsupported version.
+    """
+    with open(os.path.join(directory, PARTITION_FILE)) as index:
+        data = json.load(index)
+    if data.get('version') != PARTITION_VERSION:
+        raise ValueError(f"{directory}: unsupported partition version {data.get('version')}")
+    return [ShardInfo(**shard) for shard in data['shards']]
+
+if __name__ == '__main__':
+    from parallel_search import load_shared_graph
+
+    if len(sys.argv) != 4:
+        print("Usage: python graph_partition.py <graph file> <number of parts> <output directory>")
+        sys.exit(1)
+    written = write_partition(load_shared_graph(sys.argv[1]), int(sys.argv[2]), sys.argv[3])
+    for index, shard in enumerate(written):
+        print(f"part {index}: {shard.local_nodes} nodes, {shard.edges} edges, "
+              f"{len(shard.boundary)} boundary nodes, {len(shard.ghost_parts)} ghost nodes")
@@ -0,0 +1,281 @@
+import heapq
+import json
+import math
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+from graph import CSRGraph, Graph, GraphChange
+from graph_loader import great_circle_miles
+from ucs_search import UCSSearch
+
+# A heuristic estimates the remaining cost from a node to the goal: heuristic(node, goal)
+Heuristic = Callable[[str, str], float]
+
+def zero_heuristic(node: str, goal: str) -> float:
+    """
+    The heuristic that estimates every remaining cost as 0, which makes A* behave exactly like UCS.
+    """
+    return 0
+
+class _CompactCoordinates(Mapping):
+    """
+    The coordinates of a CSRGraph by node name, read from its coordinate array on access instead of copied.
+    """
+    def __init__(self, csr: CSRGraph):
+        self.csr = csr
+
+    def __getitem__(self, name: str) -> Tuple[float, float]:
+        node_id = self.csr.node_id(name)
+        coordinates = self.csr.node_coordinates(node_id) if node_id is not None else None
+        if coordinates is None:
+            raise KeyError(name)
+        return coordinates
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for node_id, name in enumerate(self.csr.names) if self.csr.node_coordinates(node_id) is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+class GreatCircleHeuristic:
+    """
+    Estimates the remaining cost as the great-circle distance between a node and the goal, in miles.
+    
+    The estimate never overestimates as long as every edge is at least as long as the straight line between
+    its two cities, which holds for road distances. Nodes without coordinates get an estimate of 0.
+    
+    Attributes:
+        coordinates (Mapping[str, Tuple[float, float]]): The (latitude, longitude) of every node that has one.
+        scale (float): A factor applied to the distance, e.g. to convert miles into another cost unit.
+    """
+    def __init__(self, coordinates: Mapping[str, Tuple[float, float]], scale: float = 1.0):
+        self.coordinates = coordinates
+        self.scale = scale
+
+    @classmethod
+    def from_graph(cls, graph: Graph, scale: float = 1.0) -> 'GreatCircleHeuristic':
+        """
+        Builds the heuristic from the coordinates stored on the nodes of a graph.
+        
+        Args:
+            graph (Graph): The graph to search.
+            scale (float): A factor applied to the distance.
+        
+        Returns:
+            GreatCircleHeuristic: The heuristic.
+        """
+        coordinates = {node.name: node.coordinates for node in graph.nodes if node.coordinates is not None}
+        return cls(coordinates, scale)
+
+    @classmethod
+    def from_compact_graph(cls, csr: CSRGraph, scale: float = 1.0) -> 'GreatCircleHeuristic':
+        """
+        Builds the heuristic from the coordinate array of a CSRGraph, such as a memory-mapped binary graph,
+        reading coordinates on demand so the graph is not converted.
+        
+        Args:
+            csr (CSRGraph): The graph to search.
+            scale (float): A factor applied to the distance.
+        
+        Returns:
+            GreatCircleHeuristic: The heuristic, which estimates 0 everywhere if the graph has no coordinates.
+        """
+        return cls(_CompactCoordinates(csr) if csr.coordinates is not None else {}, scale)
+
+    def __call__(self, node: str, goal: str) -> float:
+        node_coordinates = self.coordinates.get(node)
+        goal_coordinates = self.coordinates.get(goal)
+        if node_coordinates is None or goal_coordinates is None:
+            return 0
+        return self.scale * great_circle_miles(*node_coordinates, *goal_coordinates)
+
+class LandmarkHeuristic:
+    """
+    The ALT (A*, landmarks, triangle inequality) heuristic.
+    
+    For a set of landmark nodes, the shortest distances from every landmark to every node and from every node
+    to every landmark are precomputed. By the triangle inequality, d(node, goal) is at least
+    d(landmark, goal) - d(landmark, node) and d(node, landmark) - d(goal, landmark); the heuristic is the
+    largest of these lower bounds over all landmarks.
+    
+    Once tracking a graph (see track), the tables are repaired incrementally as the graph changes. A cheaper or new
+    edge lowers the table entries it improves, propagating from the edge like UCS. A more expensive or removed edge
+    leaves the tables untouched: entries that are too low still give lower bounds, so A* still finds shortest
+    paths with a less sharp heuristic; rebuild() recomputes the tables once too many such changes have accumulated.
+    
+    Attributes:
+        landmarks (List[str]): The landmark nodes.
+        distances_from (List[Dict[str, float]]): For every landmark, the distance from the landmark to each node it reaches.
+        distances_to (List[Dict[str, float]]): For every landmark, the distance from each node that reaches it to the landmark.
+        stale_changes (int): The number of cost increases and removals since the tables were last computed.
+    
+    Methods:
+        build(cls, graph, num_landmarks, landmarks) -> LandmarkHeuristic: Selects landmarks and precomputes the distance tables.
+        track(self, graph: Graph) -> None: Repairs the tables as the graph changes.
+        rebuild(self) -> None: Recomputes the tables of the tracked graph for the same landmarks.
+        save(self, path: str) -> None: Saves the distance tables to a JSON file.
+        load(cls, path: str) -> LandmarkHeuristic: Loads distance tables saved with save().
+    """
+    def __init__(self, landmarks: List[str], distances_from: List[Dict[str, float]], distances_to: List[Dict[str, float]]):
+        self.landmarks = landmarks
+        self.distances_from = distances_from
+        self.distances_to = distances_to
+        self.stale_changes = 0
+        # The tracked graph and its reversed copy, used to propagate improvements
+        self._graph: Optional[Graph] = None
+        self._reverse: Optional[Graph] = None
+
+    @classmethod
+    def build(cls, graph: Union[Graph, CSRGraph], num_landmarks: int = 4,
+              landmarks: Optional[List[str]] = None) -> 'LandmarkHeuristic':
+        """
+        Selects landmarks and precomputes the distance tables with one forward and one backward UCS per landmark.
+        
+        Unless landmarks are given, they are picked by farthest-point selection: the first landmark is the node
+        farthest from the first node of the graph, and each next one is the node farthest from all landmarks so far.
+        
+        Args:
+            graph (Union[Graph, CSRGraph]): The graph to search.
+            num_landmarks (int): The number of landmarks to select.
+            landmarks (Optional[List[str]]): The landmarks to use instead of selecting them.
+        
+        Returns:
+            LandmarkHeuristic: The heuristic.
+        """
+        forward = UCSSearch(graph)
+        backward = UCSSearch(forward.graph.reversed())
+        heuristic = cls([], [], [])
+        if landmarks is not None:
+            for landmark in landmarks:
+                heuristic.add_landmark(landmark, forward, backward)
+            return heuristic
+
+        distances = forward.shortest_distances(forward.cities[0])
+        candidate = max(distances, key=distances.get)
+        # Distance from each node to its closest landmark so far
+        closest: Dict[str, float] = {}
+        while len(heuristic.landmarks) < num_landmarks:
+            heuristic.add_landmark(candidate, forward, backward)
+            for node, distance in heuristic.distances_from[-1].items():
+                closest[node] = min(closest.get(node, distance), distance)
+            candidate = max(closest, key=closest.get)
+            if closest[candidate] == 0:
+                break
+        return heuristic
+
+    def add_landmark(self, landmark: str, forward: UCSSearch, backward: UCSSearch) -> None:
+        """
+        Adds a landmark and computes its distance tables.
+        
+        Args:
+            landmark (str): The landmark node.
+            forward (UCSSearch): A search over the graph.
+            backward (UCSSearch): A search over the reversed graph.
+        """
+        self.landmarks.append(landmark)
+        self.distances_from.append(forward.shortest_distances(landmark))
+        self.distances_to.append(backward.shortest_distances(landmark))
+
+    def track(self, graph: Graph) -> None:
+        """
+        Repairs the tables incrementally as the graph changes, instead of recomputing them.
+        
+        Args:
+            graph (Graph): The graph the tables were built for.
+        """
+        self._graph = graph
+        self._reverse = graph.reversed()
+        graph.subscribe(self._on_graph_change)
+
+    def rebuild(self) -> None:
+        """
+        Recomputes the tables of the tracked graph for the same landmarks.
+        
+        Raises:
+            ValueError: If no graph is tracked.
+        """
+        if self._graph is None:
+            raise ValueError("rebuild() needs a graph passed to track() first.")
+        forward, backward = UCSSearch(self._graph), UCSSearch(self._reverse)
+        self.distances_from = [forward.shortest_distances(landmark) for landmark in self.landmarks]
+        self.distances_to = [backward.shortest_distances(landmark) for landmark in self.landmarks]
+        self.stale_changes = 0
+
+    def _on_graph_change(self, changes: List[GraphChange]) -> None:
+        """
+        Applies the changes to the reversed graph, then propagates every edge that got cheaper through the tables.
+        """
+        with self._reverse.batch():
+            for change in changes:
+                if change.kind == 'set_edge':
+                    self._reverse.set_edge(change.target, change.source, change.new_cost)
+                elif change.kind == 'remove_edge':
+                    self._reverse.remove_edge(change.target, change.source)
+        for change in changes:
+            if change.kind == 'remove_edge' or (change.kind == 'set_edge' and change.old_cost is not None
+                                                and change.new_cost > change.old_cost):
+                self.stale_changes += 1
+            elif change.kind == 'set_edge':
+                for distances_from, distances_to in zip(self.distances_from, self.distances_to):
+                    self._propagate(distances_from, self._graph, change.source, change.target, change.new_cost)
+                    self._propagate(distances_to, self._reverse, change.target, change.source, change.new_cost)
+
+    @staticmethod
+    def _propagate(distances: Dict[str, float], graph: Graph, source: str, target: str, cost: float) -> None:
+        """
+        Lowers the table entries improved by the edge source -> target, spreading the improvement like UCS.
+        """
+        if source not in distances or distances[source] + cost >= distances.get(target, math.inf):
+            return
+        distances[target] = distances[source] + cost
+        queue: List[Tuple[float, str]] = [(distances[target], target)]
+        while queue:
+            distance, node = heapq.heappop(queue)
+            if distance > distances[node]:
+                continue
+            graph_node = graph.get_node(node)
+            if graph_node is None:
+                continue
+            for neighbor, edge_cost in graph_node.edges.items():
+                if distance + edge_cost < distances.get(neighbor, math.inf):
+                    distances[neighbor] = distance + edge_cost
+                    heapq.heappush(queue, (distances[neighbor], neighbor))
+
+    def __call__(self, node: str, goal: str) -> float:
+        estimate = 0
+        for distances_from, distances_to in zip(self.distances_from, self.distances_to):
+            # Only bounds where both distances are known are valid
+            landmark_to_node, landmark_to_goal = distances_from.get(node), distances_from.get(goal)
+            if landmark_to_node is not None and landmark_to_goal is not None:
+                estimate = max(estimate, landmark_to_goal - landmark_to_node)
+            node_to_landmark, goal_to_landmark = distances_to.get(node), distances_to.get(goal)
+            if node_to_landmark is not None and goal_to_landmark is not None:
+                estimate = max(estimate, node_to_landmark - goal_to_landmark)
+        return estimate
+
+    def save(self, path: str) -> None:
+        """
+        Saves the landmarks and distance tables to a JSON file.
+        
+        Args:
+            path (str): The path of the file to write.
+        """
+        with open(path, 'w') as file:
+            json.dump({
+                'landmarks': self.landmarks,
+                'distances_from': self.distances_from,
+                'distances_to': self.distances_to,
+            }, file)
+
+    @classmethod
+    def load(cls, path: str) -> 'LandmarkHeuristic':
+        """
+        Loads landmarks and distance tables saved with save().
+        
+        Args:
+            path (str): The path of the file to read.
+        
+        Returns:
+            LandmarkHeuristic: The heuristic.
+        """
+        with open(path) as file:
+            data = json.load(file)
+        return cls(data['landmarks'], data['distances_from'], data['distances_to'])
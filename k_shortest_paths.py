@@ -0,0 +1,277 @@
+import heapq
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+from astar_search import AStarSearch
+from graph import Graph, CSRGraph
+from priority_queues import PriorityQueue, LazyHeapQueue
+from search_cache import LRUCache
+from ucs_search import UCSSearch
+
+# The shortest distance from every city to a goal, and the next city on its shortest path to the goal
+GoalTree = Tuple[Dict[str, int], Dict[str, Optional[str]]]
+
+@dataclass
+class KShortestStats:
+    """
+    Counters of one k_shortest_paths query, for tuning K against latency.
+
+    Attributes:
+        spur_nodes (int): The spur nodes considered, i.e. the root paths from which a deviation was looked for.
+        searches (int): The searches actually run: spur searches plus the goal tree when it was not cached.
+        tree_hits (int): Spur paths read off the goal tree without searching.
+        pruned (int): Spur nodes skipped because no deviation from them could beat the candidates already found.
+        tree_cached (bool): True if the goal tree came from the cache.
+    """
+    spur_nodes: int = 0
+    searches: int = 0
+    tree_hits: int = 0
+    pruned: int = 0
+    tree_cached: bool = False
+
+class _SpurSearch(AStarSearch):
+    """
+    A* over the graph of a KShortestPathsSearch with the nodes and edges of a root path removed.
+
+    Its heuristic is the exact distance to the goal in the full graph, which removing nodes and edges can only
+    increase, so it stays consistent; cities that cannot reach the goal at all are never pushed.
+    """
+    def __init__(self, owner: 'KShortestPathsSearch', queue_factory: Callable[[], PriorityQueue]):
+        # Share the owner's graph storage, and look neighbors up through the owner's active storage
+        super().__init__(owner.graph_path, queue_factory=queue_factory)
+        self.owner = owner
+        self.to_goal: Dict[str, int] = {}
+        self.blocked_nodes: Set[str] = set()
+        self.blocked_edges: Set[Tuple[str, str]] = set()
+        self.heuristic = lambda node, goal: self.to_goal[node]
+
+    def get_neighbors(self, node_name: str) -> Optional[Iterable[Tuple[str, int]]]:
+        neighbors = self.owner.get_neighbors(node_name)
+        if neighbors is None:
+            return None
+        return [(neighbor, cost) for neighbor, cost in neighbors
+                if neighbor in self.to_goal and neighbor not in self.blocked_nodes
+                and (node_name, neighbor) not in self.blocked_edges]
+
+class KShortestPathsSearch(UCSSearch):
+    """
+    K shortest loopless paths (Yen's algorithm) on top of UCS.
+
+    Every new path is the cheapest deviation from one of the paths already found: it follows a found path up
+    to a spur node, then takes the shortest spur path to the goal that avoids the nodes of that root path and
+    the edges that the found paths take out of it. Spur searches are the expensive part, so they are avoided
+    where possible:
+        - One reverse shortest-path tree from the goal, cached per goal, gives the exact distance to the goal of
+          every city. When the tree's path from a spur node avoids the removed nodes and edges, it is the spur
+          path and no search is run; otherwise it guides an A* spur search.
+        - A path only deviates at or after the spur node it was found from (Lawler), so the shared prefix it
+          inherits is not searched again.
+        - A spur node whose root cost plus distance to the goal cannot beat the candidates already found is skipped.
+
+    search() is the plain UCS search.
+
+    Attributes:
+        trees (LRUCache): The cached reverse shortest-path trees, keyed by goal and invalidated when the graph changes.
+        k_shortest_stats (KShortestStats): The counters of the last k_shortest_paths query.
+
+    Methods:
+        k_shortest_paths(self, start: str, goal: str, k: int) -> List[Tuple[List[str], int]]:
+            Returns up to k loopless paths from the start to the goal, shortest first.
+    """
+    name: str = "K Shortest Paths"
+
+    def __init__(self, graph: Optional[Union[Graph, CSRGraph]] = None, compact: bool = False,
+                 queue_factory: Callable[[], PriorityQueue] = LazyHeapQueue, max_trees: int = 16):
+        """
+        Initializes the search.
+
+        Args:
+            graph (Optional[Union[Graph, CSRGraph]]): A loaded graph to search instead of the built-in ten-city graph.
+            compact (bool): If True, neighbors are iterated from a CSRGraph instead of the per-node edge dictionaries.
+            queue_factory (Callable[[], PriorityQueue]): Creates the priority queue of each search.
+            max_trees (int): The most goal trees kept.
+        """
+        super().__init__(graph, compact, queue_factory)
+        self.trees = LRUCache(max_trees)
+        self.k_shortest_stats = KShortestStats()
+        self._spur_search: Optional[_SpurSearch] = None
+
+    def k_shortest_paths(self, start: str, goal: str, k: int) -> List[Tuple[List[str], int]]:
+        """
+        Returns up to k loopless paths from the start to the goal, shortest first.
+
+        The search honors max_expansions and time_budget: once either runs out, the paths found so far are
+        returned and search_stats.budget_exceeded is set. search_stats count the nodes expanded by all the
+        searches run, and k_shortest_stats how many searches were needed.
+
+        Args:
+            start (str): The start city.
+            goal (str): The goal city.
+            k (int): The number of paths wanted.
+
+        Returns:
+            List[Tuple[List[str], int]]: The paths with their total distances, fewer than k if the graph has fewer.
+
+        Raises:
+            ValueError: If k is less than 1.
+        """
+        if k < 1:
+            raise ValueError("k must be at least 1.")
+        stats = self._begin_search()
+        start_time = time.perf_counter_ns()
+        out_of_budget = self._budget(stats, start_time)
+        self.k_shortest_stats = counters = KShortestStats()
+
+        to_goal, next_hop = self._goal_tree(goal, counters, out_of_budget)
+        if stats.budget_exceeded or start not in to_goal:
+            stats.elapsed_ns = time.perf_counter_ns() - start_time
+            return []
+
+        # The paths found, each with its cost after every edge and the index of the spur node it deviated at
+        found: List[Tuple[List[str], List[int], int]] = [self._tree_path(start, to_goal, next_hop, [0], 0)]
+        # The candidate deviations, cheapest first, and every path ever proposed so none is proposed twice
+        candidates: List[Tuple[int, List[str], List[int], int]] = []
+        proposed: Set[Tuple[str, ...]] = {tuple(found[0][0])}
+
+        while len(found) < k:
+            path, costs, deviation = found[-1]
+            for index in range(deviation, len(path) - 1):
+                if out_of_budget is not None and out_of_budget(stats.nodes_expanded):
+                    break
+                counters.spur_nodes += 1
+                spur, root = path[index], path[:index + 1]
+
+                # Remove the root path's nodes and the edges the found paths take out of the spur node
+                blocked_nodes = set(root[:-1])
+                blocked_edges = {(spur, other[index + 1]) for other, _, _ in found
+                                 if len(other) > index + 1 and other[:index + 1] == root}
+
+                # The edges left out of the spur node, with a lower bound on the spur path through each of them
+                options = self._spur_options(spur, to_goal, blocked_nodes, blocked_edges)
+                if not options:
+                    continue
+
+                # Skip the spur node if even its lower bound cannot beat enough candidates
+                needed = k - len(found)
+                if len(candidates) >= needed and costs[index] + options[0][0] >= heapq.nsmallest(needed, candidates)[-1][0]:
+                    counters.pruned += 1
+                    continue
+
+                deviation_path = self._tree_spur(spur, options, to_goal, next_hop, blocked_nodes, root, costs, index)
+                if deviation_path is not None:
+                    counters.tree_hits += 1
+                else:
+                    counters.searches += 1
+                    deviation_path = self._searched_spur(spur, goal, to_goal, blocked_nodes, blocked_edges, root, costs,
+                                                         index, start_time)
+                    stats.nodes_expanded += self._spur_search.search_stats.nodes_expanded
+                    if self._spur_search.search_stats.budget_exceeded:
+                        stats.budget_exceeded = True
+                        break
+                if deviation_path is not None and tuple(deviation_path[0]) not in proposed:
+                    proposed.add(tuple(deviation_path[0]))
+                    heapq.heappush(candidates, (deviation_path[1][-1], deviation_path[0], deviation_path[1], index))
+            if stats.budget_exceeded or not candidates:
+                break
+            _, path, costs, deviation = heapq.heappop(candidates)
+            found.append((path, costs, deviation))
+
+        stats.elapsed_ns = time.perf_counter_ns() - start_time
+        return [(path, costs[-1]) for path, costs, _ in found]
+
+    def _goal_tree(self, goal: str, counters: KShortestStats,
+                   out_of_budget: Optional[Callable[[int], bool]]) -> GoalTree:
+        """
+        Returns the reverse shortest-path tree of a goal, from the cache or from a new reverse UCS expansion.
+
+        A tree cut short by the budget is returned incomplete, with search_stats.budget_exceeded set, and is not cached.
+        """
+        version = self.graph_version
+        tree: Optional[GoalTree] = self.trees.get(goal, version)
+        if tree is not None:
+            counters.tree_cached = True
+            return tree
+        counters.searches += 1
+        stats = self.search_stats
+        to_goal: Dict[str, int] = {}
+        next_hop: Dict[str, Optional[str]] = {goal: None}
+        for node, cost in self._settle(goal, True, next_hop):
+            if out_of_budget is not None and out_of_budget(stats.nodes_expanded):
+                return to_goal, next_hop
+            to_goal[node] = cost
+            stats.nodes_expanded += 1
+        self.trees.put(goal, version, (to_goal, next_hop))
+        return to_goal, next_hop
+
+    @staticmethod
+    def _tree_path(node: str, to_goal: Dict[str, int], next_hop: Dict[str, Optional[str]],
+                   costs: List[int], deviation: int) -> Tuple[List[str], List[int], int]:
+        """
+        Follows the goal tree from a node to the goal, extending the costs of the path that leads to the node.
+        """
+        path = [node]
+        costs = list(costs)
+        while next_hop[path[-1]] is not None:
+            path.append(next_hop[path[-1]])
+            costs.append(costs[-1] + to_goal[path[-2]] - to_goal[path[-1]])
+        return path, costs, deviation
+
+    def _spur_options(self, spur: str, to_goal: Dict[str, int], blocked_nodes: Set[str],
+                      blocked_edges: Set[Tuple[str, str]]) -> List[Tuple[int, str, int]]:
+        """
+        Returns the (lower bound, neighbor, edge cost) of every edge left out of the spur node towards the goal, cheapest first.
+
+        The lower bound is the edge cost plus the neighbor's distance to the goal in the full graph.
+        """
+        options = [(cost + to_goal[neighbor], neighbor, cost) for neighbor, cost in self.get_neighbors(spur)
+                   if neighbor in to_goal and neighbor != spur and neighbor not in blocked_nodes
+                   and (spur, neighbor) not in blocked_edges]
+        options.sort()
+        return options
+
+    def _tree_spur(self, spur: str, options: List[Tuple[int, str, int]], to_goal: Dict[str, int],
+                   next_hop: Dict[str, Optional[str]], blocked_nodes: Set[str], root: List[str], costs: List[int],
+                   index: int) -> Optional[Tuple[List[str], List[int]]]:
+        """
+        Returns the deviation that takes a cheapest edge out of the spur node and then follows the goal tree,
+        or None if every such tree path runs into the root path.
+
+        Such a path reaches the lower bound of all spur paths, so when it avoids the root path it is a shortest spur path.
+        """
+        for bound, neighbor, cost in options:
+            if bound > options[0][0]:
+                break
+            spur_path, spur_costs, _ = self._tree_path(neighbor, to_goal, next_hop, costs[:index + 1] + [costs[index] + cost], index)
+            if spur not in spur_path and blocked_nodes.isdisjoint(spur_path):
+                return root + spur_path, spur_costs
+        return None
+
+    def _searched_spur(self, spur: str, goal: str, to_goal: Dict[str, int], blocked_nodes: Set[str],
+                       blocked_edges: Set[Tuple[str, str]], root: List[str], costs: List[int],
+                       index: int, start_time: int) -> Optional[Tuple[List[str], List[int]]]:
+        """
+        Runs an A* spur search with the root path removed, and returns the deviation it finds, if any.
+
+        The spur search gets what is left of the query's expansions and time, so it stops when the query's budget runs out.
+        """
+        if self._spur_search is None:
+            self._spur_search = _SpurSearch(self, self.queue_factory)
+        spur_search = self._spur_search
+        spur_search.to_goal, spur_search.blocked_nodes, spur_search.blocked_edges = to_goal, blocked_nodes, blocked_edges
+        spur_search.max_expansions = (self.max_expansions - self.search_stats.nodes_expanded
+                                      if self.max_expansions is not None else None)
+        spur_search.time_budget = (self.time_budget - (time.perf_counter_ns() - start_time) / 1e9
+                                   if self.time_budget is not None else None)
+        spur_path, _, _, _ = spur_search.search(spur, goal)
+        if spur_path is None:
+            return None
+        spur_costs = costs[:index + 1]
+        for node, neighbor in zip(spur_path, spur_path[1:]):
+            spur_costs.append(spur_costs[-1] + self._edge_cost(node, neighbor))
+        return root[:-1] + spur_path, spur_costs
+
+    def _edge_cost(self, node: str, neighbor: str) -> int:
+        """
+        Returns the cost of the cheapest edge from a node to a neighbor.
+        """
+        return min(cost for target, cost in self.get_neighbors(node) if target == neighbor)
@@ -0,0 +1,180 @@
+import multiprocessing
+import os
+import queue
+import sys
+from itertools import islice
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from algorithms import ALGORITHMS, create_search
+from base_search import GraphSearch
+from graph import Graph, CSRGraph
+from graph_binary import open_binary_graph
+from graph_loader import load_graph
+
+# A query job: (algorithm name, start city, goal city)
+Job = Tuple[str, str, str]
+
+@dataclass
+class QueryResult:
+    """
+    The result of one query job.
+    
+    Attributes:
+        index (int): The position of the job in the submitted jobs.
+        algorithm (str): The algorithm name.
+        start (str): The start city.
+        goal (str): The goal city.
+        path (Optional[List[str]]): The path found, or None.
+        cities_visited (int): The number of cities visited, as reported by the search.
+        distance (int): The total distance of the path.
+        time_taken (float): The time taken by the search, in seconds.
+        budget_exceeded (bool): True if the search ran out of the worker's time budget before finding a path.
+    """
+    index: int
+    algorithm: str
+    start: str
+    goal: str
+    path: Optional[List[str]]
+    cities_visited: int
+    distance: int
+    time_taken: float
+    budget_exceeded: bool = False
+
+def load_shared_graph(graph_file: Optional[str]) -> Optional[Union[Graph, CSRGraph]]:
+    """
+    Loads the graph searched by a worker.
+    
+    Binary graph files (`.bin`) are memory-mapped, so all workers share the same page-cache pages; other
+    files are parsed with graph_loader.load_graph.
+    
+    Args:
+        graph_file (Optional[str]): The path of the graph file, or None for the built-in ten-city graph.
+    
+    Returns:
+        Optional[Union[Graph, CSRGraph]]: The graph, or None for the built-in graph.
+    """
+    if graph_file is None:
+        return None
+    if graph_file.endswith('.bin'):
+        return open_binary_graph(graph_file)
+    return load_graph(graph_file)
+
+class WorkerState:
+    """
+    The graph and searches of one worker, set up once instead of being pickled with every job.
+
+    Worker processes keep one per process, set up by initialize_worker and used by run_job. A worker thread
+    inside another process, such as the single-thread mode of search_service, keeps its own WorkerState so it
+    does not share state with run_parallel.
+    """
+    def __init__(self):
+        self.graph: Optional[Union[Graph, CSRGraph]] = None
+        self.searches: Dict[str, GraphSearch] = {}
+        self.time_budget: Optional[float] = None
+
+    def initialize(self, graph_file: Optional[str], time_budget: Optional[float] = None) -> None:
+        """
+        Loads the graph once when the worker starts, and sets the time budget of the worker's searches.
+        """
+        self.time_budget = time_budget
+        self.graph = load_shared_graph(graph_file)
+        if self.graph is None:
+            # Build the built-in graph once and share it between the worker's searches
+            self.graph = create_search('bfs').graph
+        self.searches.clear()
+
+    def run_job(self, indexed_job: Tuple[int, Job]) -> QueryResult:
+        """
+        Runs one job, reusing the worker's search for the job's algorithm.
+        """
+        index, (algorithm, start, goal) = indexed_job
+        search = self.searches.get(algorithm)
+        if search is None:
+            search = self.searches[algorithm] = create_search(algorithm, self.graph)
+            search.time_budget = self.time_budget
+        path, cities_visited, distance, time_taken = search.search(start, goal)
+        return QueryResult(index, algorithm, start, goal, path, cities_visited, distance, time_taken,
+                           search.search_stats.budget_exceeded)
+
+# The state of a worker process of run_parallel
+_worker_state = WorkerState()
+
+def initialize_worker(graph_file: Optional[str], time_budget: Optional[float] = None) -> None:
+    """
+    Loads the graph once when a worker process starts, and sets the time budget of the worker's searches.
+
+    Used as the initializer of a process pool, such as that of run_parallel or search_service.
+    """
+    _worker_state.initialize(graph_file, time_budget)
+
+def run_job(indexed_job: Tuple[int, Job]) -> QueryResult:
+    """
+    Runs one job in a worker process.
+    """
+    return _worker_state.run_job(indexed_job)
+
+def _run_jobs(indexed_jobs: List[Tuple[int, Job]]) -> List[QueryResult]:
+    """
+    Runs a chunk of jobs in a worker.
+    """
+    return [run_job(indexed_job) for indexed_job in indexed_jobs]
+
+def _validated(jobs: Iterable[Job]) -> Iterator[Tuple[int, Job]]:
+    """
+    Numbers the jobs and checks their algorithm names before they are sent to the workers.
+    """
+    for index, job in enumerate(jobs):
+        if job[0] not in ALGORITHMS:
+            raise ValueError(f"Job {index}: unknown algorithm {job[0]!r}, expected one of {', '.join(ALGORITHMS)}")
+        yield index, job
+
+def run_parallel(jobs: Iterable[Job], graph_file: Optional[str] = None, processes: Optional[int] = None,
+                 chunksize: int = 16) -> Iterator[QueryResult]:
+    """
+    Runs query jobs across a pool of worker processes and yields the results in completion order.
+    
+    Every worker loads the graph once when it starts; jobs only carry their algorithm name and cities.
+    Jobs are submitted in chunks, with at most two chunks per worker in flight: the next chunk is only taken
+    from the jobs when one completes, so the job list can be a generator of any length.
+    
+    Args:
+        jobs (Iterable[Job]): The (algorithm, start, goal) jobs.
+        graph_file (Optional[str]): The graph file each worker loads; a `.bin` file is memory-mapped and shared.
+            None searches the built-in ten-city graph.
+        processes (Optional[int]): The number of worker processes, by default one per CPU.
+        chunksize (int): The number of jobs sent to a worker at a time.
+    
+    Returns:
+        Iterator[QueryResult]: The results, in the order the jobs complete; use QueryResult.index to match them to jobs.
+    
+    Raises:
+        ValueError: If a job names an unknown algorithm.
+    """
+    max_in_flight = 2 * (processes or os.cpu_count() or 1)
+    indexed_jobs = _validated(jobs)
+    chunks = iter(lambda: list(islice(indexed_jobs, chunksize)), [])
+    # Completed chunks, or the exception a chunk raised, in completion order
+    completed: queue.Queue = queue.Queue()
+    with multiprocessing.Pool(processes, initializer=initialize_worker, initargs=(graph_file,)) as pool:
+        in_flight = 0
+        for chunk in islice(chunks, max_in_flight):
+            pool.apply_async(_run_jobs, (chunk,), callback=completed.put, error_callback=completed.put)
+            in_flight += 1
+        while in_flight:
+            results = completed.get()
+            in_flight -= 1
+            if isinstance(results, BaseException):
+                raise results
+            # Refill before yielding, so the workers stay busy while the caller handles the results
+            for chunk in islice(chunks, 1):
+                pool.apply_async(_run_jobs, (chunk,), callback=completed.put, error_callback=completed.put)
+                in_flight += 1
+            yield from results
+
+if __name__ == "__main__":
+    graph_file = sys.argv[1] if len(sys.argv) > 1 else None
+    cities = create_search('bfs', load_shared_graph(graph_file)).cities
+    all_jobs = [(algorithm, start, goal) for algorithm in ALGORITHMS for start in cities for goal in cities]
+    for query_result in run_parallel(all_jobs, graph_file):
+        print(f"{query_result.algorithm}: {query_result.start} -> {query_result.goal}: "
+              f"{query_result.distance} miles, {query_result.cities_visited} cities visited")
@@ -0,0 +1,310 @@
+import heapq
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+@dataclass
+class QueueStats:
+    """
+    Counters kept by every priority queue.
+    
+    Attributes:
+        pushes (int): The number of entries inserted, including decrease-keys.
+        decrease_keys (int): The number of pushes that lowered the priority of an item already queued.
+        dominated_pushes (int): The number of pushes ignored because the item was already queued with a priority at least as low.
+        pops (int): The number of items popped.
+        stale_pops (int): The number of outdated entries discarded on pop (lazy deletion only).
+        peak_size (int): The largest number of entries held at once, including outdated ones.
+    """
+    pushes: int = 0
+    decrease_keys: int = 0
+    dominated_pushes: int = 0
+    pops: int = 0
+    stale_pops: int = 0
+    peak_size: int = 0
+
+    def __add__(self, other: 'QueueStats') -> 'QueueStats':
+        """
+        Sums the counters of two queues, e.g. the two sides of a bidirectional search; the peak sizes are added too.
+        """
+        return QueueStats(*(getattr(self, name) + getattr(other, name) for name in self.__dataclass_fields__))
+
+class PriorityQueue(ABC):
+    """
+    Base class for the min-priority queues used by UCS-style searches.
+    
+    Each item is queued at most once: pushing an item that is already queued lowers its priority if the
+    new one is lower, and is ignored otherwise.
+    
+    Attributes:
+        stats (QueueStats): The counters of the queue.
+    
+    Methods:
+        push: Inserts an item, or lowers its priority if it is already queued.
+        pop: Removes and returns the item with the lowest priority.
+        peek: Returns the item with the lowest priority without removing it.
+    """
+    def __init__(self):
+        self.stats = QueueStats()
+
+    @abstractmethod
+    def push(self, priority: Any, item: Any) -> None:
+        """
+        Inserts an item, or lowers its priority if it is already queued.
+        
+        Args:
+            priority (Any): The priority of the item; lower is popped first.
+            item (Any): The item.
+        """
+        raise NotImplementedError("Subclasses must implement the push method.")
+
+    @abstractmethod
+    def pop(self) -> Tuple[Any, Any]:
+        """
+        Removes and returns the item with the lowest priority.
+        
+        Returns:
+            Tuple[Any, Any]: The priority and the item.
+        
+        Raises:
+            IndexError: If the queue is empty.
+        """
+        raise NotImplementedError("Subclasses must implement the pop method.")
+
+    @abstractmethod
+    def peek(self) -> Tuple[Any, Any]:
+        """
+        Returns the item with the lowest priority without removing it.
+        
+        Returns:
+            Tuple[Any, Any]: The priority and the item.
+        
+        Raises:
+            IndexError: If the queue is empty.
+        """
+        raise NotImplementedError("Subclasses must implement the peek method.")
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """
+        Returns the number of items queued, not counting outdated entries.
+        """
+        raise NotImplementedError("Subclasses must implement the __len__ method.")
+
+class LazyHeapQueue(PriorityQueue):
+    """
+    A binary heap (heapq) with lazy deletion.
+    
+    Lowering the priority of a queued item pushes a second entry and leaves the old one in the heap;
+    outdated entries are recognized and discarded when they reach the top.
+    """
+    def __init__(self):
+        super().__init__()
+        self._heap: List[Tuple[Any, Any]] = []
+        # Current priority of every queued item
+        self._priorities: Dict[Any, Any] = {}
+
+    def push(self, priority: Any, item: Any) -> None:
+        current = self._priorities.get(item)
+        if current is not None:
+            if priority >= current:
+                self.stats.dominated_pushes += 1
+                return
+            self.stats.decrease_keys += 1
+        self._priorities[item] = priority
+        heapq.heappush(self._heap, (priority, item))
+        self.stats.pushes += 1
+        self.stats.peak_size = max(self.stats.peak_size, len(self._heap))
+
+    def pop(self) -> Tuple[Any, Any]:
+        priority, item = self.peek()
+        heapq.heappop(self._heap)
+        del self._priorities[item]
+        self.stats.pops += 1
+        return priority, item
+
+    def peek(self) -> Tuple[Any, Any]:
+        # Discard outdated entries until the top one is current
+        while self._heap:
+            priority, item = self._heap[0]
+            if self._priorities.get(item) == priority:
+                return priority, item
+            heapq.heappop(self._heap)
+            self.stats.stale_pops += 1
+        raise IndexError("peek at an empty priority queue")
+
+    def __len__(self) -> int:
+        return len(self._priorities)
+
+class DaryHeapQueue(PriorityQueue):
+    """
+    An indexed d-ary heap with decrease-key.
+    
+    The position of every item in the heap is tracked, so lowering a priority moves the existing entry
+    up instead of adding a new one, and the heap never holds outdated entries. A larger arity makes the
+    heap shallower, trading cheaper decrease-keys for more comparisons per pop.
+    
+    Attributes:
+        arity (int): The number of children per heap node.
+    """
+    def __init__(self, arity: int = 4):
+        super().__init__()
+        if arity < 2:
+            raise ValueError("arity must be at least 2.")
+        self.arity = arity
+        self._priorities: List[Any] = []
+        self._items: List[Any] = []
+        # Index in the heap arrays of every queued item
+        self._positions: Dict[Any, int] = {}
+
+    def push(self, priority: Any, item: Any) -> None:
+        position = self._positions.get(item)
+        if position is None:
+            position = len(self._items)
+            self._priorities.append(priority)
+            self._items.append(item)
+            self._positions[item] = position
+        elif priority >= self._priorities[position]:
+            self.stats.dominated_pushes += 1
+            return
+        else:
+            self._priorities[position] = priority
+            self.stats.decrease_keys += 1
+        self._sift_up(position)
+        self.stats.pushes += 1
+        self.stats.peak_size = max(self.stats.peak_size, len(self._items))
+
+    def pop(self) -> Tuple[Any, Any]:
+        if not self._items:
+            raise IndexError("pop from an empty priority queue")
+        priority, item = self._priorities[0], self._items[0]
+        del self._positions[item]
+        last_priority, last_item = self._priorities.pop(), self._items.pop()
+        if self._items:
+            self._priorities[0], self._items[0] = last_priority, last_item
+            self._positions[last_item] = 0
+            self._sift_down(0)
+        self.stats.pops += 1
+        return priority, item
+
+    def peek(self) -> Tuple[Any, Any]:
+        if not self._items:
+            raise IndexError("peek at an empty priority queue")
+        return self._priorities[0], self._items[0]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _move(self, position: int, priority: Any, item: Any) -> None:
+        """
+        Places an item at a heap position and records its position.
+        """
+        self._priorities[position] = priority
+        self._items[position] = item
+        self._positions[item] = position
+
+    def _sift_up(self, position: int) -> None:
+        """
+        Moves the entry at a position up until its parent has a lower or equal priority.
+        """
+        priority, item = self._priorities[position], self._items[position]
+        while position > 0:
+            parent = (position - 1) // self.arity
+            if self._priorities[parent] <= priority:
+                break
+            self._move(position, self._priorities[parent], self._items[parent])
+            position = parent
+        self._move(position, priority, item)
+
+    def _sift_down(self, position: int) -> None:
+        """
+        Moves the entry at a position down until all its children have a higher or equal priority.
+        """
+        priority, item = self._priorities[position], self._items[position]
+        size = len(self._items)
+        while True:
+            first_child = position * self.arity + 1
+            if first_child >= size:
+                break
+            last_child = min(first_child + self.arity, size)
+            smallest = min(range(first_child, last_child), key=self._priorities.__getitem__)
+            if self._priorities[smallest] >= priority:
+                break
+            self._move(position, self._priorities[smallest], self._items[smallest])
+            position = smallest
+        self._move(position, priority, item)
+
+class BucketQueue(PriorityQueue):
+    """
+    A monotone bucket queue (Dial's algorithm) for small non-negative integer priorities.
+    
+    Items are kept in a circular array of buckets indexed by priority. Pops must come out in non-decreasing
+    priority order, which holds for UCS with non-negative integer edge costs; a push then never lands more
+    than the largest edge cost past the last popped priority. The array grows when a push falls outside it.
+    Lowering a priority uses lazy deletion, as in LazyHeapQueue.
+    
+    Attributes:
+        num_buckets (int): The current number of buckets.
+    """
+    def __init__(self, num_buckets: int = 64):
+        super().__init__()
+        self.num_buckets = num_buckets
+        self._buckets: List[List[Tuple[int, Any]]] = [[] for _ in range(num_buckets)]
+        self._cursor = 0
+        self._size = 0
+        self._priorities: Dict[Any, int] = {}
+
+    def push(self, priority: int, item: Any) -> None:
+        if not isinstance(priority, int):
+            raise ValueError("BucketQueue only supports integer priorities.")
+        if priority < self._cursor:
+            raise ValueError("BucketQueue priorities must not be lower than the last popped priority.")
+        current = self._priorities.get(item)
+        if current is not None:
+            if priority >= current:
+                self.stats.dominated_pushes += 1
+                return
+            self.stats.decrease_keys += 1
+        while priority - self._cursor >= self.num_buckets:
+            self._grow()
+        self._priorities[item] = priority
+        self._buckets[priority % self.num_buckets].append((priority, item))
+        self._size += 1
+        self.stats.pushes += 1
+        self.stats.peak_size = max(self.stats.peak_size, self._size)
+
+    def pop(self) -> Tuple[int, Any]:
+        priority, item = self.peek()
+        self._buckets[self._cursor % self.num_buckets].pop()
+        self._size -= 1
+        del self._priorities[item]
+        self.stats.pops += 1
+        return priority, item
+
+    def peek(self) -> Tuple[int, Any]:
+        # Advance to the first non-empty bucket, discarding outdated entries on the way
+        while self._size:
+            bucket = self._buckets[self._cursor % self.num_buckets]
+            if not bucket:
+                self._cursor += 1
+                continue
+            priority, item = bucket[-1]
+            if self._priorities.get(item) == priority:
+                return priority, item
+            bucket.pop()
+            self._size -= 1
+            self.stats.stale_pops += 1
+        raise IndexError("peek at an empty priority queue")
+
+    def __len__(self) -> int:
+        return len(self._priorities)
+
+    def _grow(self) -> None:
+        """
+        Doubles the number of buckets and redistributes the queued entries.
+        """
+        entries = [entry for bucket in self._buckets for entry in bucket]
+        self.num_buckets *= 2
+        self._buckets = [[] for _ in range(self.num_buckets)]
+        for priority, item in entries:
+            self._buckets[priority % self.num_buckets].append((priority, item))
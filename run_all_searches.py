@@ -1,15 +1,35 @@
+import argparse
+import json
+import sys
+from dataclasses import asdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
 from dfs_search import DFSSearch
 from bfs_search import BFSSearch
 from ucs_search import UCSSearch
+from astar_search import AStarSearch
+from heuristics import GreatCircleHeuristic
+from bidirectional_search import BidirectionalBFSSearch, BidirectionalUCSSearch
+from algorithms import ALGORITHMS, create_search
+from base_search import GraphSearch
+from graph import Graph, CSRGraph, GraphPath
+from parallel_search import load_shared_graph
+
+# A query read in batch mode: its id, start city, goal city, and the algorithm it asks for (None for the command-line ones)
+Query = Tuple[Any, str, str, Optional[str]]
 
 def run_all_searches():
     """
     Runs all the search algorithms.
     """
+    # Build the graph once and share it between all searches
+    graph = GraphPath().get_graph()
     searches = [
-        ("Breadth-First Search", BFSSearch()),
-        ("Depth-First Search", DFSSearch()),
-        ("Uniform Cost Search", UCSSearch())
+        ("Breadth-First Search", BFSSearch(graph)),
+        ("Depth-First Search", DFSSearch(graph)),
+        ("Uniform Cost Search", UCSSearch(graph)),
+        ("A* Search", AStarSearch(graph, heuristic=GreatCircleHeuristic.from_graph(graph))),
+        ("Bidirectional Breadth-First Search", BidirectionalBFSSearch(graph)),
+        ("Bidirectional Uniform Cost Search", BidirectionalUCSSearch(graph))
     ]
 
     # Get user input once
@@ -22,11 +42,150 @@ def run_all_searches():
 
     for name, search in searches:
         print(f"=== {name} ===")
-        
+
         # Run the search using the algorithm's run_search method with pre-selected cities
         search.run_search(start_city, goal_city)
-        
+
         print()
 
+def read_queries(lines: Iterable[str]) -> Iterator[Union[Query, ValueError]]:
+    """
+    Parses queries from JSON lines, one at a time.
+
+    Each line is either an object such as {"id": 7, "start": "Boston", "goal": "Richmond", "algorithm": "ucs"},
+    where id and algorithm are optional, or a [start, goal] array. Blank lines are skipped. A query without
+    an id gets its line number.
+
+    Args:
+        lines (Iterable[str]): The lines to parse, e.g. sys.stdin.
+
+    Returns:
+        Iterator[Union[Query, ValueError]]: The queries, with a ValueError in place of every line that could not be parsed.
+    """
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as error:
+            yield ValueError(f"Line {line_number}: invalid JSON: {error}")
+            continue
+        if isinstance(data, list) and len(data) == 2:
+            yield line_number, data[0], data[1], None
+        elif isinstance(data, dict) and 'start' in data and 'goal' in data:
+            yield data.get('id', line_number), data['start'], data['goal'], data.get('algorithm')
+        else:
+            yield ValueError(f"Line {line_number}: expected a [start, goal] array or an object with start and goal")
+
+def answer_query(search: GraphSearch, algorithm: str, query_id: Any, start: str, goal: str) -> Dict[str, Any]:
+    """
+    Runs one query and returns its result as a JSON-serializable record.
+
+    Args:
+        search (GraphSearch): The search for the algorithm.
+        algorithm (str): The algorithm name, as in ALGORITHMS.
+        query_id (Any): The id of the query, echoed in the record.
+        start (str): The start city.
+        goal (str): The goal city.
+
+    Returns:
+        Dict[str, Any]: The record, with the path, cities visited, distance, time taken and search stats,
+            or an error if a city is not in the graph.
+    """
+    record: Dict[str, Any] = {'id': query_id, 'algorithm': algorithm, 'start': start, 'goal': goal}
+    for city in (start, goal):
+        if not isinstance(city, str) or not search.has_city(city):
+            record['error'] = f"Unknown city {city!r}"
+            return record
+    path, cities_visited, distance, time_taken = search.search(start, goal)
+    record.update(path=path, cities_visited=cities_visited, distance=distance, time_taken=time_taken,
+                  stats=asdict(search.search_stats))
+    return record
+
+def run_batch(graph: Union[Graph, CSRGraph], algorithms: List[str], queries: Iterable[Union[Query, ValueError]],
+              output: TextIO, flush: bool = False) -> int:
+    """
+    Runs queries with the given algorithms and writes one JSON line per result.
+
+    Queries are read and answered one at a time, so the memory used does not grow with the number of queries.
+    Every algorithm keeps a single search over the shared graph.
+
+    Args:
+        graph (Union[Graph, CSRGraph]): The graph to search.
+        algorithms (List[str]): The algorithms run for every query that does not name its own.
+        queries (Iterable[Union[Query, ValueError]]): The queries, as returned by read_queries; errors are written as records.
+        output (TextIO): Where the JSON lines are written.
+        flush (bool): If True, flush the output after every line, for consumers that wait for each result.
+
+    Returns:
+        int: The number of records that are errors.
+    """
+    searches: Dict[str, GraphSearch] = {}
+    errors = 0
+    for query in queries:
+        if isinstance(query, ValueError):
+            records = [{'error': str(query)}]
+        else:
+            query_id, start, goal, query_algorithm = query
+            records = []
+            for algorithm in ([query_algorithm] if query_algorithm is not None else algorithms):
+                if not isinstance(algorithm, str) or algorithm not in ALGORITHMS:
+                    records.append({'id': query_id, 'algorithm': algorithm, 'start': start, 'goal': goal,
+                                    'error': f"Unknown algorithm {algorithm!r}, expected one of {', '.join(ALGORITHMS)}"})
+                    continue
+                search = searches.get(algorithm)
+                if search is None:
+                    search = searches[algorithm] = create_search(algorithm, graph)
+                records.append(answer_query(search, algorithm, query_id, start, goal))
+        for record in records:
+            errors += 'error' in record
+            output.write(json.dumps(record, separators=(',', ':')) + '\n')
+            if flush:
+                output.flush()
+    output.flush()
+    return errors
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    The command-line entry point.
+
+    Without arguments and with a terminal on stdin, all the searches are run interactively. Otherwise queries are
+    answered in batch mode: they come from --query or, if none is given, from JSON lines on stdin, and each result
+    is written to stdout as a JSON line. Nothing else is printed to stdout, so the output can be piped.
+
+    Args:
+        argv (Optional[List[str]]): The arguments, by default sys.argv[1:].
+
+    Returns:
+        int: The exit status, 1 if any query failed.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv and sys.stdin.isatty():
+        run_all_searches()
+        return 0
+
+    parser = argparse.ArgumentParser(
+        description="Answer shortest-path queries in batch mode, writing one JSON line per result.",
+        epilog='Queries on stdin are JSON lines: ["Boston", "Richmond"] or {"id": 1, "start": "Boston", "goal": "Richmond"}.')
+    parser.add_argument('--graph', help="graph file (.csv, .tsv, .gr, .osm or .bin); by default the built-in ten-city graph")
+    parser.add_argument('--algorithm', action='append', choices=list(ALGORITHMS) + ['all'],
+                        help="algorithm to run, may be repeated; 'all' runs every algorithm (default: ucs)")
+    parser.add_argument('--query', nargs=2, action='append', metavar=('START', 'GOAL'),
+                        help="query to answer, may be repeated; without it, queries are read from stdin")
+    parser.add_argument('--flush', action='store_true', help="flush stdout after every result")
+    args = parser.parse_args(argv)
+
+    algorithms = args.algorithm or ['ucs']
+    if 'all' in algorithms:
+        algorithms = list(ALGORITHMS)
+    graph = load_shared_graph(args.graph)
+    if graph is None:
+        graph = GraphPath().get_graph()
+    if args.query:
+        queries: Iterable[Union[Query, ValueError]] = ((i, start, goal, None) for i, (start, goal) in enumerate(args.query, 1))
+    else:
+        queries = read_queries(sys.stdin)
+    return 1 if run_batch(graph, algorithms, queries, sys.stdout, args.flush) else 0
+
 if __name__ == "__main__":
-    run_all_searches()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,238 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from base_search import GraphSearch, SearchStats
+from ucs_search import UCSSearch
+
+SearchResult = Tuple[Optional[List[str]], int, int, float]
+
+@dataclass
+class CacheStats:
+    """
+    Counters of a search cache.
+    
+    Attributes:
+        hits (int): Lookups answered from the cache, including from cached search trees.
+        tree_hits (int): Lookups answered from a cached UCS search tree of an earlier query from the same start.
+        misses (int): Lookups that ran a search.
+        evictions (int): Entries dropped to stay within the size limit.
+        expirations (int): Entries dropped because they outlived the time-to-live.
+        invalidations (int): Entries dropped because the graph changed since they were cached.
+    """
+    hits: int = 0
+    tree_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Returns the share of lookups answered from the cache.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+@dataclass
+class _CacheEntry:
+    value: Any
+    version: int
+    created: float
+
+class LRUCache:
+    """
+    A bounded cache with least-recently-used eviction, an optional time-to-live, and graph-version invalidation.
+    
+    Every entry remembers the graph version it was computed for; looking it up with another version drops it.
+    
+    Attributes:
+        max_entries (int): The most entries kept; the least recently used one is evicted beyond that.
+        ttl (Optional[float]): How long an entry stays valid, in seconds, or None to keep entries until evicted.
+        stats (CacheStats): The counters of the cache.
+    
+    Methods:
+        get(self, key: Hashable, version: int) -> Optional[Any]: Returns a cached value.
+        put(self, key: Hashable, version: int, value: Any) -> None: Caches a value.
+        clear(self) -> None: Drops every entry.
+    """
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None, clock: Callable[[], float] = time.monotonic,
+                 stats: Optional[CacheStats] = None):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = stats if stats is not None else CacheStats()
+        self._clock = clock
+        self._entries: 'OrderedDict[Hashable, _CacheEntry]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, version: int) -> Optional[Any]:
+        """
+        Returns a cached value, dropping it if it is expired or was computed for another graph version.
+        
+        Args:
+            key (Hashable): The key of the value.
+            version (int): The current graph version.
+        
+        Returns:
+            Optional[Any]: The value, or None if it is not cached or no longer valid.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.version != version:
+            del self._entries[key]
+            self.stats.invalidations += 1
+            return None
+        if self.ttl is not None and self._clock() - entry.created > self.ttl:
+            del self._entries[key]
+            self.stats.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def put(self, key: Hashable, version: int, value: Any) -> None:
+        """
+        Caches a value, evicting the least recently used entries beyond max_entries.
+        
+        Args:
+            key (Hashable): The key of the value.
+            version (int): The graph version the value was computed for.
+            value (Any): The value.
+        """
+        self._entries[key] = _CacheEntry(value, version, self._clock())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        """
+        Drops every entry.
+        """
+        self._entries.clear()
+
+@dataclass
+class _SearchTree:
+    """
+    The search tree of a UCS search: exact costs and predecessors of its settled cities, and their settling order.
+    """
+    costs: Dict[str, int]
+    parents: Dict[str, Optional[str]]
+    exploration_path: List[str]
+    ranks: Optional[Dict[str, int]] = None
+
+    def rank(self, city: str) -> Optional[int]:
+        """
+        Returns how many cities had been settled when the city was, or None if it was not settled.
+        """
+        if self.ranks is None:
+            self.ranks = {settled: rank for rank, settled in enumerate(self.exploration_path, 1)}
+        return self.ranks.get(city)
+
+class CachedSearch:
+    """
+    Wraps a search and caches its results, keyed on (algorithm, start, goal).
+    
+    Results are invalidated automatically when the graph version changes. For plain UCS, the search tree of
+    each query is also cached per start city, so a later query from the same start to any city that the
+    earlier search already settled is answered without searching, with the same result UCS would return.
+    Other attributes, such as cities and select_city, are those of the wrapped search.
+    
+    Attributes:
+        wrapped (GraphSearch): The search whose results are cached.
+        algorithm (str): The algorithm name used in cache keys.
+        results (LRUCache): The cached results.
+        trees (Optional[LRUCache]): The cached UCS search trees, or None if the search is not plain UCS.
+        stats (CacheStats): The counters, shared by results and trees.
+    
+    Methods:
+        search(self, start: str, goal: str) -> Tuple[Optional[List[str]], int, int, float]: Returns a cached or new result.
+    """
+    def __init__(self, search: GraphSearch, algorithm: Optional[str] = None, max_entries: int = 1024,
+                 ttl: Optional[float] = None, max_trees: int = 64, clock: Callable[[], float] = time.monotonic):
+        """
+        Initializes the cache.
+        
+        Args:
+            search (GraphSearch): The search whose results are cached.
+            algorithm (Optional[str]): The algorithm name used in cache keys; defaults to the class name of the search.
+            max_entries (int): The most results kept.
+            ttl (Optional[float]): How long results and trees stay valid, in seconds, or None for no limit.
+            max_trees (int): The most UCS search trees kept, or 0 to not cache trees.
+            clock (Callable[[], float]): The clock used for the time-to-live.
+        """
+        self.wrapped = search
+        self.algorithm = algorithm if algorithm is not None else type(search).__name__
+        self.stats = CacheStats()
+        self.results = LRUCache(max_entries, ttl, clock, self.stats)
+        # Only plain UCS settles cities in order of distance regardless of the goal
+        plain_ucs = isinstance(search, UCSSearch) and type(search).search is UCSSearch.search
+        self.trees = LRUCache(max_trees, ttl, clock, self.stats) if plain_ucs and max_trees > 0 else None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.wrapped, name)
+
+    def search(self, start: str, goal: str) -> SearchResult:
+        """
+        Returns the cached result of a query, or runs the search and caches it.
+        
+        The time taken of a cached result is the time spent answering it from the cache, and the search_stats
+        of the wrapped search are reset to show that nothing was expanded.
+        
+        Args:
+            start (str): The start city.
+            goal (str): The goal city.
+        
+        Returns:
+            Tuple[Optional[List[str]], int, int, float]: The path, number of cities visited, total distance, and time taken.
+        """
+        start_time = time.perf_counter_ns()
+        version = self.wrapped.graph_version
+        key = (self.algorithm, start, goal)
+
+        cached = self.results.get(key, version)
+        if cached is not None:
+            self.stats.hits += 1
+            path, cities_visited, distance = cached
+            return (list(path) if path is not None else None), cities_visited, distance, self._answered(start_time)
+
+        if self.trees is not None:
+            tree: Optional[_SearchTree] = self.trees.get((self.algorithm, start), version)
+            rank = tree.rank(goal) if tree is not None else None
+            if rank is not None:
+                self.stats.hits += 1
+                self.stats.tree_hits += 1
+                path = self.wrapped.reconstruct_path(tree.parents, goal)
+                self.results.put(key, version, (path, rank, tree.costs[goal]))
+                return list(path), rank, tree.costs[goal], self._answered(start_time)
+
+        self.stats.misses += 1
+        path, cities_visited, distance, time_taken = self.wrapped.search(start, goal)
+        # A search cut short by its budget says nothing about the query, so it is not cached
+        if self.wrapped.search_stats.budget_exceeded:
+            return path, cities_visited, distance, time_taken
+        self.results.put(key, version, (list(path) if path is not None else None, cities_visited, distance))
+        if self.trees is not None:
+            self.trees.put((self.algorithm, start), version,
+                           _SearchTree(self.wrapped.costs, self.wrapped.parents, self.wrapped.exploration_path))
+        return path, cities_visited, distance, time_taken
+
+    def _answered(self, start_time: int) -> float:
+        """
+        Records the stats of a query answered from the cache, and returns the time it took in seconds.
+        """
+        self.wrapped.search_stats = SearchStats(elapsed_ns=time.perf_counter_ns() - start_time)
+        return self.wrapped.search_stats.elapsed
+
+    def clear(self) -> None:
+        """
+        Drops every cached result and search tree.
+        """
+        self.results.clear()
+        if self.trees is not None:
+            self.trees.clear()
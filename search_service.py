@@ -0,0 +1,504 @@
+import argparse
+import asyncio
+import bisect
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, Dict, Optional, Sequence, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+from algorithms import ALGORITHMS
+from graph import CSRGraph, GraphPath
+from parallel_search import Job, QueryResult, load_shared_graph, initialize_worker, run_job, WorkerState
+
+# Upper bounds of the latency histogram buckets, in milliseconds; a last bucket counts everything slower
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Completions older than this many seconds are dropped from the recent throughput
+THROUGHPUT_WINDOW: float = 60.0
+
+# The largest request head accepted, in bytes
+MAX_REQUEST_HEAD: int = 16 * 1024
+
+HTTP_REASONS: Dict[int, str] = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    431: 'Request Header Fields Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable', 504: 'Gateway Timeout',
+}
+
+class ServiceOverloaded(Exception):
+    """
+    Raised when a query is rejected because too many queries are already waiting for a worker.
+    """
+
+class LatencyHistogram:
+    """
+    Counts latencies in fixed buckets, so percentiles can be estimated in constant memory.
+
+    Attributes:
+        bounds (Tuple[float, ...]): The upper bound of every bucket, in milliseconds.
+        counts (List[int]): The number of latencies in every bucket, with one more bucket for the slower ones.
+        count (int): The number of latencies observed.
+        total_ms (float): The sum of the latencies observed, in milliseconds.
+    """
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """
+        Adds a latency.
+
+        Args:
+            seconds (float): The latency, in seconds.
+        """
+        milliseconds = seconds * 1000
+        self.counts[bisect.bisect_left(self.bounds, milliseconds)] += 1
+        self.count += 1
+        self.total_ms += milliseconds
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """
+        Estimates a percentile as the upper bound of the bucket that contains it.
+
+        Args:
+            fraction (float): The percentile as a fraction, e.g. 0.95.
+
+        Returns:
+            Optional[float]: The estimate in milliseconds, None if nothing was observed or it falls in the last bucket.
+        """
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns the histogram as a JSON-serializable dictionary.
+        """
+        return {
+            'buckets_ms': list(self.bounds) + ['+inf'],
+            'counts': list(self.counts),
+            'count': self.count,
+            'mean_ms': self.total_ms / self.count if self.count else None,
+            'p50_ms': self.percentile(0.50),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+        }
+
+@dataclass
+class ServiceMetrics:
+    """
+    The counters of a SearchService.
+
+    Attributes:
+        started (float): The time.monotonic() value when the service started.
+        requests (int): The number of HTTP requests received.
+        responses (Dict[int, int]): The number of responses sent, by status code.
+        searches (int): The number of searches completed by the workers.
+        coalesced (int): The number of queries answered by joining an identical query already in flight.
+        rejected (int): The number of queries rejected because too many were waiting.
+        timeouts (int): The number of queries that did not complete within the request timeout.
+        request_latency (LatencyHistogram): The time from receiving a route request to sending its response.
+        search_latency (LatencyHistogram): The time from dispatching a search to the worker pool to getting its result.
+        recent (Deque[float]): The completion times of the responses sent within the throughput window.
+    """
+    started: float = field(default_factory=time.monotonic)
+    requests: int = 0
+    responses: Dict[int, int] = field(default_factory=dict)
+    searches: int = 0
+    coalesced: int = 0
+    rejected: int = 0
+    timeouts: int = 0
+    request_latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    search_latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    recent: Deque[float] = field(default_factory=deque)
+
+    def record_response(self, status: int) -> None:
+        """
+        Counts a response and its completion time.
+        """
+        self.responses[status] = self.responses.get(status, 0) + 1
+        now = time.monotonic()
+        self.recent.append(now)
+        while self.recent and self.recent[0] < now - THROUGHPUT_WINDOW:
+            self.recent.popleft()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns the metrics as a JSON-serializable dictionary.
+        """
+        uptime = time.monotonic() - self.started
+        while self.recent and self.recent[0] < time.monotonic() - THROUGHPUT_WINDOW:
+            self.recent.popleft()
+        return {
+            'uptime_seconds': uptime,
+            'requests': self.requests,
+            'responses': {str(status): count for status, count in sorted(self.responses.items())},
+            'searches': self.searches,
+            'coalesced': self.coalesced,
+            'rejected': self.rejected,
+            'timeouts': self.timeouts,
+            'throughput': {
+                'overall_per_second': sum(self.responses.values()) / uptime if uptime else 0.0,
+                'recent_per_second': len(self.recent) / min(uptime, THROUGHPUT_WINDOW) if uptime else 0.0,
+            },
+            'request_latency': self.request_latency.snapshot(),
+            'search_latency': self.search_latency.snapshot(),
+        }
+
+class _PendingQuery:
+    """
+    A query in flight, shared by every request that asked for it.
+    """
+    def __init__(self):
+        self.task: Optional['asyncio.Task[QueryResult]'] = None
+        self.waiters = 0
+        self.started = False
+
+class SearchService:
+    """
+    Serves route queries over HTTP from one loaded graph, running the searches in a pool of worker processes.
+
+    Every worker loads the graph once, as in parallel_search, so requests never rebuild it. Identical queries
+    that arrive while one is in flight share its result. At most max_in_flight searches run at a time; up to
+    max_waiting more wait for a worker, and queries beyond that are rejected with 503 so clients can back off.
+    A request that takes longer than the timeout gets 504; its search is dropped if it has not started yet and
+    no other request is waiting for it, and the workers stop searches that run for longer than the timeout.
+
+    Worker processes are spawned, so a script that creates a SearchService must guard its entry point with
+    `if __name__ == "__main__":`.
+
+    Endpoints:
+        GET /route?start=<city>&goal=<city>&algorithm=<name>: The query result as JSON; the algorithm defaults to ucs.
+        GET /metrics: The ServiceMetrics as JSON, with throughput and latency histograms.
+        GET /health: {"status": "ok"}.
+
+    Attributes:
+        graph_file (Optional[str]): The graph file loaded by the workers, or None for the built-in ten-city graph.
+        timeout (float): The time limit of each route request, in seconds.
+        max_in_flight (int): The most searches running at a time.
+        max_waiting (int): The most distinct queries waiting for a worker before new ones are rejected.
+        metrics (ServiceMetrics): The counters of the service.
+
+    Methods:
+        start(self, host, port, unix_path) -> asyncio.AbstractServer: Starts listening.
+        query(self, algorithm: str, start: str, goal: str) -> QueryResult: Runs a query through the pool.
+        close(self) -> None: Stops listening and shuts the pool down.
+    """
+    def __init__(self, graph_file: Optional[str] = None, processes: Optional[int] = None, timeout: float = 10.0,
+                 max_in_flight: Optional[int] = None, max_waiting: int = 1024):
+        """
+        Loads the graph and starts the worker pool.
+
+        Args:
+            graph_file (Optional[str]): The graph file to serve; a `.bin` file is memory-mapped and shared by the workers.
+                None serves the built-in ten-city graph.
+            processes (Optional[int]): The number of worker processes, by default one per CPU. 0 runs the searches
+                in a single background thread of this process instead, which suits small graphs and local testing.
+            timeout (float): The time limit of each route request, in seconds.
+            max_in_flight (Optional[int]): The most searches running at a time, by default the number of workers.
+            max_waiting (int): The most distinct queries waiting for a worker before new ones are rejected.
+        """
+        self.graph_file = graph_file
+        self.timeout = timeout
+        self.max_waiting = max_waiting
+        self.metrics = ServiceMetrics()
+        # The service only checks city names, so it keeps the memory-mapped name index of a binary graph, or just
+        # the names of any other graph; the workers load their own copy of the graph
+        graph = load_shared_graph(graph_file)
+        self._binary_graph: Optional[CSRGraph] = graph if isinstance(graph, CSRGraph) else None
+        self._city_names: Set[str] = set()
+        if self._binary_graph is None:
+            self._city_names = {node.name for node in graph.nodes} if graph is not None else set(GraphPath().cities)
+        if processes == 0:
+            # The thread keeps its own worker state, apart from that of run_parallel in this process
+            worker_state = WorkerState()
+            self._executor: Executor = ThreadPoolExecutor(1, initializer=worker_state.initialize, initargs=(graph_file, timeout))
+            self._run_job = worker_state.run_job
+            workers = 1
+        else:
+            # Workers are spawned rather than forked: forking a process that already runs the event loop and the
+            # executor's threads can leave a worker stuck on a lock copied in its held state
+            self._executor = ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn'),
+                                                 initializer=initialize_worker, initargs=(graph_file, timeout))
+            self._run_job = run_job
+            workers = processes or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight if max_in_flight is not None else workers
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._pending: Dict[Job, _PendingQuery] = {}
+        self._waiting = 0
+        self._running = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8080, unix_path: Optional[str] = None) -> asyncio.AbstractServer:
+        """
+        Starts listening on a local TCP port, or on a Unix socket if a path is given.
+
+        Args:
+            host (str): The address to listen on.
+            port (int): The port to listen on, or 0 for any free port.
+            unix_path (Optional[str]): The path of a Unix socket to listen on instead of TCP.
+
+        Returns:
+            asyncio.AbstractServer: The server, e.g. to read the port it listens on from its sockets.
+        """
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        if unix_path is not None:
+            self._server = await asyncio.start_unix_server(self._handle_connection, unix_path, limit=MAX_REQUEST_HEAD)
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, host, port, limit=MAX_REQUEST_HEAD)
+        return self._server
+
+    async def close(self) -> None:
+        """
+        Stops listening and shuts the worker pool down.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=False)
+
+    async def query(self, algorithm: str, start: str, goal: str) -> QueryResult:
+        """
+        Runs a query through the worker pool, joining an identical query already in flight.
+
+        Args:
+            algorithm (str): One of the names in ALGORITHMS.
+            start (str): The start city.
+            goal (str): The goal city.
+
+        Returns:
+            QueryResult: The result of the query.
+
+        Raises:
+            ServiceOverloaded: If too many queries are waiting for a worker.
+            asyncio.TimeoutError: If the query does not complete within the timeout.
+        """
+        job = (algorithm, start, goal)
+        pending = self._pending.get(job)
+        if pending is not None:
+            self.metrics.coalesced += 1
+        else:
+            # Queries that will get a free slot right away are not really waiting
+            if self._waiting >= self.max_waiting + max(0, self.max_in_flight - self._running):
+                self.metrics.rejected += 1
+                raise ServiceOverloaded(f"{self._waiting} queries are waiting for a worker")
+            pending = self._pending[job] = _PendingQuery()
+            self._waiting += 1
+            pending.task = asyncio.ensure_future(self._dispatch(job, pending))
+            pending.task.add_done_callback(lambda _: self._finished(job, pending))
+        pending.waiters += 1
+        try:
+            # Shielded, so a request that times out does not cancel the search shared with other requests
+            return await asyncio.wait_for(asyncio.shield(pending.task), self.timeout)
+        except asyncio.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        finally:
+            pending.waiters -= 1
+            # Nobody is waiting for a search that has not reached a worker yet, so drop it
+            if pending.waiters == 0 and not pending.started:
+                pending.task.cancel()
+                self._forget(job, pending)
+
+    def _has_city(self, city: str) -> bool:
+        """
+        Checks whether a city is a node of the served graph.
+        """
+        if self._binary_graph is not None:
+            return self._binary_graph.node_id(city) is not None
+        return city in self._city_names
+
+    def _forget(self, job: Job, pending: _PendingQuery) -> None:
+        """
+        Stops sharing a query that completed or was dropped, so the next identical query starts a new search.
+        """
+        if self._pending.get(job) is pending:
+            del self._pending[job]
+
+    def _finished(self, job: Job, pending: _PendingQuery) -> None:
+        """
+        Called when the search of a query completes or is dropped.
+        """
+        # A search dropped before it reached a worker was still counted as waiting
+        if not pending.started:
+            self._waiting -= 1
+        self._forget(job, pending)
+
+    async def _dispatch(self, job: Job, pending: _PendingQuery) -> QueryResult:
+        """
+        Waits for a free slot, then runs the job in the worker pool.
+        """
+        await self._slots.acquire()
+        pending.started = True
+        self._waiting -= 1
+        self._running += 1
+        try:
+            dispatch_time = time.perf_counter()
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, self._run_job, (0, job))
+            self.metrics.search_latency.observe(time.perf_counter() - dispatch_time)
+            self.metrics.searches += 1
+            return result
+        finally:
+            self._running -= 1
+            self._slots.release()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serves the HTTP/1.1 requests of one connection, keeping it open between requests unless asked not to.
+        """
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except asyncio.IncompleteReadError:
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 431, {'error': "Request head too large"}, keep_alive=False)
+                    break
+                self.metrics.requests += 1
+                request_time = time.perf_counter()
+                lines = head.decode('latin-1').split('\r\n')
+                request_line = lines[0].split()
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                # Request bodies are not used, but must be read to reach the next request
+                if int(headers.get('content-length', 0) or 0):
+                    await reader.readexactly(int(headers['content-length']))
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                if len(request_line) != 3:
+                    await self._respond(writer, 400, {'error': "Malformed request line"}, keep_alive=False)
+                    break
+                method, target, _ = request_line
+                status, body = await self._route(method, target)
+                if urlsplit(target).path == '/route':
+                    self.metrics.request_latency.observe(time.perf_counter() - request_time)
+                await self._respond(writer, status, body, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, target: str) -> Tuple[int, Dict[str, Any]]:
+        """
+        Answers one request, returning its status code and JSON body.
+        """
+        url = urlsplit(target)
+        if method != 'GET':
+            return 405, {'error': f"Method {method} not allowed, use GET"}
+        if url.path == '/health':
+            return 200, {'status': 'ok'}
+        if url.path == '/metrics':
+            metrics = self.metrics.snapshot()
+            metrics.update(running=self._running, waiting=self._waiting)
+            return 200, metrics
+        if url.path != '/route':
+            return 404, {'error': f"Unknown endpoint {url.path}"}
+
+        parameters = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        algorithm = parameters.get('algorithm', 'ucs')
+        start, goal = parameters.get('start'), parameters.get('goal')
+        if start is None or goal is None:
+            return 400, {'error': "Both start and goal are required"}
+        if algorithm not in ALGORITHMS:
+            return 400, {'error': f"Unknown algorithm {algorithm!r}, expected one of {', '.join(ALGORITHMS)}"}
+        for city in (start, goal):
+            if not self._has_city(city):
+                return 404, {'error': f"Unknown city {city!r}"}
+        try:
+            result = await self.query(algorithm, start, goal)
+        except ServiceOverloaded as error:
+            return 503, {'error': str(error)}
+        except asyncio.TimeoutError:
+            return 504, {'error': f"The query did not complete within {self.timeout} seconds"}
+        except Exception as error:
+            return 500, {'error': f"The search failed: {error!r}"}
+        if result.budget_exceeded:
+            self.metrics.timeouts += 1
+            return 504, {'error': f"The query did not complete within {self.timeout} seconds"}
+        body = asdict(result)
+        del body['index']
+        return 200, body
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, body: Dict[str, Any], keep_alive: bool) -> None:
+        """
+        Writes a JSON response.
+        """
+        self.metrics.record_response(status)
+        payload = json.dumps(body).encode()
+        head = (f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n")
+        if status == 503:
+            head += "Retry-After: 1\r\n"
+        writer.write(head.encode('latin-1') + b'\r\n' + payload)
+        await writer.drain()
+
+async def request(path: str, host: str = '127.0.0.1', port: int = 8080, unix_path: Optional[str] = None) -> Tuple[int, Dict[str, Any]]:
+    """
+    A minimal local client: sends one GET request to a SearchService and returns the response.
+
+    Args:
+        path (str): The request path with its query string, e.g. '/route?start=Boston&goal=Richmond'.
+        host (str): The address of the service.
+        port (int): The port of the service.
+        unix_path (Optional[str]): The path of the service's Unix socket, used instead of TCP if given.
+
+    Returns:
+        Tuple[int, Dict[str, Any]]: The status code and the decoded JSON body.
+    """
+    if unix_path is not None:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode('latin-1'))
+        await writer.drain()
+        head = await reader.readuntil(b'\r\n\r\n')
+        status = int(head.split(b' ', 2)[1])
+        return status, json.loads(await reader.read())
+    finally:
+        writer.close()
+
+async def serve(graph_file: Optional[str], host: str, port: int, unix_path: Optional[str], **options: Any) -> None:
+    """
+    Runs a SearchService until it is interrupted.
+    """
+    service = SearchService(graph_file, **options)
+    server = await service.start(host, port, unix_path)
+    try:
+        await server.serve_forever()
+    finally:
+        await service.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve route queries over HTTP from one loaded graph.")
+    parser.add_argument('--graph', help="graph file (.csv, .tsv, .gr, .osm or .bin); by default the built-in ten-city graph")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--unix', help="listen on this Unix socket path instead of TCP")
+    parser.add_argument('--processes', type=int, help="number of worker processes, 0 to search in a thread (default: one per CPU)")
+    parser.add_argument('--timeout', type=float, default=10.0, help="time limit of each request in seconds")
+    parser.add_argument('--max-in-flight', type=int, help="most searches running at a time (default: number of workers)")
+    parser.add_argument('--max-waiting', type=int, default=1024, help="most queries waiting for a worker before rejecting")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.graph, args.host, args.port, args.unix, processes=args.processes, timeout=args.timeout,
+                          max_in_flight=args.max_in_flight, max_waiting=args.max_waiting))
+    except KeyboardInterrupt:
+        pass
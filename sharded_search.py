@@ -0,0 +1,362 @@
+import math
+import multiprocessing
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from graph_binary import open_binary_graph
+from graph_partition import load_partition
+from priority_queues import PriorityQueue, LazyHeapQueue
+
+# A boundary update sent to the owner of a node: (node, distance, predecessor, shard of the predecessor)
+BoundaryUpdate = Tuple[str, float, str, int]
+
+@dataclass
+class ShardedStats:
+    """
+    Counters of one sharded search.
+
+    Attributes:
+        rounds (int): The rounds of boundary exchange.
+        boundary_updates (int): The boundary updates sent between shards.
+        nodes_expanded (int): The nodes expanded, summed over all shards.
+        edges_relaxed (int): The edges examined, summed over all shards.
+        reexpansions (int): Expansions of nodes that a shard had already expanded at a greater distance.
+        elapsed_ns (int): The total time of the search.
+    """
+    rounds: int = 0
+    boundary_updates: int = 0
+    nodes_expanded: int = 0
+    edges_relaxed: int = 0
+    reexpansions: int = 0
+    elapsed_ns: int = 0
+
+    @property
+    def elapsed(self) -> float:
+        """
+        The total time of the search, in seconds.
+        """
+        return self.elapsed_ns / 1e9
+
+class _ShardWorker:
+    """
+    The UCS state of one shard, driven round by round by the coordinator of a ShardedSearch.
+
+    Distances are label-correcting: a node expanded in one round is expanded again if a later boundary
+    update improves it. Relaxing an edge into a ghost node records the distance for the ghost's owner
+    instead of queueing it; only ghosts that improved in a round are sent on.
+    """
+    def __init__(self, directory: str, part: int, queue_factory: Callable[[], PriorityQueue]):
+        shard = load_partition(directory)[part]
+        self.part = part
+        self.csr = open_binary_graph(os.path.join(directory, shard.file))
+        self.local_nodes = shard.local_nodes
+        self.ghost_parts = shard.ghost_parts
+        self.queue_factory = queue_factory
+        self.start('', '')
+
+    def start(self, start: str, goal: str) -> Tuple[bool, bool]:
+        """
+        Resets the shard for a new query, queueing the start if the shard owns it.
+
+        Returns:
+            Tuple[bool, bool]: Whether the shard owns the start and whether it owns the goal.
+        """
+        self.distances: Dict[int, float] = {}
+        # The predecessor of every reached node: a local node ID, a (node, shard) pair for a boundary update, or None
+        self.parents: Dict[int, Union[int, Tuple[str, int], None]] = {}
+        self.expanded: Dict[int, float] = {}
+        self.ghost_distances: Dict[int, float] = {}
+        self.ghost_parents: Dict[int, int] = {}
+        self.queue = self.queue_factory()
+        self.goal_distance = math.inf
+        start_id = self._local_id(start)
+        goal_id = self._local_id(goal)
+        self.goal_id = goal_id if goal_id is not None else -1
+        if start_id is not None:
+            self.distances[start_id] = 0
+            self.parents[start_id] = None
+            self.queue.push(0, start_id)
+        return start_id is not None, goal_id is not None
+
+    def round(self, updates: List[BoundaryUpdate], bound: float,
+              best_distance: float) -> Tuple[Dict[int, List[BoundaryUpdate]], float, float, int, int, int]:
+        """
+        Applies the boundary updates for the shard, then expands the queued nodes closer than the bound.
+
+        Args:
+            updates (List[BoundaryUpdate]): The updates for nodes the shard owns.
+            bound (float): The distance up to which nodes are expanded in this round.
+            best_distance (float): The best known distance to the goal; nothing at or beyond it is expanded.
+
+        Returns:
+            Tuple: The updates for other shards by shard, the smallest queued distance, the distance to the goal if
+                the shard owns it, and the numbers of nodes expanded, edges examined and nodes expanded again.
+        """
+        distances, parents, queue = self.distances, self.parents, self.queue
+        for name, distance, predecessor, predecessor_part in updates:
+            node = self.csr.node_id(name)
+            if distance < distances.get(node, math.inf):
+                distances[node] = distance
+                parents[node] = (predecessor, predecessor_part)
+                queue.push(distance, node)
+
+        offsets, targets, weights = self.csr.offsets, self.csr.targets, self.csr.weights
+        local_nodes, ghost_distances, ghost_parents = self.local_nodes, self.ghost_distances, self.ghost_parents
+        improved_ghosts = set()
+        expansions = relaxations = reexpansions = 0
+        while queue:
+            # Nothing at or beyond the best distance to the goal can lead to a shorter path
+            limit = min(bound, best_distance, self.goal_distance)
+            distance, node = queue.peek()
+            if distance >= limit:
+                break
+            queue.pop()
+            expansions += 1
+            if node in self.expanded:
+                reexpansions += 1
+            self.expanded[node] = distance
+            if node == self.goal_id:
+                self.goal_distance = distance
+                continue
+            for edge in range(offsets[node], offsets[node + 1]):
+                target = targets[edge]
+                new_distance = distance + weights[edge]
+                relaxations += 1
+                if target < local_nodes:
+                    if new_distance < distances.get(target, math.inf):
+                        distances[target] = new_distance
+                        parents[target] = node
+                        queue.push(new_distance, target)
+                elif new_distance < ghost_distances.get(target, math.inf) and new_distance < best_distance:
+                    ghost_distances[target] = new_distance
+                    ghost_parents[target] = node
+                    improved_ghosts.add(target)
+
+        # Send every improved ghost distance to the ghost's owner
+        outgoing: Dict[int, List[BoundaryUpdate]] = {}
+        for ghost in improved_ghosts:
+            outgoing.setdefault(self.ghost_parts[ghost - local_nodes], []).append(
+                (self.csr.node_name(ghost), ghost_distances[ghost], self.csr.node_name(ghost_parents[ghost]), self.part))
+        queue_distance = queue.peek()[0] if queue else math.inf
+        return outgoing, queue_distance, self.goal_distance, expansions, relaxations, reexpansions
+
+    def segment(self, name: str) -> Tuple[List[str], Optional[Tuple[str, int]]]:
+        """
+        Returns the part of the shortest path inside the shard that ends at a node, and where it enters the shard.
+
+        Returns:
+            Tuple[List[str], Optional[Tuple[str, int]]]: The nodes of the segment, and the predecessor of its first
+                node with that predecessor's shard, or None if the segment starts at the start.
+        """
+        node = self.csr.node_id(name)
+        segment = [name]
+        parent = self.parents[node]
+        while isinstance(parent, int):
+            segment.append(self.csr.node_name(parent))
+            parent = self.parents[parent]
+        segment.reverse()
+        return segment, parent
+
+    def _local_id(self, name: str) -> Optional[int]:
+        """
+        Returns the ID of a node the shard owns, or None if it does not own it.
+        """
+        node = self.csr.node_id(name)
+        return node if node is not None and node < self.local_nodes else None
+
+def _serve_shard(connection: Any, directory: str, part: int, queue_factory: Callable[[], PriorityQueue]) -> None:
+    """
+    The main loop of a shard process: calls the requested _ShardWorker method for every message until told to stop.
+    """
+    worker = _ShardWorker(directory, part, queue_factory)
+    connection.send(None)
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        method, arguments = message
+        connection.send(getattr(worker, method)(*arguments))
+    connection.close()
+
+class ShardedSearch:
+    """
+    Uniform Cost Search over a partitioned graph, with one worker process per shard.
+
+    Every worker memory-maps only its own shard file (see graph_partition), so no process holds the whole
+    graph. The search runs in rounds: each active worker expands its queued nodes closer than the round's
+    bound and reports the improved distances of its ghost nodes, which the coordinator passes on to their
+    owners as boundary updates. No other state crosses between processes. The search stops once no queued
+    node or pending update is closer than the best distance to the goal, which is then the shortest distance.
+
+    Worker processes are spawned, so a script that creates a ShardedSearch must guard its entry point with
+    `if __name__ == "__main__":`.
+
+    Attributes:
+        directory (str): The partition directory written by graph_partition.write_partition.
+        window (Optional[float]): How far beyond the closest queued node a round expands, or None for no limit.
+            A small window keeps the shards close to global distance order, with fewer nodes expanded again but
+            more rounds; no limit takes the fewest rounds.
+        search_stats (ShardedStats): The counters of the last search.
+
+    Methods:
+        search(self, start: str, goal: str) -> Tuple[Optional[List[str]], int, float, float]: Runs a query.
+        close(self) -> None: Stops the worker processes.
+    """
+    def __init__(self, directory: str, window: Optional[float] = None,
+                 queue_factory: Callable[[], PriorityQueue] = LazyHeapQueue):
+        """
+        Starts one worker process per shard.
+
+        Args:
+            directory (str): The partition directory.
+            window (Optional[float]): How far beyond the closest queued node a round expands, or None for no limit.
+            queue_factory (Callable[[], PriorityQueue]): Creates the priority queue of every shard; it must be picklable.
+        """
+        self.directory = directory
+        self.window = window
+        self.search_stats = ShardedStats()
+        context = multiprocessing.get_context('spawn')
+        self._connections = []
+        self._processes = []
+        for part in range(len(load_partition(directory))):
+            connection, worker_connection = context.Pipe()
+            process = context.Process(target=_serve_shard, args=(worker_connection, directory, part, queue_factory), daemon=True)
+            process.start()
+            self._connections.append(connection)
+            self._processes.append(process)
+        # Wait until every shard is open
+        for part in range(len(self._connections)):
+            self._receive(part)
+
+    def __enter__(self) -> 'ShardedSearch':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _call_all(self, method: str, arguments: Dict[int, tuple]) -> Dict[int, Any]:
+        """
+        Calls a worker method on several shards at once and waits for all their results.
+        """
+        for part, part_arguments in arguments.items():
+            if self._processes[part].exitcode is not None:
+                raise self._shard_error(part)
+            try:
+                self._connections[part].send((method, part_arguments))
+            except OSError as error:
+                raise self._shard_error(part) from error
+        return {part: self._receive(part) for part in arguments}
+
+    def _receive(self, part: int) -> Any:
+        """
+        Waits for the next message from a shard.
+
+        Raises:
+            RuntimeError: If the shard's worker process has exited.
+        """
+        try:
+            return self._connections[part].recv()
+        except (EOFError, OSError) as error:
+            raise self._shard_error(part) from error
+
+    def _shard_error(self, part: int) -> RuntimeError:
+        """
+        Describes a shard whose worker process can no longer be reached, with its exit code once it has exited.
+        """
+        process = self._processes[part]
+        process.join(1)
+        if process.exitcode is None:
+            return RuntimeError(f"{self.directory}: lost the connection to shard {part}")
+        return RuntimeError(f"{self.directory}: the worker of shard {part} exited with code {process.exitcode}")
+
+    def search(self, start: str, goal: str) -> Tuple[Optional[List[str]], int, float, float]:
+        """
+        Runs a query across the shards.
+
+        Args:
+            start (str): The start city.
+            goal (str): The goal city.
+
+        Returns:
+            Tuple[Optional[List[str]], int, float, float]: The path, number of nodes expanded, total distance, and time taken,
+                like UCSSearch. Returns None if no path is found, along with the number of nodes expanded, 0 for the
+                total distance, and time taken. The counters of the search are kept in search_stats.
+        """
+        self.search_stats = stats = ShardedStats()
+        start_time = time.perf_counter_ns()
+        parts = range(len(self._connections))
+        owners = self._call_all('start', {part: (start, goal) for part in parts})
+        if not any(owns_start for owns_start, _ in owners.values()) or not any(owns_goal for _, owns_goal in owners.values()):
+            stats.elapsed_ns = time.perf_counter_ns() - start_time
+            return None, 0, 0, stats.elapsed
+
+        best_distance = math.inf
+        queue_distances = {part: (0 if owners[part][0] else math.inf) for part in parts}
+        pending: Dict[int, List[BoundaryUpdate]] = {part: [] for part in parts}
+        while True:
+            # The closest node any shard could expand next, from its queue or from an update waiting for it
+            closest = {part: min([queue_distances[part]] + [update[1] for update in pending[part]]) for part in parts}
+            frontier = min(closest.values())
+            if frontier >= best_distance:
+                break
+            bound = frontier + self.window if self.window is not None else math.inf
+            active = {part: (pending[part], bound, best_distance) for part in parts if closest[part] < min(bound, best_distance)}
+            stats.rounds += 1
+            results = self._call_all('round', active)
+            # Shards left out of the round keep their updates for a later round
+            pending = {part: ([] if part in active else pending[part]) for part in parts}
+            for part, (outgoing, queue_distance, goal_distance, expansions, relaxations, reexpansions) in results.items():
+                queue_distances[part] = queue_distance
+                best_distance = min(best_distance, goal_distance)
+                stats.nodes_expanded += expansions
+                stats.edges_relaxed += relaxations
+                stats.reexpansions += reexpansions
+                for target_part, updates in outgoing.items():
+                    pending[target_part].extend(updates)
+                    stats.boundary_updates += len(updates)
+            # Updates that cannot beat the best distance to the goal are dropped
+            pending = {part: [update for update in updates if update[1] < best_distance] for part, updates in pending.items()}
+
+        if best_distance == math.inf:
+            stats.elapsed_ns = time.perf_counter_ns() - start_time
+            return None, stats.nodes_expanded, 0, stats.elapsed
+
+        # Follow the path back from the goal, one shard segment at a time
+        path: List[str] = []
+        entry: Optional[Tuple[str, int]] = (goal, next(part for part in parts if owners[part][1]))
+        while entry is not None:
+            segment, entry = self._call_all('segment', {entry[1]: (entry[0],)})[entry[1]]
+            path[:0] = segment
+        stats.elapsed_ns = time.perf_counter_ns() - start_time
+        return path, stats.nodes_expanded, best_distance, stats.elapsed
+
+    def close(self) -> None:
+        """
+        Stops the worker processes.
+        """
+        for connection in self._connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                # The worker has already exited; its own error is the one worth reporting
+                pass
+            connection.close()
+        for process in self._processes:
+            process.join()
+        self._connections = []
+        self._processes = []
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        print("Usage: python sharded_search.py <partition directory> <start city> <goal city>")
+        sys.exit(1)
+    with ShardedSearch(sys.argv[1]) as sharded_search:
+        found_path, expanded, total_distance, time_taken = sharded_search.search(sys.argv[2], sys.argv[3])
+    if found_path is None:
+        print(f"No path found between {sys.argv[2]} and {sys.argv[3]}.")
+    else:
+        print("Path:", " -> ".join(found_path))
+        print(f"Total distance: {total_distance}, nodes expanded: {expanded}, time taken: {time_taken:.6f} seconds")
+        print(sharded_search.search_stats)
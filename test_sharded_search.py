@@ -0,0 +1,40 @@
+import tempfile
+import unittest
+from graph_generators import grid_graph, scale_free_graph
+from graph_partition import write_partition
+from sharded_search import ShardedSearch
+from ucs_search import UCSSearch
+
+class ShardedSearchTest(unittest.TestCase):
+    """
+    Compares sharded searches, with and without a window, against plain UCS.
+    """
+    def check_against_ucs(self, graph, queries):
+        ucs = UCSSearch(graph)
+        with tempfile.TemporaryDirectory() as directory:
+            write_partition(graph, 4, directory)
+            for window in (None, 1, 50):
+                with ShardedSearch(directory, window=window) as sharded:
+                    for start, goal in queries:
+                        expected_path, _, expected_distance, _ = ucs.search(start, goal)
+                        path, _, distance, _ = sharded.search(start, goal)
+                        with self.subTest(window=window, start=start, goal=goal):
+                            self.assertEqual(path is None, expected_path is None)
+                            self.assertEqual(distance, expected_distance)
+                            if path is not None:
+                                self.assertEqual((path[0], path[-1]), (start, goal))
+                                costs = [dict(ucs.get_neighbors(node))[neighbor] for node, neighbor in zip(path, path[1:])]
+                                self.assertEqual(sum(costs), distance)
+
+    def test_grid(self):
+        graph = grid_graph(12, 12, seed=3)
+        names = [node.name for node in graph.nodes]
+        self.check_against_ucs(graph, [(names[i], names[(i * 37 + 11) % len(names)]) for i in range(0, len(names), 9)])
+
+    def test_scale_free(self):
+        graph = scale_free_graph(150, seed=5)
+        names = [node.name for node in graph.nodes]
+        self.check_against_ucs(graph, [(names[i], names[(i * 53 + 7) % len(names)]) for i in range(0, len(names), 10)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,31 +1,61 @@
-import heapq
+import math
 import time
-from typing import List, Tuple, Optional, Set
-from base_search import GraphSearch
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Optional, Set, Union
+from base_search import GraphSearch, SearchStats
+from graph import Graph, CSRGraph
+from priority_queues import PriorityQueue, LazyHeapQueue, QueueStats
 
 class UCSSearch(GraphSearch):
     """
     Uniform Cost Search implementation.
     
+    Keeps the best known cost of every reached node and only pushes a node when its cost improves,
+    so the queue holds at most one current entry per node. The queue implementation is pluggable
+    (see priority_queues), and its counters are kept for the last search.
+    
     Attributes:
+        name (str): The name of the algorithm, shown in the additional details of run_search.
+        queue_factory (Callable[[], PriorityQueue]): Creates the priority queue of each search.
+        queue_stats (QueueStats): The queue counters of the last search.
         exploration_path (List[str]): A list of the cities explored.
         unique_cities (Set[str]): A set of the cities visited.
+        costs (Dict[str, int]): The best known cost of every city reached by the last search, final for the cities in unique_cities.
+        parents (Dict[str, Optional[str]]): The predecessor of every city reached by the last search.
     
     Methods:
         search(self, start: str, goal: str) -> Tuple[Optional[List[str]], int, int, float]:
             Concrete implementation of the search() method for UCS.
+        shortest_path_tree(self, start: str, targets, reverse) -> Tuple[Dict[str, int], Dict[str, Optional[str]]]:
+            Expands from the start city until every target is settled, returning distances and predecessors.
+        shortest_distances(self, start: str) -> Dict[str, int]:
+            Returns the shortest distance from the start city to every reachable city.
+        iter_settled(self, start: str, reverse: bool) -> Iterator[Tuple[str, int]]:
+            Yields every reachable city with its shortest distance, in order of distance.
     """
-    def __init__(self):
+    name: str = "Uniform Cost Search"
+
+    def __init__(self, graph: Optional[Union[Graph, CSRGraph]] = None, compact: bool = False,
+                 queue_factory: Callable[[], PriorityQueue] = LazyHeapQueue):
         """
         Initializes the UCS search.
         
         Calls super().__init__() to initialize the parent class so that the run_search method can be overridden.
         
         Initializes the exploration_path and unique_cities attributes.
+        
+        Args:
+            graph (Optional[Union[Graph, CSRGraph]]): A loaded graph to search instead of the built-in ten-city graph.
+            compact (bool): If True, neighbors are iterated from a CSRGraph instead of the per-node edge dictionaries.
+            queue_factory (Callable[[], PriorityQueue]): Creates the priority queue of each search, e.g. LazyHeapQueue,
+                DaryHeapQueue, or BucketQueue for small integer costs.
         """
-        super().__init__()
+        super().__init__(graph, compact)
+        self.queue_factory = queue_factory
+        self.queue_stats = QueueStats()
         self.exploration_path: List[str] = []
         self.unique_cities: Set[str] = set()
+        self.costs: Dict[str, int] = {}
+        self.parents: Dict[str, Optional[str]] = {}
 
     def search(self, start: str, goal: str) -> Tuple[Optional[List[str]], int, int, float]:
         """
@@ -39,12 +69,28 @@ class UCSSearch(GraphSearch):
             Tuple[Optional[List[str]], int, int, float]: The path, number of cities visited, total distance, and time taken.
             
             Returns None if no path is found, along with 0 for the number of cities visited, 0 for the total distance, and time taken.
+            The counters of the search are kept in search_stats.
         """
-        # Record the start time
-        start_time = time.time()
+        # Start the counters and timing of the search
+        stats = self._begin_search()
+        start_time = time.perf_counter_ns()
+        
+        # Initialize the priority queue with the start node and its cost
+        priority_queue = self.queue_factory()
+        priority_queue.push(0, start)
+        self.queue_stats = priority_queue.stats
+        
+        # Bind the neighbor lookup and queue operations, timed when profiling, and the hooks
+        get_neighbors = self._timed_lookup(stats, self.get_neighbors)
+        push, pop = self._timed_queue(stats, priority_queue.push, priority_queue.pop)
+        on_expand, on_relax, on_goal = self.on_expand, self.on_relax, self.on_goal
+        out_of_budget = self._budget(stats, start_time)
         
-        # Initialize the priority queue with the start node, its path, and cost
-        priority_queue = [(0, start, [start])]
+        # Initialize the best known cost and the predecessor of every reached node, kept as the search tree of the last search
+        best_costs: Dict[str, int] = {start: 0}
+        parents: Dict[str, Optional[str]] = {start: None}
+        self.costs = best_costs
+        self.parents = parents
         
         # Initialize the unique cities and exploration path
         self.unique_cities = set()
@@ -53,46 +99,149 @@ class UCSSearch(GraphSearch):
         # Initialize the total number of explorations
         total_explorations = 0
         
-        # Process the priority queue until it's empty
+        # Process the priority queue until it's empty or the budget runs out
         while priority_queue:
-            # Pop the node with the lowest cost from the priority queue
-            (cost, node, path) = heapq.heappop(priority_queue)
+            if out_of_budget is not None and out_of_budget(total_explorations):
+                break
             
-            # Add the node to the exploration path
+            # Pop the node with the lowest cost from the priority queue, outdated entries are skipped by the queue
+            (cost, node) = pop()
+            
+            # Add the node to the exploration path and the unique cities
             self.exploration_path.append(node)
+            self.unique_cities.add(node)
             
             # Increment the total number of explorations
             total_explorations += 1
+            if on_expand is not None:
+                on_expand(node, cost)
+            
+            # If the node is the goal, rebuild the path and return it with the number of cities visited, total distance, and time taken
+            if node == goal:
+                path = self.reconstruct_path(parents, goal)
+                if on_goal is not None:
+                    on_goal(path, cost)
+                self._end_search(stats, start_time, total_explorations)
+                return path, total_explorations, cost, stats.elapsed
+            
+            # Get the current node's neighbors
+            neighbors = get_neighbors(node)
             
-            # If the node has not been visited, add it to the unique cities
-            if node not in self.unique_cities:
-                self.unique_cities.add(node)
-                
-                # If the node is the goal, return the path, number of cities visited, total distance, and time taken
-                if node == goal:
-                    end_time = time.time()
-                    return path, total_explorations, cost, end_time - start_time
-                
-                # Get the current node
-                current_node = self.find_node_by_name(node)
-                
-                # If the current node is not found, continue to the next iteration
-                if current_node is None:
-                    continue
-                
-                # Iterate through the neighbors of the current node
-                for neighbor, edge_cost in current_node.edges.items():
-                    # Calculate the new cost and path
-                    new_cost = cost + edge_cost
-                    new_path = path + [neighbor]
+            # If the current node is not found, continue to the next iteration
+            if neighbors is None:
+                continue
+            
+            # Iterate through the neighbors of the current node
+            for neighbor, edge_cost in neighbors:
+                # Calculate the new cost
+                new_cost = cost + edge_cost
+                stats.edges_relaxed += 1
+                if on_relax is not None:
+                    on_relax(node, neighbor, new_cost)
 
-                    # Push the new node onto the priority queue
-                    heapq.heappush(priority_queue, (new_cost, neighbor, new_path))
+                # Only push the neighbor if this beats its best known cost, otherwise the push is dominated
+                if neighbor not in self.unique_cities and new_cost < best_costs.get(neighbor, math.inf):
+                    best_costs[neighbor] = new_cost
+                    parents[neighbor] = node
+                    push(new_cost, neighbor)
         
-        # If no path is found, record the end time and return None, 
+        # If no path is found within the budget, record the end time and return None, 
         # total explorations, 0 for the total distance, and time taken
-        end_time = time.time()
-        return None, total_explorations, 0, end_time - start_time
+        self._end_search(stats, start_time, total_explorations)
+        return None, total_explorations, 0, stats.elapsed
+
+    def _end_search(self, stats: SearchStats, start_time: int, total_explorations: int) -> None:
+        """
+        Completes the counters of a search from its exploration count and queue counters.
+        
+        Args:
+            stats (SearchStats): The counters of the search.
+            start_time (int): The perf_counter_ns() value when the search started.
+            total_explorations (int): The number of nodes expanded.
+        """
+        stats.nodes_expanded = total_explorations
+        stats.frontier_peak = self.queue_stats.peak_size
+        stats.elapsed_ns = time.perf_counter_ns() - start_time
+
+    def shortest_path_tree(self, start: str, targets: Optional[Iterable[str]] = None,
+                           reverse: bool = False) -> Tuple[Dict[str, int], Dict[str, Optional[str]]]:
+        """
+        Expands from the start city until every target is settled, or the whole reachable graph if no targets are given.
+        
+        Unlike search(), this does not record the exploration path.
+        
+        Args:
+            start (str): The start city.
+            targets (Optional[Iterable[str]]): The cities to settle before stopping.
+            reverse (bool): If True, follow edges backward, giving the distances from every city to the start instead.
+        
+        Returns:
+            Tuple[Dict[str, int], Dict[str, Optional[str]]]: The shortest distance to every settled city, and the predecessor
+                of every reached city (the next city towards the start when reverse is True).
+        """
+        remaining: Optional[Set[str]] = set(targets) if targets is not None else None
+        distances: Dict[str, int] = {}
+        parents: Dict[str, Optional[str]] = {start: None}
+        for node, cost in self._settle(start, reverse, parents):
+            distances[node] = cost
+            if remaining is not None:
+                remaining.discard(node)
+                if not remaining:
+                    break
+        return distances, parents
+
+    def iter_settled(self, start: str, reverse: bool = False) -> Iterator[Tuple[str, int]]:
+        """
+        Yields every city reachable from the start with its shortest distance, in order of distance.
+        
+        Each city is yielded as soon as it is settled, so a caller that stops early does not explore the rest
+        of the graph: e.g. itertools.takewhile(lambda item: item[1] <= 500, ...) gives the cities within 500 miles,
+        and stopping after the first K targets seen gives the K nearest ones.
+        
+        Args:
+            start (str): The start city, yielded first with distance 0.
+            reverse (bool): If True, follow edges backward, giving the distances from every city to the start instead.
+        
+        Returns:
+            Iterator[Tuple[str, int]]: The settled cities and their shortest distances.
+        """
+        return self._settle(start, reverse, {start: None})
+
+    def _settle(self, start: str, reverse: bool, parents: Dict[str, Optional[str]]) -> Iterator[Tuple[str, int]]:
+        """
+        Settles the cities reachable from the start in order of distance, recording the predecessor of every reached city.
+        """
+        get_neighbors = self.get_reverse_neighbors if reverse else self.get_neighbors
+        settled: Set[str] = set()
+        best_costs: Dict[str, int] = {start: 0}
+        priority_queue = self.queue_factory()
+        priority_queue.push(0, start)
+        while priority_queue:
+            (cost, node) = priority_queue.pop()
+            settled.add(node)
+            yield node, cost
+            neighbors = get_neighbors(node)
+            if neighbors is None:
+                continue
+            for neighbor, edge_cost in neighbors:
+                new_cost = cost + edge_cost
+                if neighbor not in settled and new_cost < best_costs.get(neighbor, math.inf):
+                    best_costs[neighbor] = new_cost
+                    parents[neighbor] = node
+                    priority_queue.push(new_cost, neighbor)
+
+    def shortest_distances(self, start: str) -> Dict[str, int]:
+        """
+        Returns the shortest distance from the start city to every reachable city, expanding the whole graph.
+        
+        Args:
+            start (str): The start city.
+        
+        Returns:
+            Dict[str, int]: The shortest distance to every city reachable from the start, including the start itself.
+        """
+        distances, _ = self.shortest_path_tree(start)
+        return distances
 
     def run_search(self, start_city=None, goal_city=None):
         # Call the parent class's run_search method
@@ -100,12 +249,14 @@ class UCSSearch(GraphSearch):
         
         # Additional UCS specific output
         if self.exploration_path:
-            print("\n=== Additional Uniform Cost Search Details ===")
+            print(f"\n=== Additional {self.name} Details ===")
             print(f"Total number of city explorations: {len(self.exploration_path)}")
             print(f"Number of unique cities visited: {len(self.unique_cities)}")
             print("\nExploration order:")
             for i, city in enumerate(self.exploration_path, 1):
                 print(f"   Step {i}: Explored {city}")
+            print(f"\nQueue pushes: {self.queue_stats.pushes} ({self.queue_stats.decrease_keys} decrease-keys), "
+                  f"stale pops: {self.queue_stats.stale_pops}, peak size: {self.queue_stats.peak_size}")
 
 if __name__ == "__main__":
     ucs_search = UCSSearch()
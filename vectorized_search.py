@@ -0,0 +1,310 @@
+import time
+from typing import Dict, List, Optional, Tuple, Union
+from base_search import GraphSearch
+from graph import Graph, CSRGraph, GraphChange
+
+# NumPy is optional: the rest of the package works without it, only the vectorized searches need it
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+NUMPY_AVAILABLE: bool = numpy is not None
+
+class VectorizedBFSSearch(GraphSearch):
+    """
+    Level-synchronous Breadth-First Search over NumPy arrays.
+
+    Instead of popping one node at a time, every step expands the whole frontier with array operations over
+    the CSR adjacency: the edges of all frontier nodes are gathered at once, the unvisited targets are kept,
+    and the first edge to reach each target becomes its parent. Frontier nodes and their edges are kept in
+    queue order, so the parents, and therefore the paths, are exactly those of BFSSearch.
+
+    It also computes single-source distances to the whole graph with a vectorized Bellman-Ford relaxation,
+    which only relaxes the edges of the nodes whose distance changed in the previous round.
+
+    Nodes are not expanded one at a time, so only the on_goal hook is called; search_stats are kept as usual.
+
+    Methods:
+        search(self, start: str, goal: str) -> Tuple[Optional[List[str]], int, int, float]:
+            Concrete implementation of the search() method, with the same results as BFSSearch.
+        levels(self, start: str) -> Dict[str, int]: Returns the number of edges from the start to every reachable city.
+        unreachable(self, start: str) -> List[str]: Returns the cities that cannot be reached from the start.
+        distance_array(self, start: str) -> numpy.ndarray: Returns the shortest distance to every node ID, inf if unreachable.
+        shortest_path_tree(self, start: str) -> Tuple[Dict[str, int], Dict[str, Optional[str]]]:
+            Returns the shortest distance and a predecessor of every reachable city.
+        shortest_distances(self, start: str) -> Dict[str, int]: Returns the shortest distance to every reachable city.
+    """
+    name: str = "Vectorized Breadth-First Search"
+
+    def __init__(self, graph: Optional[Union[Graph, CSRGraph]] = None):
+        """
+        Initializes the search over a compact copy of the graph.
+
+        Args:
+            graph (Optional[Union[Graph, CSRGraph]]): A loaded graph to search instead of the built-in ten-city graph.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        if numpy is None:
+            raise ImportError("VectorizedBFSSearch needs NumPy, install it with: pip install numpy")
+        super().__init__(graph, compact=True)
+        self._arrays: Optional[Tuple['numpy.ndarray', 'numpy.ndarray', 'numpy.ndarray']] = None
+
+    def _on_graph_change(self, changes: List[GraphChange]) -> None:
+        # The arrays are views of the compact copy, which is rebuilt from the updated graph on the next search
+        super()._on_graph_change(changes)
+        self._arrays = None
+
+    def _adjacency(self) -> Tuple['numpy.ndarray', 'numpy.ndarray', 'numpy.ndarray']:
+        """
+        Returns the offsets, targets and weights of the CSR adjacency as NumPy arrays.
+
+        The arrays share memory with the CSRGraph, including a memory-mapped binary graph, instead of copying it.
+        """
+        if self._arrays is None:
+            if self.csr is None:
+                self.csr = self.graph_path.get_compact_graph()
+            self._arrays = (numpy.asarray(self.csr.offsets, dtype=numpy.int64),
+                            numpy.asarray(self.csr.targets),
+                            numpy.asarray(self.csr.weights))
+        return self._arrays
+
+    def _frontier_edges(self, frontier: 'numpy.ndarray') -> Tuple['numpy.ndarray', 'numpy.ndarray', 'numpy.ndarray']:
+        """
+        Gathers the edges of every frontier node, in frontier order and then in edge order.
+
+        Args:
+            frontier (numpy.ndarray): The node IDs of the frontier.
+
+        Returns:
+            Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]: The source, target and weight of every edge.
+        """
+        offsets, targets, weights = self._adjacency()
+        starts = offsets[frontier]
+        counts = offsets[frontier + 1] - starts
+        # The index of every edge: the start of its node's edges plus its position among them
+        first_position = numpy.cumsum(counts) - counts
+        edge_index = numpy.repeat(starts - first_position, counts) + numpy.arange(counts.sum())
+        return numpy.repeat(frontier, counts), targets[edge_index], weights[edge_index]
+
+    def search(self, start: str, goal: str) -> Tuple[Optional[List[str]], int, int, float]:
+        """
+        Concrete implementation of the search() method for level-synchronous BFS.
+
+        Args:
+            start (str): The start city.
+            goal (str): The goal city.
+
+        Returns:
+            Tuple[Optional[List[str]], int, int, float]: The path, number of cities visited, total distance, and time taken.
+            Returns None if no path is found, along with 0 for the number of cities visited, 0 for the total distance, and time taken.
+            The counters of the search are kept in search_stats.
+        """
+        # Start the counters and timing of the search
+        stats = self._begin_search()
+        start_time = time.perf_counter_ns()
+        out_of_budget = self._budget(stats, start_time)
+        offsets, _, weights = self._adjacency()
+        start_id, goal_id = self.csr.node_id(start), self.csr.node_id(goal)
+
+        # A missing start or goal cannot be connected
+        if start_id is None or goal_id is None:
+            stats.elapsed_ns = time.perf_counter_ns() - start_time
+            return None, 0, 0, stats.elapsed
+
+        # Predecessor and distance of every node, -1 for the predecessor of unreached nodes
+        num_nodes = len(offsets) - 1
+        parents = numpy.full(num_nodes, -1, dtype=numpy.int64)
+        distances = numpy.zeros(num_nodes, dtype=weights.dtype)
+        visited = numpy.zeros(num_nodes, dtype=bool)
+        visited[start_id] = True
+        frontier = numpy.array([start_id], dtype=numpy.int64)
+
+        # Expand one whole level per step until the goal is reached, the frontier is empty, or the budget runs out;
+        # the budget is checked once per level, so a level is always expanded in full
+        while frontier.size and not visited[goal_id]:
+            if out_of_budget is not None and out_of_budget(stats.nodes_expanded):
+                break
+            stats.nodes_expanded += frontier.size
+            stats.frontier_peak = max(stats.frontier_peak, frontier.size)
+            sources, neighbors, edge_costs = self._frontier_edges(frontier)
+            stats.edges_relaxed += neighbors.size
+
+            # Keep the edges into unvisited nodes, then the first of them to reach each node, in queue order
+            unvisited = ~visited[neighbors]
+            sources, neighbors, edge_costs = sources[unvisited], neighbors[unvisited], edge_costs[unvisited]
+            _, first_edges = numpy.unique(neighbors, return_index=True)
+            first_edges.sort()
+            frontier = neighbors[first_edges].astype(numpy.int64)
+            visited[frontier] = True
+            parents[frontier] = sources[first_edges]
+            distances[frontier] = distances[sources[first_edges]] + edge_costs[first_edges]
+
+        # If no path is found within the budget, return None, 0, 0, and the time taken
+        if not visited[goal_id]:
+            stats.elapsed_ns = time.perf_counter_ns() - start_time
+            return None, 0, 0, stats.elapsed
+
+        # Rebuild the path from the predecessors
+        path_ids = [goal_id]
+        while path_ids[-1] != start_id:
+            path_ids.append(int(parents[path_ids[-1]]))
+        path = [self.csr.node_name(node_id) for node_id in reversed(path_ids)]
+        distance = distances[goal_id].item()
+        if self.on_goal is not None:
+            self.on_goal(path, distance)
+        stats.elapsed_ns = time.perf_counter_ns() - start_time
+        return path, len(path) - 1, distance, stats.elapsed
+
+    def _level_array(self, start_id: int) -> 'numpy.ndarray':
+        """
+        Returns the number of edges from the start to every node ID, -1 for unreachable nodes.
+        """
+        offsets, _, _ = self._adjacency()
+        levels = numpy.full(len(offsets) - 1, -1, dtype=numpy.int64)
+        levels[start_id] = 0
+        frontier = numpy.array([start_id], dtype=numpy.int64)
+        level = 0
+        while frontier.size:
+            level += 1
+            _, neighbors, _ = self._frontier_edges(frontier)
+            neighbors = numpy.unique(neighbors[levels[neighbors] < 0])
+            levels[neighbors] = level
+            frontier = neighbors.astype(numpy.int64)
+        return levels
+
+    def levels(self, start: str) -> Dict[str, int]:
+        """
+        Returns the number of edges on the shortest unweighted path from the start to every reachable city.
+
+        Args:
+            start (str): The start city.
+
+        Returns:
+            Dict[str, int]: The level of every city reachable from the start, including the start itself at level 0.
+
+        Raises:
+            ValueError: If the start city is not in the graph.
+        """
+        levels = self._level_array(self._start_id(start))
+        return {self.csr.node_name(node_id): int(levels[node_id]) for node_id in numpy.flatnonzero(levels >= 0)}
+
+    def unreachable(self, start: str) -> List[str]:
+        """
+        Returns the cities that cannot be reached from the start.
+
+        Args:
+            start (str): The start city.
+
+        Returns:
+            List[str]: The unreachable cities, in node ID order.
+
+        Raises:
+            ValueError: If the start city is not in the graph.
+        """
+        levels = self._level_array(self._start_id(start))
+        return [self.csr.node_name(node_id) for node_id in numpy.flatnonzero(levels < 0)]
+
+    def distance_array(self, start: str) -> 'numpy.ndarray':
+        """
+        Returns the shortest distance from the start to every node ID, computed with vectorized Bellman-Ford relaxation.
+
+        Args:
+            start (str): The start city.
+
+        Returns:
+            numpy.ndarray: The distances as floats, indexed by node ID, with inf for unreachable nodes.
+
+        Raises:
+            ValueError: If the start city is not in the graph.
+        """
+        distances, _ = self._relax_all(self._start_id(start))
+        return distances
+
+    def _relax_all(self, start_id: int) -> Tuple['numpy.ndarray', 'numpy.ndarray']:
+        """
+        Relaxes the edges of every node whose distance changed in the previous round, until no distance changes.
+
+        With non-negative costs this takes at most one round per edge on the longest shortest path.
+
+        Returns:
+            Tuple[numpy.ndarray, numpy.ndarray]: The distance and predecessor of every node ID, inf and -1 if unreachable.
+        """
+        offsets, _, _ = self._adjacency()
+        num_nodes = len(offsets) - 1
+        distances = numpy.full(num_nodes, numpy.inf)
+        parents = numpy.full(num_nodes, -1, dtype=numpy.int64)
+        distances[start_id] = 0
+        active = numpy.array([start_id], dtype=numpy.int64)
+        while active.size:
+            sources, neighbors, edge_costs = self._frontier_edges(active)
+            candidates = distances[sources] + edge_costs
+            improving = candidates < distances[neighbors]
+            sources, neighbors, candidates = sources[improving], neighbors[improving], candidates[improving]
+            # Keep the smallest candidate per node: sort by node, then by candidate distance
+            order = numpy.lexsort((candidates, neighbors))
+            neighbors, first = numpy.unique(neighbors[order], return_index=True)
+            best = order[first]
+            distances[neighbors] = candidates[best]
+            parents[neighbors] = sources[best]
+            active = neighbors.astype(numpy.int64)
+        return distances, parents
+
+    def shortest_path_tree(self, start: str) -> Tuple[Dict[str, int], Dict[str, Optional[str]]]:
+        """
+        Returns the shortest distance and a predecessor of every city reachable from the start.
+
+        The distances match UCSSearch.shortest_path_tree; when several shortest paths exist, the predecessor may differ.
+
+        Args:
+            start (str): The start city.
+
+        Returns:
+            Tuple[Dict[str, int], Dict[str, Optional[str]]]: The shortest distance to every reachable city, and its
+                predecessor, None for the start.
+
+        Raises:
+            ValueError: If the start city is not in the graph.
+        """
+        distances, parents = self._relax_all(self._start_id(start))
+        integral = numpy.issubdtype(self._adjacency()[2].dtype, numpy.integer)
+        reached = numpy.flatnonzero(numpy.isfinite(distances))
+        names = [self.csr.node_name(node_id) for node_id in reached]
+        return ({name: int(distances[node_id]) if integral else float(distances[node_id]) for name, node_id in zip(names, reached)},
+                {name: self.csr.node_name(int(parents[node_id])) if parents[node_id] >= 0 else None
+                 for name, node_id in zip(names, reached)})
+
+    def shortest_distances(self, start: str) -> Dict[str, int]:
+        """
+        Returns the shortest distance from the start city to every reachable city.
+
+        Args:
+            start (str): The start city.
+
+        Returns:
+            Dict[str, int]: The shortest distance to every city reachable from the start, including the start itself.
+
+        Raises:
+            ValueError: If the start city is not in the graph.
+        """
+        distances, _ = self.shortest_path_tree(start)
+        return distances
+
+    def _start_id(self, start: str) -> int:
+        """
+        Returns the node ID of a start city, building the arrays first.
+
+        Raises:
+            ValueError: If the city is not in the graph.
+        """
+        self._adjacency()
+        start_id = self.csr.node_id(start)
+        if start_id is None:
+            raise ValueError(f"Unknown city {start!r}")
+        return start_id
+
+if __name__ == "__main__":
+    vectorized_bfs_search = VectorizedBFSSearch()
+    vectorized_bfs_search.run_search()